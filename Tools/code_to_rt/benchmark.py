@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Measures how the conversion to rich text scales with the file size.
+# Generates Java files of different line counts and times each conversion step.
+
+import argparse
+import json
+import time
+
+# requires pygments to be installed
+from pygments import highlight
+from pygments.lexers import JavaLexer
+from pygments.formatters import HtmlFormatter
+
+from htmlParser import HtmlParser
+from richTextFormatter import RichTextFormatter
+
+
+def generateJavaCode(lines):
+    ''' Returns generated Java code with about the given number of lines. '''
+
+    code = ['package main.java;', '', 'public class Generated {', '']
+    methodNo = 0
+    while len(code) < lines - 1:
+        code.extend([
+            '    // method number {}'.format(methodNo),
+            '    public int method{}(int x, String name) {{'.format(methodNo),
+            '        int result = x * {} + name.length();'.format(methodNo),
+            '        if (result > 100) {{ return result - {}; }}'.format(methodNo),
+            '        return "value".equals(name) ? result : -1;',
+            '    }',
+            ''
+        ])
+        methodNo += 1
+    code.append('}')
+    return '\n'.join(code) + '\n'
+
+
+def measure(func, repeat):
+    ''' Returns the best time of the function calls in seconds and its last result. '''
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        duration = time.perf_counter() - start
+        if best is None or duration < best: best = duration
+    return best, result
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the conversion of source code to rich text.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument('-s', '-sizes', '--sizes', required=False, type=int, nargs='+',
+        default=[1000, 10000, 100000], help='Line counts of the generated files')
+
+    parser.add_argument('-c', '-cs', '-colorschema', '--colorschema', required=False, type=str, default='schema/monokai.json',
+        help='Path to a JSON color schema')
+
+    parser.add_argument('-r', '-repeat', '--repeat', required=False, type=int, default=3,
+        help='Number of runs per measurement (the best one is used)')
+
+    args = parser.parse_args()
+
+    with open(args.colorschema, 'r') as file:
+        jsonSchema = json.load(file)
+
+    lexer = JavaLexer()
+    htmlFormatter = HtmlFormatter()
+    rtFormatter = RichTextFormatter(colorschema=jsonSchema)
+
+    print('{:>8} | {:>14} | {:>14} | {:>14} | {:>12}'.format(
+        'lines', 'highlight HTML', 'parse HTML', 'direct', 'us per line'))
+
+    for lines in args.sizes:
+        code = generateJavaCode(lines)
+
+        htmlTime, htmlCode = measure(lambda: highlight(code, lexer, htmlFormatter), args.repeat)
+
+        def parseHTML():
+            htmlParser = HtmlParser(colorSchema=jsonSchema)
+            htmlParser.feed(htmlCode)
+            return htmlParser.getRichText()
+
+        parseTime, _ = measure(parseHTML, args.repeat)
+        directTime, _ = measure(lambda: highlight(code, lexer, rtFormatter), args.repeat)
+
+        print('{:>8} | {:>13.3f}s | {:>13.3f}s | {:>13.3f}s | {:>12.2f}'.format(
+            lines, htmlTime, parseTime, directTime, parseTime / lines * 1e6))
+
+
+if __name__ == '__main__':
+    main()
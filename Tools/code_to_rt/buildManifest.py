@@ -0,0 +1,205 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Manifest of the exported files for incremental conversions.
+# Stores the inputs each output file was created from,
+# so that only outputs with changed inputs have to be created again.
+
+import os
+import json
+import hashlib
+
+
+MANIFEST_NAME = '.rt_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def hashFile(filePath):
+    ''' Returns the SHA-1 hash of the file content. '''
+
+    sha = hashlib.sha1()
+    with open(filePath, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def hashSchema(colorSchema):
+    ''' Returns the hash of a color schema (independent of the key order). '''
+    return hashlib.sha1(json.dumps(colorSchema, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    '''
+    Entries of the exported files in an output folder.
+    Each entry is stored by the output file path (relative to the output folder) and holds
+    the source path, its size, modification time and content hash
+    as well as the settings (e.g. schema hash and pygments version) used for the conversion.
+
+    An output is up to date if the settings are the same
+    and the source file has the same size and modification time
+    (or the same content if only the modification time changed).
+
+    Sources that are not supported (e.g. no lexer fits them) get an entry as well,
+    so that they are only tried again if they or the settings change.
+    Other failed conversions (e.g. the output exists already) get no entry and are tried again.
+    '''
+
+    def __init__(self, outputFolder, settings):
+        '''
+        Parameters:
+        - outputFolder: folder the manifest and the exported files are in
+        - settings: dictionary of the conversion settings (e.g. schema hash, pygments version)
+        '''
+
+        self.outputFolder = outputFolder
+        self.manifestPath = os.path.join(outputFolder, MANIFEST_NAME)
+        self.settings = settings
+        self.entries = {}
+
+        # source stats and hashes of files to convert (until they are added)
+        self.pending = {}
+
+
+    def load(self):
+        ''' Loads the entries of the manifest file (no entries if missing or invalid). '''
+
+        if not os.path.isfile(self.manifestPath):
+            return
+
+        try:
+            with open(self.manifestPath, 'r') as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if content.get('version') == MANIFEST_VERSION:
+            self.entries = content.get('entries', {})
+
+
+    def save(self):
+        ''' Saves the entries to the manifest file (through a temporary file). '''
+
+        tmpPath = self.manifestPath + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, file, indent=4, sort_keys=True)
+        os.replace(tmpPath, self.manifestPath)
+
+
+    def getKey(self, outFilePath):
+        return os.path.relpath(outFilePath, self.outputFolder).replace('\\', '/')
+
+
+    def isUpToDate(self, sourcePath, outFilePaths):
+        '''
+        Returns True if the outputs of the source file do not have to be created again.
+        Otherwise, the current state of the source is remembered for add().
+
+        Parameters:
+        - sourcePath: path of the source file
+        - outFilePaths: paths of all output files of this source (the first one is the key)
+        '''
+
+        key = self.getKey(outFilePaths[0])
+        entry = self.entries.get(key)
+        stat = os.stat(sourcePath)
+        sourceState = {
+            'source': os.path.abspath(sourcePath),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'settings': self.settings,
+            'outputs': [self.getKey(path) for path in outFilePaths]
+        }
+
+        # failed conversions have no outputs to check
+        failed = not entry is None and entry.get('failed', False)
+        if not entry is None and (failed or all(os.path.isfile(path) for path in outFilePaths)):
+            sameInputs = all(entry.get(name) == sourceState[name] for name in ('source', 'settings', 'outputs'))
+
+            if sameInputs and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                return True
+
+            # only compare the content if the size is the same (e.g. touched files)
+            if sameInputs and entry['size'] == stat.st_size:
+                sourceState['sha1'] = hashFile(sourcePath)
+                if entry.get('sha1') == sourceState['sha1']:
+                    if failed: sourceState['failed'] = True
+                    self.entries[key] = sourceState
+                    return True
+
+        self.pending[key] = sourceState
+        return False
+
+
+    def hasEntry(self, outFilePath):
+        ''' Returns True if the output file was created by a previous conversion. '''
+
+        entry = self.entries.get(self.getKey(outFilePath))
+        return not entry is None and not entry.get('failed', False)
+
+
+    def add(self, outFilePath):
+        '''
+        Adds the entry of a successfully converted file (see isUpToDate).
+        Outputs of the previous conversion that are no longer created with the current settings
+        (e.g. line indices or HTML files) are removed.
+        Returns the list of removed output files.
+        '''
+
+        key = self.getKey(outFilePath)
+        previous = self.entries.get(key)
+        self.addEntry(key)
+
+        removed = []
+        if previous is None or previous.get('failed', False):
+            return removed
+
+        for output in previous['outputs']:
+            if output in self.entries[key]['outputs']: continue
+            path = os.path.join(self.outputFolder, output)
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(path)
+
+        return removed
+
+
+    def addFailed(self, outFilePath):
+        ''' Adds the entry of a file that is not supported (see isUpToDate). '''
+
+        self.addEntry(self.getKey(outFilePath))['failed'] = True
+
+
+    def addEntry(self, key):
+        ''' Adds the remembered source state of the key (see isUpToDate) as entry and returns it. '''
+
+        sourceState = self.pending.pop(key)
+        if not 'sha1' in sourceState:
+            # unreadable sources (e.g. of failed conversions) are only compared by size and modification time
+            try: sourceState['sha1'] = hashFile(sourceState['source'])
+            except OSError: sourceState['sha1'] = None
+        self.entries[key] = sourceState
+        return sourceState
+
+
+    def prune(self):
+        '''
+        Removes the entries and output files of sources that no longer exist.
+        Returns the list of removed output files.
+        '''
+
+        removed = []
+        for key in list(self.entries):
+
+            entry = self.entries[key]
+            if os.path.isfile(entry['source']): continue
+
+            for output in entry['outputs']:
+                outFilePath = os.path.join(self.outputFolder, output)
+                if os.path.isfile(outFilePath):
+                    os.remove(outFilePath)
+                    removed.append(outFilePath)
+
+            del self.entries[key]
+
+        return removed
@@ -0,0 +1,130 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Color schema that resolves the final color of each Pygments token type.
+# Loads JSON color schemas (CSS class -> color) and Pygments styles.
+
+import os
+import json
+import importlib.util
+
+from pygments.style import Style
+from pygments.token import Token, STANDARD_TYPES
+
+
+def loadStyle(stylePath):
+    '''
+    Loads the first Pygments Style class of a Python file (e.g. "schema/monokai.py").
+    Returns None if the file contains no style.
+    '''
+
+    moduleName = os.path.splitext(os.path.basename(stylePath))[0]
+    spec = importlib.util.spec_from_file_location(moduleName, stylePath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, Style) and not value is Style:
+            return value
+
+    return None
+
+
+def styleToSchema(style):
+    '''
+    Converts a Pygments Style to a color schema (CSS class -> color value)
+    like the JSON color schema files.
+    Classes without a color are not part of the schema.
+    '''
+
+    colorSchema = {}
+    for ttype, cssClass in STANDARD_TYPES.items():
+        color = style.style_for_token(ttype)['color']
+        if color and len(cssClass) > 0:
+            colorSchema[cssClass] = '#' + color
+    return colorSchema
+
+
+def loadSchema(schemaPath):
+    '''
+    Loads a color schema (CSS class -> color value) from a JSON file
+    or from a Pygments style (Python file, e.g. "schema/monokai.py").
+    Raises an exception on errors.
+    '''
+
+    if schemaPath.endswith('.py'):
+        style = loadStyle(schemaPath)
+        if style is None: raise ValueError('No Pygments style found in: {}'.format(schemaPath))
+        return styleToSchema(style)
+
+    with open(schemaPath, 'r') as file:
+        return json.load(file)
+
+
+class ColorSchema:
+    '''
+    Resolves the color of each token type (or CSS class) once for a color schema.
+    Token types without an own color in the schema use the color of their closest parent
+    (e.g. "kd" (Keyword.Declaration) uses the color of "k" (Keyword) if it is missing).
+    The root token type (plain text) is never colored.
+
+    The colors of all standard token types are resolved on creation,
+    so each lookup is a single dictionary access.
+    '''
+
+    def __init__(self, classColors):
+        '''
+        Parameters:
+        - classColors: color value for each CSS class (e.g. {"k": "#8000FF"})
+        '''
+
+        self.classColors = dict(classColors)
+
+        # final color of each token type and CSS class (None if not colored)
+        self.tokenColors = {}
+        self.resolvedClasses = {}
+        for ttype, cssClass in STANDARD_TYPES.items():
+            color = self.resolve(ttype)
+            self.tokenColors[ttype] = color
+            self.resolvedClasses[cssClass] = color
+
+        # classes that are no standard classes keep their color
+        for cssClass, color in self.classColors.items():
+            self.resolvedClasses.setdefault(cssClass, color)
+
+
+    def resolve(self, ttype):
+        ''' Returns the color of the token type or its closest parent with a color. '''
+
+        while not ttype is Token:
+            cssClass = STANDARD_TYPES.get(ttype)
+            if not cssClass is None and cssClass in self.classColors:
+                return self.classColors[cssClass]
+            ttype = ttype.parent
+        return None
+
+
+    def getColor(self, ttype):
+        ''' Returns the color of the token type or None if it is not colored. '''
+
+        try: return self.tokenColors[ttype]
+        except KeyError: pass
+
+        # token types that are no standard types (e.g. created by a lexer)
+        color = self.resolve(ttype)
+        self.tokenColors[ttype] = color
+        return color
+
+
+    def getClassColor(self, cssClass):
+        '''
+        Returns the color of a CSS class as used by the HtmlFormatter or None if it is not colored.
+        Class names of other token types (e.g. "n n-Custom") use the color of their first class.
+        '''
+
+        try: return self.resolvedClasses[cssClass]
+        except KeyError: pass
+
+        color = self.resolvedClasses.get(cssClass.split(' ', 1)[0])
+        self.resolvedClasses[cssClass] = color
+        return color
@@ -3,6 +3,25 @@
 
 from html.parser import HTMLParser
 
+from richTextFormatter import colorLines
+from colorSchema import ColorSchema
+
+
+class SpanElement:
+    ''' A span-tag of the HTML code with its color class, color and data. '''
+
+    __slots__ = ('colorClass', 'color', 'previous', 'code')
+
+    def __init__(self):
+        self.colorClass = None
+        self.color = None
+
+        # previous data (could be whitespace or line breaks)
+        self.previous = ''
+
+        # chunks of the data inside the tag
+        self.code = []
+
 
 class HtmlParser(HTMLParser):
     '''
@@ -10,12 +29,13 @@ class HtmlParser(HTMLParser):
     Uses the HTMLParse as base class.
     '''
 
-    def __init__(self, colorSchema, set_default_color=False, default_color='#000000'):
+    def __init__(self, colorSchema, set_default_color=False, default_color='#000000', lineSafe=False):
         '''
         Parameters:
-        - colorSchema: a set (each key matches a class of the HTML code) and a value is a color code
+        - colorSchema: a ColorSchema or a set (each key matches a class of the HTML code) and a value is a color code
         - set_default_color: enable/disable setting default color for unknown classes
         - default_color: default color for unknown classes
+        - lineSafe: close color tags at the end of each line and open them again in the next one
 
         Use feed(htmlCode) to run the parser and use getRichText() to retrieve the parsed result.
         '''
@@ -24,6 +44,8 @@ class HtmlParser(HTMLParser):
 
         # color schema (color value for each class)
         self.colorSchema = colorSchema
+        if not isinstance(colorSchema, ColorSchema):
+            self.colorSchema = ColorSchema(colorSchema)
 
         # look for span-tags in the HTML code (these are the ones that interest us)
         self.tag = "span"
@@ -35,11 +57,8 @@ class HtmlParser(HTMLParser):
         self.set_default_color = set_default_color
         self.default_color = default_color
 
-        # keys of the dictionary that will be passed to the callback function
-        self.out_key_code = 'code'
-        self.out_key_class = 'class'
-        self.out_key_color = 'color'
-        self.out_key_previous = 'prev'
+        # no color tags across lines
+        self.lineSafe = lineSafe
 
         ### values of following variables will change on runtime
 
@@ -47,11 +66,11 @@ class HtmlParser(HTMLParser):
         self.insideTag = False
 
         # the current element and its data (attrs and data)
-        self.current = {}
+        self.current = SpanElement()
         self.previousData = ''
 
-        # final and parsed result
-        self.result = ''
+        # chunks of the final and parsed result (joined once when requested)
+        self.result = []
 
 
     def getRichText(self):
@@ -59,7 +78,21 @@ class HtmlParser(HTMLParser):
         Get the final and parsed result in Unity3D Rich Text format.
         For format information see: https://docs.unity3d.com/Manual/StyledText.html
         '''
-        return self.result
+
+        richText = ''.join(self.result)
+        self.result = [richText]
+        return richText
+
+
+    def takeRichText(self):
+        '''
+        Returns the rich text parsed since the last call and removes it from the result.
+        Used to write the result while feeding the HTML code in chunks (see HtmlStreamWriter).
+        '''
+
+        richText = ''.join(self.result)
+        self.result = []
+        return richText
 
 
     def handle_starttag(self, tag, attrs):
@@ -68,26 +101,24 @@ class HtmlParser(HTMLParser):
         # if there is a span inside a span, the outer one wont be taken into account!
         if self.tagMatch(tag):
             self.insideTag = True
-            self.current = {}
+            self.current = SpanElement()
 
             # add color class of the following data
             if len(attrs) > 0 and self.key_class in attrs[0]:
                 colorClass = attrs[0][1]
-                self.current[self.out_key_class] = colorClass
+                self.current.colorClass = colorClass
 
                 # get according color and add it
-                colorValue = self.getColorFor(colorClass)
-                if not colorValue is None:
-                    self.current[self.out_key_color] = colorValue
+                self.current.color = self.getColorFor(colorClass)
 
                 # add previous data (could be whitespace or line breaks)
-                self.current[self.out_key_previous] = self.previousData
+                self.current.previous = self.previousData
 
 
     def handle_endtag(self, tag):
         #print('End tag: {}'.format(tag))
 
-        if self.tagMatch(tag) and self.out_key_class in self.current:
+        if self.tagMatch(tag) and not self.current.colorClass is None:
             self.addResult(self.current)
 
         # clear previous data
@@ -98,13 +129,10 @@ class HtmlParser(HTMLParser):
         #print('Data: {}'.format(data))
 
         if self.insideTag:
-            if self.out_key_code in self.current:
-                cur = self.current[self.out_key_code]
-                self.current[self.out_key_code] = cur + data
-            else:
-                self.current[self.out_key_code] = data
+            self.current.code.append(data)
 
-        self.previousData = data
+        # data can be split into several calls if the HTML code is fed in chunks
+        self.previousData += data
 
 
     def tagMatch(self, tag):
@@ -114,13 +142,14 @@ class HtmlParser(HTMLParser):
 
     def getColorFor(self, colorClass):
         '''
-        Returns the according color value or
-        the default color (if enabled) value if the class is not known.
-        If the set_default_color is False, None will be returned for unknown classes.
+        Returns the according color value (see ColorSchema) or
+        the default color (if enabled) value if the class has no color.
+        If the set_default_color is False, None will be returned for these classes.
         '''
 
-        if colorClass in self.colorSchema:
-            return self.colorSchema[colorClass]
+        colorValue = self.colorSchema.getClassColor(colorClass)
+        if not colorValue is None:
+            return colorValue
 
         if self.set_default_color:
             return self.default_color
@@ -134,28 +163,81 @@ class HtmlParser(HTMLParser):
         if currentElement is None:
             return
 
-        if not self.out_key_code in currentElement:
+        if len(currentElement.code) == 0:
             return
 
         # add previous data (e.g. whitespaces or line breaks)
-        out = ''
-        if self.out_key_previous in currentElement:
-            out = currentElement[self.out_key_previous]
+        self.result.append(currentElement.previous)
 
         # get color info if available
-        colorInfo = None
-        if self.out_key_color in currentElement:
-            colorInfo = currentElement[self.out_key_color]
+        colorInfo = currentElement.color
+
+        # color each line on its own
+        if self.lineSafe and not colorInfo is None:
+            self.result.append(colorLines(''.join(currentElement.code), colorInfo))
+            return
 
         # start tag of color
         if not colorInfo is None:
-            out += '<color={}>'.format(colorInfo)
+            self.result.append('<color={}>'.format(colorInfo))
 
-        out += currentElement[self.out_key_code]
+        self.result.extend(currentElement.code)
 
         # end tag of color
         if not colorInfo is None:
-            out += '</color>'
+            self.result.append('</color>')
+
+
+class HtmlStreamWriter:
+    '''
+    File-like object to pass as output file to the Pygments HtmlFormatter.
+    Feeds the HTML code in chunks to the parser and writes the rich text to the output file,
+    so that neither the whole HTML code nor the whole rich text has to be kept in memory.
+    Call close() after formatting to write the rest.
+    '''
+
+    def __init__(self, htmlParser, outFile, htmlFile=None, chunkSize=1 << 16):
+        '''
+        Parameters:
+        - htmlParser: parser to convert the HTML code with
+        - outFile: file to write the rich text to
+        - htmlFile: file to write the HTML code to as well (optional)
+        - chunkSize: number of characters of HTML code to collect before they are parsed
+        '''
+
+        self.htmlParser = htmlParser
+        self.outFile = outFile
+        self.htmlFile = htmlFile
+        self.chunkSize = chunkSize
+
+        self.chunks = []
+        self.size = 0
+
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+        if self.size >= self.chunkSize:
+            self.flush()
+
+
+    def flush(self):
+        ''' Parses the collected HTML code and writes the resulting rich text. '''
+
+        htmlCode = ''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+
+        if not self.htmlFile is None:
+            self.htmlFile.write(htmlCode)
+
+        self.htmlParser.feed(htmlCode)
+        self.outFile.write(self.htmlParser.takeRichText())
+
+
+    def close(self):
+        ''' Parses and writes the rest. '''
 
-        # add this part to the final result
-        self.result += out
+        self.flush()
+        self.htmlParser.close()
+        self.outFile.write(self.htmlParser.takeRichText())
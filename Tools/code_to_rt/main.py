@@ -7,17 +7,46 @@ import os
 import argparse
 import logging
 import json
+import fnmatch
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 
 # requires pygments to be installed
+import pygments
 from pygments import highlight
-from pygments.lexers import get_lexer_for_filename
+from pygments.lexers import get_lexer_for_filename, get_all_lexers
 from pygments.formatters import HtmlFormatter
 from pygments.util import ClassNotFound
 
-from htmlParser import HtmlParser
+from htmlParser import HtmlParser, HtmlStreamWriter
+from richTextFormatter import RichTextFormatter
+from colorSchema import ColorSchema, loadSchema
+from buildManifest import BuildManifest, hashSchema
 
 LOGGER = None
 
+# lexer and formatter per file extension (reused for all files of a process)
+HIGHLIGHTERS = {}
+
+# lexer filename patterns that do not only depend on the extension (e.g. "Makefile" or "*.h.in")
+SPECIAL_PATTERNS = None
+
+# color schema resolved once per process (see initWorker)
+WORKER_SCHEMA = None
+
+# format tokens directly to rich text instead of parsing HTML (set per argument)
+DIRECT_MODE = False
+
+# files larger than this (in bytes) are converted while writing (set per argument)
+STREAM_LIMIT = 8 * 1024 * 1024
+
+# close color tags at line ends and write an index of line offsets (set per argument)
+LINE_INDEX = False
+
+# reasons of failed conversions (see convertFile)
+FAILED_NO_LEXER = 'no lexer' # the file is not supported (stored in the manifest)
+FAILED_EXPORT = 'export' # the output could not be written (e.g. exists already, tried again next time)
+
 
 def main():
 
@@ -34,28 +63,7 @@ def main():
 
     # set up logger
     global LOGGER
-    LOGGER = logging.getLogger('crusherToJSONLogger')
-    LOGGER.setLevel(logging.DEBUG)
-
-    # check if debug should be enabled
-    logLevel = logging.INFO
-    if args.verbose: logLevel = logging.DEBUG
-
-    # channel to stream log events to console
-    ch = logging.StreamHandler()
-    ch.setLevel(logLevel)
-    formatter = logging.Formatter('[%(levelname)s] (%(asctime)s): %(message)s')
-    ch.setFormatter(formatter)
-    LOGGER.addHandler(ch)
-
-    # log to file if enabled
-    logPath = args.logfile
-    if len(logPath) > 0:
-        if not logPath.endswith(".log"):
-            logPath += ".log"
-        fileHandler = logging.FileHandler(logPath)
-        fileHandler.setFormatter(formatter)
-        LOGGER.addHandler(fileHandler)
+    LOGGER = prepareLogger(logPath=args.logfile, verbose=args.verbose)
     LOGGER.info('Logger ready.')
 
 
@@ -98,18 +106,23 @@ def main():
 
     # export the highlighted HTML code as well if desired
     exportHTML = True if args.exporthtml else False
+    if exportHTML and args.direct:
+        LOGGER.warning('No HTML export possible in direct mode.')
+        exportHTML = False
     if exportHTML: LOGGER.info('Additional HTML export enabled.')
 
 
-    # try to read JSON color schema
+    # try to read JSON color schema (or get it from a Pygments style)
     jsonSchema = None
-    with open(schemaPath, "r") as file:
-        try:
-            jsonSchema = json.loads(file.read())
-        except Exception as ex:
-            LOGGER.error(ex)
+    try:
+        jsonSchema = loadSchema(schemaPath)
+    except Exception as ex:
+        LOGGER.error(ex)
     if jsonSchema is None: return
 
+    # prepare highlighting of this process
+    initWorker(jsonSchema, args.verbose, args.direct, int(args.stream_limit * 1024 * 1024), args.line_index)
+
 
     # check if path exists
     filePath = args.path
@@ -120,12 +133,14 @@ def main():
     # check if path leads to file or folder
     if os.path.isfile(filePath):
 
+        if args.incremental: LOGGER.warning('Incremental mode is only supported for folders.')
+
         # parses html code to unity rt format
-        parser = HtmlParser(colorSchema=jsonSchema)
+        parser = None if args.direct else HtmlParser(colorSchema=WORKER_SCHEMA, lineSafe=args.line_index)
 
         # convert a file and export the result
         LOGGER.info('Converting the file...')
-        resultPath = convertFile(
+        resultPath, _ = convertFile(
             htmlParser=parser,
             filePath=filePath,
             outputFolder=outFolder,
@@ -143,7 +158,13 @@ def main():
             jsonSchema=jsonSchema,
             exportHTML=exportHTML,
             overwrite=overwrite,
-            recursive=recursive
+            recursive=recursive,
+            jobs=args.jobs,
+            verbose=args.verbose,
+            direct=args.direct,
+            incremental=args.incremental,
+            streamLimit=int(args.stream_limit * 1024 * 1024),
+            lineIndex=args.line_index
         )
 
     # print result path
@@ -151,14 +172,55 @@ def main():
         LOGGER.info('Result path: ' + os.path.abspath(resultPath))
 
 
-def convertFiles(folderPath, outputFolder, jsonSchema, exportHTML=False, overwrite=False, recursive=False):
+def prepareLogger(logPath='', verbose=False):
+    '''
+    Prepares and returns the logger.
+    Logs to the console and to the file at logPath (if not empty).
+    '''
+
+    logger = logging.getLogger('crusherToJSONLogger')
+    logger.setLevel(logging.DEBUG)
+
+    # check if debug should be enabled
+    logLevel = logging.INFO
+    if verbose: logLevel = logging.DEBUG
+
+    # channel to stream log events to console
+    ch = logging.StreamHandler()
+    ch.setLevel(logLevel)
+    formatter = logging.Formatter('[%(levelname)s] (%(asctime)s): %(message)s')
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+    # log to file if enabled
+    if len(logPath) > 0:
+        if not logPath.endswith(".log"):
+            logPath += ".log"
+        fileHandler = logging.FileHandler(logPath)
+        fileHandler.setFormatter(formatter)
+        logger.addHandler(fileHandler)
+
+    return logger
+
+
+def convertFiles(folderPath, outputFolder, jsonSchema, exportHTML=False, overwrite=False, recursive=False, jobs=1, verbose=False, direct=False, incremental=False, streamLimit=STREAM_LIMIT, lineIndex=False):
     '''
     Converts all files source code to a syntax highlighted rich text format.
     This method does not check if the given path is valid!
     Returns None on errors, the path to the exported files otherwise.
+
+    Parameters:
+    - jobs: number of processes to convert the files with (0 = number of CPUs)
+    - verbose: debug logging of the worker processes
+    - direct: format to rich text directly (see RichTextFormatter) instead of parsing HTML
+    - incremental: only convert files whose source or settings changed since the last conversion
+      and remove the outputs of deleted sources (see BuildManifest)
+    - streamLimit: size in bytes above which files are converted while writing (see convertFileStreaming)
+    - lineIndex: close color tags at line ends and write the line offsets of each file (see writeLineIndex)
     '''
 
     firstOutPath = None
+    fileTasks = []
     pathLength = len(folderPath)
     if folderPath.endswith('/') or folderPath.endswith('\\'): folderPath = folderPath[:-1]
     srcDirName = os.path.normcase(os.path.basename(folderPath))
@@ -186,36 +248,147 @@ def convertFiles(folderPath, outputFolder, jsonSchema, exportHTML=False, overwri
 
         if firstOutPath is None: firstOutPath = curOutFolder
 
-        # convert and export all the files of this folder
+        # collect all the files of this folder
         for file in files:
-            
-            # parses html code to unity rt format
-            parser = HtmlParser(colorSchema=jsonSchema)
-
-            LOGGER.info('Converting file: {}'.format(file))
-            path = convertFile(
-                htmlParser=parser,
-                filePath=os.path.join(curDir, file),
-                outputFolder=curOutFolder,
-                exportHTML=exportHTML,
-                overwrite=overwrite
-            )
-
-            if not path is None: LOGGER.info('File exported: {}'.format(path))
+            fileTasks.append((os.path.join(curDir, file), curOutFolder, exportHTML, overwrite))
 
         # do not take sub-folders into account if recursion is disabled
         if not recursive: break
 
+    # skip files that did not change since the last conversion
+    manifest = None
+    if incremental:
+        manifest = BuildManifest(outputFolder, {
+            'schema': hashSchema(jsonSchema),
+            'pygments': pygments.__version__,
+            'mode': 'direct' if direct else 'html',
+            'lineIndex': lineIndex
+        })
+        manifest.load()
+        for path in manifest.prune():
+            LOGGER.info('Removed output of deleted source: {}'.format(path))
+        fileTasks = selectChangedFiles(manifest, fileTasks, lineIndex)
+
+    # convert and export the files
+    if jobs == 0: jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(fileTasks) <= 1:
+        initWorker(jsonSchema, verbose, direct, streamLimit, lineIndex)
+        results = map(convertFileTask, fileTasks)
+        exportFiles(fileTasks, results, manifest)
+    else:
+        LOGGER.info('Converting {} files using {} processes...'.format(len(fileTasks), jobs))
+        chunkSize = max(1, len(fileTasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker, initargs=(jsonSchema, verbose, direct, streamLimit, lineIndex)) as executor:
+            exportFiles(fileTasks, executor.map(convertFileTask, fileTasks, chunksize=chunkSize), manifest)
+
+    if not manifest is None: manifest.save()
     return firstOutPath
 
 
+def selectChangedFiles(manifest, fileTasks, lineIndex=False):
+    '''
+    Returns the file tasks (see convertFileTask) whose outputs are not up to date.
+    Outputs of previous conversions are overwritten.
+    '''
+
+    changedTasks = []
+    for filePath, outputFolder, exportHTML, overwrite in fileTasks:
+
+        outFilePath = os.path.join(outputFolder, os.path.basename(filePath) + '.rt')
+        outFilePaths = [outFilePath]
+        if exportHTML: outFilePaths.append(os.path.join(outputFolder, os.path.basename(filePath) + '.html'))
+        if lineIndex: outFilePaths.append(outFilePath + '.idx')
+
+        if manifest.isUpToDate(filePath, outFilePaths):
+            LOGGER.debug('File is up to date: {}'.format(filePath))
+            continue
+
+        overwrite = overwrite or manifest.hasEntry(outFilePath)
+        changedTasks.append((filePath, outputFolder, exportHTML, overwrite))
+
+    LOGGER.info('Files up to date: {}, files to convert: {}'.format(len(fileTasks) - len(changedTasks), len(changedTasks)))
+    return changedTasks
+
+
+def exportFiles(fileTasks, results, manifest=None):
+    '''
+    Logs the paths of the exported files and adds them to the manifest.
+    Files without fitting lexer are added to the manifest as well, so that they are not converted again until they change.
+    Files that failed otherwise (e.g. the output exists already) are tried again with the next conversion.
+
+    Parameters:
+    - results: tuple of the exported file path and the reason of a failure of each file task (see convertFile)
+    '''
+
+    for (filePath, outputFolder, _, _), (path, failure) in zip(fileTasks, results):
+
+        if path is None:
+            LOGGER.warning('File not exported: {}'.format(filePath))
+            if not manifest is None and failure == FAILED_NO_LEXER:
+                manifest.addFailed(os.path.join(outputFolder, os.path.basename(filePath) + '.rt'))
+            continue
+
+        LOGGER.info('File exported: {}'.format(path))
+        if manifest is None: continue
+        for removedPath in manifest.add(path):
+            LOGGER.info('Removed output that is no longer created: {}'.format(removedPath))
+
+
+def initWorker(jsonSchema, verbose=False, direct=False, streamLimit=STREAM_LIMIT, lineIndex=False):
+    ''' Prepares a (worker) process to convert files with convertFileTask. '''
+
+    global WORKER_SCHEMA, DIRECT_MODE, STREAM_LIMIT, LINE_INDEX
+    WORKER_SCHEMA = ColorSchema(jsonSchema)
+    DIRECT_MODE = direct
+    STREAM_LIMIT = streamLimit
+    LINE_INDEX = lineIndex
+
+    global LOGGER
+    if LOGGER is None: LOGGER = prepareLogger(verbose=verbose)
+
+
+def convertFileTask(fileTask):
+    '''
+    Converts a single file (filePath, outputFolder, exportHTML, overwrite)
+    with the color schema of this process (see initWorker).
+    Returns a tuple of the exported file path and the reason of a failure (see convertFile).
+    '''
+
+    filePath, outputFolder, exportHTML, overwrite = fileTask
+
+    # parses html code to unity rt format
+    parser = None if DIRECT_MODE else HtmlParser(colorSchema=WORKER_SCHEMA, lineSafe=LINE_INDEX)
+
+    LOGGER.info('Converting file: {}'.format(os.path.basename(filePath)))
+    return convertFile(
+        htmlParser=parser,
+        filePath=filePath,
+        outputFolder=outputFolder,
+        exportHTML=exportHTML,
+        overwrite=overwrite
+    )
+
+
 def convertFile(htmlParser, filePath, outputFolder, exportHTML=False, overwrite=False):
     '''
     Converts source code to a syntax highlighted rich text format.
     This method does not check if the given path is valid!
-    Returns None on errors, the exported file path otherwise.
+    Returns a tuple of the exported file path (None on errors)
+    and the reason of a failure (FAILED_NO_LEXER, FAILED_EXPORT or None on success).
+
+    Parameters:
+    - htmlParser: parser to convert the HTML code with
+      (None in direct mode, the highlighted code is rich text already)
     '''
 
+    # convert large files while writing
+    if os.path.getsize(filePath) > STREAM_LIMIT:
+        return convertFileStreaming(htmlParser, filePath, outputFolder, exportHTML, overwrite)
+
+    if getHighlighter(filePath) is None:
+        LOGGER.error('Could not find a fitting lexer for file: {}'.format(filePath))
+        return None, FAILED_NO_LEXER
+
     # highlight source code and get HTML result
     htmlCode = None
     with open(filePath, "r") as codeFile:
@@ -223,8 +396,6 @@ def convertFile(htmlParser, filePath, outputFolder, exportHTML=False, overwrite=
         htmlCode = highlightCode(codeFile, codeFile.read())
         LOGGER.debug('Finished highlighting!')
 
-    if htmlCode is None: return None
-
     # export HTML result to file
     if exportHTML:
         LOGGER.debug('Exporting HTML code highlighting to file...')
@@ -233,10 +404,13 @@ def convertFile(htmlParser, filePath, outputFolder, exportHTML=False, overwrite=
         if success: LOGGER.info('Exported HTML file to: ' + os.path.abspath(htmlOutputPath))
 
     # convert HTML to the Rich Text format of Unity3D
-    LOGGER.debug('Converting HTML to Unity Rich Text format...')
-    htmlParser.feed(htmlCode)
-    richText = htmlParser.getRichText()
-    LOGGER.debug('Finished converting.')
+    if htmlParser is None:
+        richText = htmlCode
+    else:
+        LOGGER.debug('Converting HTML to Unity Rich Text format...')
+        htmlParser.feed(htmlCode)
+        richText = htmlParser.getRichText()
+        LOGGER.debug('Finished converting.')
 
     # export Rich Text result to file
     LOGGER.debug('Exporting result to file...')
@@ -246,18 +420,122 @@ def convertFile(htmlParser, filePath, outputFolder, exportHTML=False, overwrite=
     # return file path on success
     if success:
         LOGGER.info('Exported RT file to: ' + os.path.abspath(outFilePath))
-        return outFilePath
+        if LINE_INDEX: writeLineIndex(outFilePath)
+        return outFilePath, None
 
-    return None
+    return None, FAILED_EXPORT
 
 
-def writeToFile(filePath, data, overwrite=False):
+def convertCode(filePath, code):
     '''
-    Write data to a file and if enabled, overwrite existing file.
-    Returns True if data was written to the file, False otherwise.
+    Converts source code that was read already (e.g. by another tool)
+    to the rich text format using the settings of this process (see initWorker).
+    Returns None if no lexer fits the file, the rich text otherwise.
     '''
-    
-    # check if file already exists
+
+    highlighter = getHighlighter(filePath)
+    if highlighter is None: return None
+    lexer, formatter = highlighter
+
+    if DIRECT_MODE:
+        return highlight(code, lexer, formatter)
+
+    htmlParser = HtmlParser(colorSchema=WORKER_SCHEMA, lineSafe=LINE_INDEX)
+    htmlParser.feed(highlight(code, lexer, formatter))
+    return htmlParser.getRichText()
+
+
+def convertFileStreaming(htmlParser, filePath, outputFolder, exportHTML=False, overwrite=False):
+    '''
+    Converts source code like convertFile but writes the results while highlighting,
+    so that neither the whole HTML code nor the whole rich text is kept in memory.
+    The source code itself is still read at once (the lexers require the whole text).
+    Returns the same as convertFile.
+    '''
+
+    highlighter = getHighlighter(filePath)
+    if highlighter is None:
+        LOGGER.error('Could not find a fitting lexer for file: {}'.format(filePath))
+        return None, FAILED_NO_LEXER
+
+    outFilePath = os.path.join(outputFolder, os.path.basename(filePath) + '.rt')
+    if not checkOutputFile(outFilePath, overwrite): return None, FAILED_EXPORT
+
+    htmlOutputPath = None
+    if exportHTML:
+        htmlOutputPath = os.path.join(outputFolder, os.path.basename(filePath) + '.html')
+        if not checkOutputFile(htmlOutputPath, overwrite): htmlOutputPath = None
+
+    lexer, formatter = highlighter
+    with open(filePath, "r") as codeFile:
+        code = codeFile.read()
+
+    # write to temporary files first so that no partial files remain on errors
+    tmpPaths = [outFilePath + '.tmp']
+    if not htmlOutputPath is None: tmpPaths.append(htmlOutputPath + '.tmp')
+
+    LOGGER.debug('Highlighting and converting file while writing: {}'.format(filePath))
+    try:
+        with open(tmpPaths[0], "w") as outFile, \
+            (open(tmpPaths[1], "w") if len(tmpPaths) > 1 else contextlib.nullcontext()) as htmlFile:
+
+            if htmlParser is None:
+                formatter.format(lexer.get_tokens(code), outFile)
+            else:
+                stream = HtmlStreamWriter(htmlParser, outFile, htmlFile)
+                formatter.format(lexer.get_tokens(code), stream)
+                stream.close()
+
+    except Exception as ex:
+        LOGGER.error('Failed to write data to file! ({})'.format(outFilePath))
+        LOGGER.error(str(ex))
+        for tmpPath in tmpPaths:
+            if os.path.exists(tmpPath): os.remove(tmpPath)
+        return None, FAILED_EXPORT
+
+    if not htmlOutputPath is None:
+        os.replace(tmpPaths[1], htmlOutputPath)
+        LOGGER.info('Exported HTML file to: ' + os.path.abspath(htmlOutputPath))
+
+    os.replace(tmpPaths[0], outFilePath)
+    LOGGER.info('Exported RT file to: ' + os.path.abspath(outFilePath))
+    if LINE_INDEX: writeLineIndex(outFilePath)
+    return outFilePath, None
+
+
+def writeLineIndex(outFilePath):
+    '''
+    Writes the byte offset of each line of the exported file
+    to a JSON file next to it (same name with additional ".idx" extension).
+    Together with closed color tags at each line end (lineSafe),
+    a client can read single lines without loading the whole file.
+    '''
+
+    offsets = [0]
+    position = 0
+    with open(outFilePath, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            lineEnd = block.find(b'\n')
+            while lineEnd >= 0:
+                offsets.append(position + lineEnd + 1)
+                lineEnd = block.find(b'\n', lineEnd + 1)
+            position += len(block)
+
+    # no line starts after a final line break
+    if offsets[-1] == position and len(offsets) > 1: offsets.pop()
+
+    indexPath = outFilePath + '.idx'
+    with open(indexPath, 'w') as file:
+        json.dump({'version': 1, 'size': position, 'lines': len(offsets), 'offsets': offsets}, file)
+    LOGGER.debug('Exported line index to: {}'.format(indexPath))
+
+
+def checkOutputFile(filePath, overwrite=False):
+    '''
+    Checks if data can be written to the file (it does not exist or shall be overwritten).
+    Returns True if so, False otherwise.
+    '''
+
     if os.path.isfile(filePath):
         if overwrite:
             LOGGER.warning('File already exists. Overwriting it. ({})'.format(filePath))
@@ -265,6 +543,19 @@ def writeToFile(filePath, data, overwrite=False):
             LOGGER.error('File already exists! ({})'.format(filePath))
             return False
 
+    return True
+
+
+def writeToFile(filePath, data, overwrite=False):
+    '''
+    Write data to a file and if enabled, overwrite existing file.
+    Returns True if data was written to the file, False otherwise.
+    '''
+    
+    # check if file already exists
+    if not checkOutputFile(filePath, overwrite):
+        return False
+
     # try to perform export to file
     try:
         with open(filePath, "w") as outFile:
@@ -282,26 +573,59 @@ def highlightCode(file, code):
     Highlight the passed code and returns formatted HTML code.
     - code: string
     - file: file
-    Returns the highlighted code in HTML format or None on errors.
+    Returns the highlighted code in HTML format
+    (rich text format in direct mode) or None on errors.
+    '''
+
+    highlighter = getHighlighter(file.name)
+    if highlighter is None:
+        LOGGER.error('Could not find a fitting lexer for file: {}'.format(file.name))
+        return None
+
+    lexer, formatter = highlighter
+    return highlight(code, lexer, formatter)
+
+
+def getHighlighter(fileName):
     '''
+    Returns a tuple (lexer, formatter) for the file or None if no lexer fits.
+    Both are created once per file extension and reused afterwards.
+    Files that match a lexer pattern which does not only depend
+    on the extension (e.g. "CMakeLists.txt") are cached by their name instead.
+    '''
+
+    global SPECIAL_PATTERNS
+    if SPECIAL_PATTERNS is None:
+        SPECIAL_PATTERNS = []
+        for _, _, patterns, _ in get_all_lexers():
+            for pattern in patterns:
+                if not pattern.startswith('*.') or any(c in pattern[2:] for c in './*'):
+                    SPECIAL_PATTERNS.append(pattern)
+
+    baseName = os.path.basename(fileName)
+    extension = os.path.splitext(baseName)[1]
+    key = extension
+    if len(extension) == 0 or any(fnmatch.fnmatchcase(baseName, pattern) for pattern in SPECIAL_PATTERNS):
+        key = baseName
 
-    lexer = None
-    formatter = None
+    if key in HIGHLIGHTERS:
+        return HIGHLIGHTERS[key]
 
     try:
         # http://pygments.org/docs/api/#pygments.lexers.get_lexer_for_filename
-        lexer = get_lexer_for_filename(file.name)
+        lexer = get_lexer_for_filename(fileName)
         LOGGER.info('Found fitting lexer: {}, {}'.format(lexer.name, lexer.mimetypes))
     except ClassNotFound as cnf:
-        LOGGER.error('Could not find a fitting lexer for file: {}'.format(file.name))
-        #LOGGER.error(str(cnf))
+        HIGHLIGHTERS[key] = None
         return None
 
     # http://pygments.org/docs/api/#pygments.formatters.get_formatter_for_filename
     # get_formatter_for_filename(file.name)
-    formatter = HtmlFormatter()
+    if DIRECT_MODE: formatter = RichTextFormatter(colorschema=WORKER_SCHEMA, linesafe=LINE_INDEX)
+    else: formatter = HtmlFormatter()
 
-    return highlight(code, lexer, formatter)
+    HIGHLIGHTERS[key] = (lexer, formatter)
+    return HIGHLIGHTERS[key]
 
 
 def prepareParser(parser):
@@ -319,7 +643,7 @@ def prepareParser(parser):
         help='Path of the exported files')
 
     parser.add_argument('-c', '-cs', '-colorschema', '--colorschema', required=True, type=str,
-        help='Path to a JSON file that contains a JSON Object with key = class and value = color value')
+        help='Path to a JSON file that contains a JSON Object with key = class and value = color value (or to a Pygments style, e.g. "schema/monokai.py")')
 
     parser.add_argument('-lf', '-logfile', '--logfile', required=False, type=str, default="logging",
         help='Path and name of the log file. Set empty to disable logging to a file.')
@@ -329,6 +653,21 @@ def prepareParser(parser):
     parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
         help='Add this flag to overwrite output files that already exist')
 
+    parser.add_argument('-d', '-direct', '--direct', required=False, action='store_true',
+        help='Add this flag to format the tokens directly to rich text (faster, merges tags of the same color)')
+
+    parser.add_argument('-i', '-incremental', '--incremental', required=False, action='store_true',
+        help='Add this flag to only convert files of a folder that changed since the last run (and remove outputs of deleted files)')
+
+    parser.add_argument('-sl', '-stream_limit', '--stream_limit', required=False, type=float, default=8,
+        help='Size in MB above which files are converted while writing to keep the memory use low (0 = all files)')
+
+    parser.add_argument('-li', '-line_index', '--line_index', required=False, action='store_true',
+        help='Add this flag to close color tags at line ends and export the byte offset of each line (".rt.idx" file)')
+
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes to convert the files of a folder with (0 = number of CPUs)')
+
     parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
         help='Add this flag for verbose output (debug logging enabled)')
 
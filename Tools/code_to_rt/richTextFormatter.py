@@ -0,0 +1,105 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Pygments formatter that writes the Rich Text Syntax of Unity directly
+# (no HTML output that has to be parsed again).
+
+from pygments.formatter import Formatter
+from pygments.util import get_bool_opt
+
+from colorSchema import ColorSchema
+
+
+def colorLines(text, color):
+    '''
+    Returns the text in a color tag that is closed at the end of each line
+    and opened again in the next one, so that each line can be shown on its own.
+    Empty lines get no tag.
+    '''
+
+    startTag = '<color={}>'.format(color)
+    return '\n'.join(startTag + line + '</color>' if len(line) > 0 else line for line in text.split('\n'))
+
+
+class RichTextFormatter(Formatter):
+    '''
+    Formats the tokens to the Rich Text Syntax of Unity.
+    For format information see: https://docs.unity3d.com/Manual/StyledText.html
+
+    Adjacent tokens of the same color are merged into a single color tag.
+    Whitespace between them (except line breaks) is moved into the tag as well.
+
+    Options:
+    - colorschema: ColorSchema or color value for each CSS class of the tokens (e.g. {"kd": "#8000FF"}),
+      tokens without a color (see ColorSchema) are not colored
+    - linesafe: close color tags at the end of each line and open them again in the next one
+    '''
+
+    name = 'Unity Rich Text'
+    aliases = ['richtext', 'rt']
+    filenames = ['*.rt']
+
+    def __init__(self, **options):
+        Formatter.__init__(self, **options)
+
+        self.colorSchema = options.get('colorschema', {})
+        if not isinstance(self.colorSchema, ColorSchema):
+            self.colorSchema = ColorSchema(self.colorSchema)
+
+        self.lineSafe = get_bool_opt(options, 'linesafe', False)
+
+
+    def format(self, tokensource, outfile):
+
+        write = outfile.write
+        runColor = None # color of the current tokens
+        tagOpen = False # if the tag of this color is open
+        pending = '' # whitespace that follows the current tokens
+
+        for ttype, value in tokensource:
+
+            # keep whitespace in the open tag if the next token has the same color
+            if not runColor is None and value.isspace() and not '\n' in value:
+                pending += value
+                continue
+
+            color = None if value.isspace() else self.colorSchema.getColor(ttype)
+
+            if color == runColor:
+                text = pending + value
+            else:
+                if tagOpen:
+                    write('</color>')
+                    tagOpen = False
+                write(pending)
+                text = value
+                runColor = color
+            pending = ''
+
+            if runColor is None:
+                write(text)
+                continue
+
+            if not self.lineSafe:
+                if not tagOpen:
+                    write('<color={}>'.format(runColor))
+                    tagOpen = True
+                write(text)
+                continue
+
+            # close the tag at line breaks and open it again for the next text
+            for lineNo, line in enumerate(text.split('\n')):
+                if lineNo > 0:
+                    if tagOpen:
+                        write('</color>')
+                        tagOpen = False
+                    write('\n')
+                if len(line) > 0:
+                    if not tagOpen:
+                        write('<color={}>'.format(runColor))
+                        tagOpen = True
+                    write(line)
+
+        if tagOpen:
+            write('</color>')
+        write(pending)
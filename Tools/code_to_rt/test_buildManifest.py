@@ -0,0 +1,120 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the manifest of incremental conversions.
+# Run with: python -m unittest test_buildManifest
+
+import os
+import shutil
+import logging
+import tempfile
+import unittest
+
+import main
+from buildManifest import BuildManifest
+
+main.LOGGER = logging.getLogger('buildManifestTestLogger')
+
+SETTINGS = {'schema': 'abc', 'pygments': '1.0', 'mode': 'html', 'lineIndex': False}
+
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.outputFolder = os.path.join(self.folder, 'out')
+        os.mkdir(self.outputFolder)
+        self.sourcePath = self.writeFile(os.path.join(self.folder, 'Main.java'), 'class Main {}')
+        self.outFilePath = os.path.join(self.outputFolder, 'Main.java.rt')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def writeFile(self, path, content):
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def loadManifest(self, settings=SETTINGS):
+        manifest = BuildManifest(self.outputFolder, settings)
+        manifest.load()
+        return manifest
+
+    def convert(self, outFilePaths):
+        ''' Simulates a conversion of the source to the outputs and saves the manifest. '''
+
+        manifest = self.loadManifest()
+        self.assertFalse(manifest.isUpToDate(self.sourcePath, outFilePaths))
+        for path in outFilePaths: self.writeFile(path, 'output')
+        removed = manifest.add(outFilePaths[0])
+        manifest.save()
+        return removed
+
+    def test_upToDate(self):
+        self.convert([self.outFilePath])
+        self.assertTrue(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_touchedSource(self):
+        self.convert([self.outFilePath])
+        stat = os.stat(self.sourcePath)
+        os.utime(self.sourcePath, (stat.st_atime, stat.st_mtime + 10))
+        self.assertTrue(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_changedSource(self):
+        self.convert([self.outFilePath])
+        self.writeFile(self.sourcePath, 'class Main { int x; }')
+        self.assertFalse(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_changedSettings(self):
+        self.convert([self.outFilePath])
+        settings = dict(SETTINGS, mode='direct')
+        self.assertFalse(self.loadManifest(settings).isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_missingOutput(self):
+        self.convert([self.outFilePath])
+        os.remove(self.outFilePath)
+        self.assertFalse(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_outdatedOutputsRemoved(self):
+        indexPath = self.outFilePath + '.idx'
+        self.convert([self.outFilePath, indexPath])
+        removed = self.convert([self.outFilePath])
+        self.assertEqual(removed, [indexPath])
+        self.assertFalse(os.path.isfile(indexPath))
+        self.assertTrue(os.path.isfile(self.outFilePath))
+
+    def test_deletedSourcePruned(self):
+        self.convert([self.outFilePath])
+        os.remove(self.sourcePath)
+        manifest = self.loadManifest()
+        self.assertEqual(manifest.prune(), [self.outFilePath])
+        self.assertFalse(manifest.hasEntry(self.outFilePath))
+
+    def test_unsupportedSourceSkipped(self):
+        manifest = self.loadManifest()
+        fileTasks = [(self.sourcePath, self.outputFolder, False, False)]
+        self.assertFalse(manifest.isUpToDate(self.sourcePath, [self.outFilePath]))
+        main.exportFiles(fileTasks, [(None, main.FAILED_NO_LEXER)], manifest)
+        manifest.save()
+
+        manifest = self.loadManifest()
+        self.assertTrue(manifest.isUpToDate(self.sourcePath, [self.outFilePath]))
+        self.assertFalse(manifest.hasEntry(self.outFilePath))
+
+        self.writeFile(self.sourcePath, 'class Main { int x; }')
+        self.assertFalse(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+    def test_failedExportRetried(self):
+        manifest = self.loadManifest()
+        fileTasks = [(self.sourcePath, self.outputFolder, False, False)]
+        self.assertFalse(manifest.isUpToDate(self.sourcePath, [self.outFilePath]))
+        main.exportFiles(fileTasks, [(None, main.FAILED_EXPORT)], manifest)
+        manifest.save()
+
+        # e.g. an output of a previous conversion without manifest exists
+        self.writeFile(self.outFilePath, 'output')
+        self.assertFalse(self.loadManifest().isUpToDate(self.sourcePath, [self.outFilePath]))
+
+
+if __name__ == '__main__':
+    unittest.main()
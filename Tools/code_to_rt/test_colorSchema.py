@@ -0,0 +1,62 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the color schema and its token hierarchy fallback.
+# Run with: python -m unittest test_colorSchema
+
+import os
+import unittest
+
+from pygments.token import Token, Text, Keyword, Name, String, Comment, STANDARD_TYPES
+
+from colorSchema import ColorSchema, loadSchema
+
+SCHEMA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema')
+
+
+class TestColorSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = ColorSchema({'k': '#111111', 'kd': '#222222', 'n': '#333333', 's': '#444444', 'custom': '#555555'})
+
+    def test_ownColor(self):
+        self.assertEqual(self.schema.getColor(Keyword), '#111111')
+        self.assertEqual(self.schema.getColor(Keyword.Declaration), '#222222')
+
+    def test_parentColor(self):
+        self.assertEqual(self.schema.getColor(Keyword.Type), '#111111')
+        self.assertEqual(self.schema.getColor(Name.Function.Magic), '#333333')
+        self.assertEqual(self.schema.getColor(String.Escape), '#444444')
+
+    def test_notColored(self):
+        self.assertIsNone(self.schema.getColor(Token))
+        self.assertIsNone(self.schema.getColor(Text))
+        self.assertIsNone(self.schema.getColor(Comment.Single))
+
+    def test_customTokenType(self):
+        # token types created by a lexer that are no standard types
+        self.assertEqual(self.schema.getColor(Keyword.Declaration.Custom), '#222222')
+        self.assertIsNone(self.schema.getColor(Comment.Custom))
+
+    def test_classColors(self):
+        self.assertEqual(self.schema.getClassColor('kt'), '#111111')
+        self.assertEqual(self.schema.getClassColor('kd'), '#222222')
+        self.assertEqual(self.schema.getClassColor('kd kd-Custom'), '#222222')
+        self.assertEqual(self.schema.getClassColor('custom'), '#555555')
+        self.assertIsNone(self.schema.getClassColor('c1'))
+        self.assertIsNone(self.schema.getClassColor('unknown'))
+
+    def test_sameAsResolve(self):
+        for ttype, cssClass in STANDARD_TYPES.items():
+            self.assertEqual(self.schema.getColor(ttype), self.schema.resolve(ttype))
+            self.assertEqual(self.schema.getClassColor(cssClass), self.schema.resolve(ttype))
+
+    def test_pygmentsStyle(self):
+        classColors = loadSchema(os.path.join(SCHEMA_FOLDER, 'monokai.py'))
+        schema = ColorSchema(classColors)
+        self.assertEqual(schema.getColor(Keyword), classColors['k'])
+        self.assertEqual(schema.getColor(Name.Function), classColors['nf'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the HTML to rich text parser.
+# Run with: python -m unittest test_htmlParser
+
+import io
+import unittest
+
+from pygments import highlight
+from pygments.lexers import JavaLexer
+from pygments.formatters import HtmlFormatter
+
+from htmlParser import HtmlParser, HtmlStreamWriter
+
+SCHEMA = {'k': '#111111', 'kd': '#222222', 'nc': '#333333', 's': '#444444', 'c': '#555555'}
+
+JAVA_CODE = 'public class Main {\n    String text = "a < b && c";\n    /* comment */\n}\n'
+
+HTML_CODE = highlight(JAVA_CODE, JavaLexer(), HtmlFormatter())
+
+
+def parse(htmlCode, pieceSize=None, **options):
+    ''' Parses the HTML code at once or fed in pieces of the given size. '''
+
+    htmlParser = HtmlParser(colorSchema=SCHEMA, **options)
+    if pieceSize is None:
+        htmlParser.feed(htmlCode)
+    else:
+        for start in range(0, len(htmlCode), pieceSize):
+            htmlParser.feed(htmlCode[start:start + pieceSize])
+    htmlParser.close()
+    return htmlParser.getRichText()
+
+
+class TestHtmlParser(unittest.TestCase):
+
+    def test_colors(self):
+        htmlCode = '<div><pre><span class="k">public</span> <span class="nc">Main</span><span class="x">;</span>\n</pre></div>'
+        self.assertEqual(parse(htmlCode), '<color=#111111>public</color> <color=#333333>Main</color>;')
+
+    def test_defaultColor(self):
+        htmlCode = '<pre><span class="k">if</span> <span class="x">x</span></pre>'
+        richText = parse(htmlCode, set_default_color=True, default_color='#ffffff')
+        self.assertEqual(richText, '<color=#111111>if</color> <color=#ffffff>x</color>')
+
+    def test_escapedCode(self):
+        richText = parse(HTML_CODE)
+        self.assertIn('<color=#444444>"a < b && c"</color>', richText)
+        self.assertIn('<color=#555555>/* comment */</color>', richText)
+
+    def test_feedInPieces(self):
+        expected = parse(HTML_CODE)
+        for pieceSize in (1, 2, 3, 7, 64):
+            self.assertEqual(parse(HTML_CODE, pieceSize), expected, 'piece size {}'.format(pieceSize))
+
+    def test_getRichTextRepeated(self):
+        htmlParser = HtmlParser(colorSchema=SCHEMA)
+        htmlParser.feed(HTML_CODE)
+        richText = htmlParser.getRichText()
+        self.assertEqual(htmlParser.getRichText(), richText)
+
+    def test_takeRichText(self):
+        htmlParser = HtmlParser(colorSchema=SCHEMA)
+        half = HTML_CODE.index('String')
+        htmlParser.feed(HTML_CODE[:half])
+        first = htmlParser.takeRichText()
+        htmlParser.feed(HTML_CODE[half:])
+        htmlParser.close()
+        second = htmlParser.takeRichText()
+        self.assertEqual(first + second, parse(HTML_CODE))
+        self.assertEqual(htmlParser.takeRichText(), '')
+
+
+
+class TestHtmlStreamWriter(unittest.TestCase):
+
+    def test_chunkSizes(self):
+        expected = parse(HTML_CODE)
+        for chunkSize in (1, 5, 64, 1 << 16):
+            outFile = io.StringIO()
+            htmlFile = io.StringIO()
+            stream = HtmlStreamWriter(HtmlParser(colorSchema=SCHEMA), outFile, htmlFile, chunkSize=chunkSize)
+            HtmlFormatter().format(JavaLexer().get_tokens(JAVA_CODE), stream)
+            stream.close()
+
+            self.assertEqual(outFile.getvalue(), expected, 'chunk size {}'.format(chunkSize))
+            self.assertEqual(htmlFile.getvalue(), HTML_CODE)
+
+
+if __name__ == '__main__':
+    unittest.main()
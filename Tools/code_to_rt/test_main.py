@@ -0,0 +1,157 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the conversion of source files.
+# Run with: python -m unittest test_main
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+
+import main
+from colorSchema import loadSchema
+
+main.LOGGER = logging.getLogger('mainTestLogger')
+
+SCHEMA = loadSchema(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema', 'monokai.json'))
+
+SOURCES = {
+    'Main.java': 'package test;\n\npublic class Main {\n    // entry point\n    public static void main(String[] args) {\n        System.out.println("Hello " + args.length);\n    }\n}\n',
+    'tool.py': 'import os\n\ndef run(path):\n    """ Returns the size. """\n    return os.path.getsize(path) * 2\n',
+    'CMakeLists.txt': 'project(test)\nadd_executable(main main.cpp)\n',
+    'notes.unknownext': 'no lexer fits this file\n'
+}
+
+
+def readFiles(folder):
+    ''' Returns the content of each file in the folder (relative path -> content). '''
+
+    contents = {}
+    for curDir, _, files in os.walk(folder):
+        for file in files:
+            path = os.path.join(curDir, file)
+            with open(path, 'r') as f:
+                contents[os.path.relpath(path, folder)] = f.read()
+    return contents
+
+
+class TestConvertFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.sourceFolder = os.path.join(self.folder, 'src')
+        os.makedirs(os.path.join(self.sourceFolder, 'sub'))
+        for name, code in SOURCES.items():
+            self.writeFile(os.path.join(self.sourceFolder, name), code)
+            self.writeFile(os.path.join(self.sourceFolder, 'sub', name), code)
+        self.resetWorker()
+
+    def tearDown(self):
+        self.resetWorker()
+        shutil.rmtree(self.folder)
+
+    def resetWorker(self, direct=False, lineIndex=False, streamLimit=main.STREAM_LIMIT):
+        main.HIGHLIGHTERS.clear()
+        main.initWorker(SCHEMA, direct=direct, streamLimit=streamLimit, lineIndex=lineIndex)
+
+    def writeFile(self, path, content):
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def convertFolder(self, name, jobs):
+        outputFolder = os.path.join(self.folder, name)
+        os.mkdir(outputFolder)
+        self.assertIsNotNone(main.convertFiles(self.sourceFolder + os.sep, outputFolder, SCHEMA, recursive=True, jobs=jobs))
+        return readFiles(outputFolder)
+
+    def test_lexerReused(self):
+        highlighter = main.getHighlighter('Main.java')
+        self.assertIsNotNone(highlighter)
+        self.assertIs(main.getHighlighter(os.path.join('other', 'Helper.java')), highlighter)
+
+    def test_specialFileNames(self):
+        cmake = main.getHighlighter('CMakeLists.txt')
+        text = main.getHighlighter('notes.txt')
+        self.assertEqual(cmake[0].name, 'CMake')
+        self.assertNotEqual(text[0].name, 'CMake')
+        self.assertIs(main.getHighlighter(os.path.join('sub', 'CMakeLists.txt')), cmake)
+
+    def test_noLexer(self):
+        self.assertIsNone(main.getHighlighter('notes.unknownext'))
+        self.assertIn('.unknownext', main.HIGHLIGHTERS)
+
+    def test_processPool(self):
+        serial = self.convertFolder('serial', jobs=1)
+        self.resetWorker()
+        parallel = self.convertFolder('parallel', jobs=2)
+
+        self.assertEqual(parallel, serial)
+        self.assertIn(os.path.join('src', 'sub', 'Main.java.rt'), serial)
+        self.assertNotIn(os.path.join('src', 'notes.unknownext.rt'), serial)
+
+    def convertSource(self, name, outName, direct=False, streamLimit=main.STREAM_LIMIT):
+        ''' Converts a single source file with the given settings and returns the content of the outputs. '''
+
+        self.resetWorker(direct=direct, streamLimit=streamLimit)
+        outputFolder = os.path.join(self.folder, outName)
+        os.mkdir(outputFolder)
+        htmlParser = None if direct else main.HtmlParser(colorSchema=main.WORKER_SCHEMA)
+        path, failure = main.convertFile(htmlParser, os.path.join(self.sourceFolder, name), outputFolder, exportHTML=not direct)
+        self.assertIsNone(failure)
+        self.assertEqual(path, os.path.join(outputFolder, name + '.rt'))
+        return readFiles(outputFolder)
+
+    def test_streamingSameAsMemory(self):
+        for direct in (False, True):
+            mode = 'direct' if direct else 'html'
+            for name in ('Main.java', 'tool.py'):
+                inMemory = self.convertSource(name, '{}_{}_memory'.format(mode, name), direct)
+                streamed = self.convertSource(name, '{}_{}_streamed'.format(mode, name), direct, streamLimit=0)
+                self.assertEqual(streamed, inMemory, '{} ({})'.format(name, mode))
+
+    def test_streamingNoLexer(self):
+        self.resetWorker(streamLimit=0)
+        path, failure = main.convertFile(None, os.path.join(self.sourceFolder, 'notes.unknownext'), self.folder)
+        self.assertIsNone(path)
+        self.assertEqual(failure, main.FAILED_NO_LEXER)
+
+    def test_streamingExistingOutput(self):
+        self.resetWorker(direct=True, streamLimit=0)
+        outFilePath = self.writeFile(os.path.join(self.folder, 'Main.java.rt'), 'previous')
+        path, failure = main.convertFile(None, os.path.join(self.sourceFolder, 'Main.java'), self.folder)
+        self.assertEqual(failure, main.FAILED_EXPORT)
+        with open(outFilePath, 'r') as file:
+            self.assertEqual(file.read(), 'previous')
+        self.assertFalse(os.path.exists(outFilePath + '.tmp'))
+
+    def test_lineIndex(self):
+        sourcePath = self.writeFile(os.path.join(self.folder, 'Umlaut.java'), 'class Äpfel {\n    /* Größe\n       ändern */\n\n    int x = 1;\n}\n')
+        for direct in (False, True):
+            for streamLimit in (main.STREAM_LIMIT, 0):
+                self.resetWorker(direct=direct, lineIndex=True, streamLimit=streamLimit)
+                outputFolder = tempfile.mkdtemp(dir=self.folder)
+                htmlParser = None if direct else main.HtmlParser(colorSchema=main.WORKER_SCHEMA, lineSafe=True)
+                outFilePath, _ = main.convertFile(htmlParser, sourcePath, outputFolder)
+
+                with open(outFilePath, 'rb') as file:
+                    content = file.read()
+                with open(outFilePath + '.idx', 'r') as file:
+                    index = json.load(file)
+
+                lines = content.split(b'\n')
+                if len(lines[-1]) == 0: lines.pop()
+                self.assertEqual(index['size'], len(content))
+                self.assertEqual(index['lines'], 6)
+                self.assertEqual(index['lines'], len(lines))
+                offsets = [0]
+                for line in lines[:-1]: offsets.append(offsets[-1] + len(line) + 1)
+                self.assertEqual(index['offsets'], offsets)
+                for line in lines: self.assertEqual(line.count(b'<color='), line.count(b'</color>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the direct rich text formatter.
+# Run with: python -m unittest test_richTextFormatter
+
+import io
+import os
+import re
+import unittest
+
+from pygments import highlight
+from pygments.lexers import JavaLexer, PythonLexer
+from pygments.formatters import HtmlFormatter
+from pygments.token import Keyword, Name, Text
+
+from colorSchema import loadSchema
+from htmlParser import HtmlParser
+from richTextFormatter import RichTextFormatter
+
+SCHEMA = loadSchema(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema', 'monokai.json'))
+
+JAVA_CODE = 'package test;\n\npublic class Main {\n    /* multi\n       line */\n    public static void main(String[] args) {\n        System.out.println("Hello " + args.length); // end\n    }\n}\n'
+PYTHON_CODE = 'import os\n\ndef run(path):\n    """ Returns\n    the size. """\n    return os.path.getsize(path) * 2\n'
+
+TAG_PATTERN = re.compile(r'<color=([^>]*)>|</color>')
+
+
+def getCharColors(richText):
+    '''
+    Returns the text without tags and the color of each character.
+    Fails on nested or unclosed tags.
+    '''
+
+    text = []
+    colors = []
+    color = None
+    position = 0
+
+    for match in TAG_PATTERN.finditer(richText):
+        value = richText[position:match.start()]
+        text.append(value)
+        colors.extend([color] * len(value))
+        position = match.end()
+
+        if match.group(1) is None:
+            assert not color is None, 'closed tag that is not open'
+            color = None
+        else:
+            assert color is None, 'nested tag'
+            color = match.group(1)
+
+    assert color is None, 'unclosed tag'
+    value = richText[position:]
+    text.append(value)
+    colors.extend([None] * len(value))
+    return ''.join(text), colors
+
+
+def formatTokens(tokens, lineSafe=False):
+    ''' Formats the tokens with a color for keywords and names. '''
+
+    outFile = io.StringIO()
+    RichTextFormatter(colorschema={'k': '#111111', 'n': '#222222'}, linesafe=lineSafe).format(tokens, outFile)
+    return outFile.getvalue()
+
+
+def convertHtml(code, lexer, lineSafe=False):
+    ''' Converts the code like main.convertFile (HTML code parsed to rich text). '''
+
+    htmlParser = HtmlParser(colorSchema=SCHEMA, lineSafe=lineSafe)
+    htmlParser.feed(highlight(code, lexer, HtmlFormatter()))
+    return htmlParser.getRichText()
+
+
+def convertDirect(code, lexer, lineSafe=False):
+    return highlight(code, lexer, RichTextFormatter(colorschema=SCHEMA, linesafe=lineSafe))
+
+
+class TestRichTextFormatter(unittest.TestCase):
+
+    def assertSameColors(self, code, lexer):
+        ''' Asserts that both conversions keep the code and color each visible character the same. '''
+
+        directText, directColors = getCharColors(convertDirect(code, lexer))
+        htmlText, htmlColors = getCharColors(convertHtml(code, lexer))
+
+        # the HTML formatter adds a final line break
+        self.assertEqual(directText.rstrip('\n'), code.rstrip('\n'))
+        self.assertEqual(htmlText.rstrip('\n'), code.rstrip('\n'))
+
+        # whitespace may be moved into the tags of the direct formatter
+        for i, char in enumerate(code.rstrip('\n')):
+            if char.isspace(): continue
+            self.assertEqual(directColors[i], htmlColors[i], 'different color at {} ({})'.format(i, char))
+
+    def test_sameAsHtmlJava(self):
+        self.assertSameColors(JAVA_CODE, JavaLexer())
+
+    def test_sameAsHtmlPython(self):
+        self.assertSameColors(PYTHON_CODE, PythonLexer())
+
+    def test_mergedTags(self):
+        tokens = [(Keyword, 'public'), (Text, ' '), (Keyword.Declaration, 'static'), (Text, ' '), (Name, 'x'), (Text, '\n')]
+        self.assertEqual(formatTokens(tokens), '<color=#111111>public static</color> <color=#222222>x</color>\n')
+
+
+    def assertLineSafe(self, richText, code):
+        ''' Asserts that each line can be shown on its own and has the colors of the code without line safety. '''
+
+        lines = richText.split('\n')
+        for line in lines: getCharColors(line)
+
+        text, colors = getCharColors(richText)
+        expectedText, expectedColors = getCharColors(code)
+        self.assertEqual(text, expectedText)
+        for i, char in enumerate(text):
+            if char.isspace(): continue
+            self.assertEqual(colors[i], expectedColors[i], 'different color at {} ({})'.format(i, char))
+
+    def test_lineSafeDirect(self):
+        for code, lexer in ((JAVA_CODE, JavaLexer()), (PYTHON_CODE, PythonLexer())):
+            self.assertLineSafe(convertDirect(code, lexer, lineSafe=True), convertDirect(code, lexer))
+
+    def test_lineSafeHtml(self):
+        for code, lexer in ((JAVA_CODE, JavaLexer()), (PYTHON_CODE, PythonLexer())):
+            self.assertLineSafe(convertHtml(code, lexer, lineSafe=True), convertHtml(code, lexer))
+
+    def test_lineSafeTags(self):
+        tokens = [(Keyword, 'a\n\nb'), (Keyword, ' c\n'), (Name, 'x')]
+        self.assertEqual(formatTokens(tokens, lineSafe=True), '<color=#111111>a</color>\n\n<color=#111111>b c</color>\n<color=#222222>x</color>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# This tool converts a call tree exported by a profiler
+# (JProfiler XML export, e.g. "profiler_data/catena/tree.xml")
+# to regions in the format supported by the VRVis application.
+#
+# The tree is read incrementally (iterparse) and each node is
+# removed after it was processed, so that even very large exports
+# are converted without loading the whole document.
+#
+# The methods are resolved to source code regions the same way
+# as by the measurement conversion (see "../nfp_conversion/conversion.py").
+# Each region gets the properties:
+# - inclusive time (counted once for recursive calls, by the outermost call)
+# - self time
+# - number of calls
+#
+# The calls between the methods can be exported as edges as well
+# (one edge per caller and callee with the summed time and calls).
+#
+# The heaviest call paths (hot paths) and the time of each method
+# can be exported as summary (JSON) and region property as well.
+
+import os
+import sys
+import json
+import heapq
+import argparse
+from collections import namedtuple, OrderedDict
+import xml.etree.ElementTree as ET
+
+# the measurement conversion is a script in its own folder
+TOOLS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TOOLS_PATH, 'nfp_conversion'))
+
+import conversion
+import parser_and_logger
+
+LOGGER = None
+
+TIME_SCALE = 0.001 # JProfiler exports microseconds, regions use milliseconds
+PROPERTY_NAMES = ['time', 'self_time', 'calls'] # inclusive time, self time, call count
+EDGE_TYPE = 'call'
+EDGE_VALUES = ['time', 'calls'] # what the value of an edge is
+HOT_PATH_PROPERTY = 'hot_path_time' # time of the heaviest hot path through a method
+
+# a node of the call tree (method is None for nodes that are no method calls)
+CallNode = namedtuple('CallNode', ['method', 'time', 'selfTime', 'count'])
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='Convert a profiler call tree (JProfiler XML export) to regions and call edges.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    prepareParser(parser)
+    args = parser.parse_args()
+
+    global LOGGER
+    LOGGER = parser_and_logger.prepareLogger(name='calltreeLogger', logPath=args.logfile, verboseLogging=args.verbose)
+    conversion.LOGGER = LOGGER
+    conversion.EXPORT_INDENTED = not args.no_indentation
+
+    outputFolder = conversion.validateOutputPath(args.outpath)
+    if outputFolder is None: return
+
+    # read the call tree once for all statistics
+    methodStats = MethodStats()
+    collectors = [methodStats]
+    callEdges = None
+    if args.edges:
+        callEdges = CallEdges()
+        collectors.append(callEdges)
+    hotPaths = None
+    if args.hot_paths > 0:
+        hotPaths = HotPaths(args.hot_paths)
+        collectors.append(hotPaths)
+
+    try: readCallTree(args.tree, collectors)
+    except (OSError, ET.ParseError) as ex:
+        LOGGER.error('Failed to read the call tree: {} - {}'.format(args.tree, str(ex)))
+        return
+    LOGGER.info('Finished reading the call tree (nodes: {}, methods: {})'.format(methodStats.nodeCount, len(methodStats.stats)))
+
+    # find the methods in the source code
+    groupedData = groupMethodStats(methodStats.stats, args.time_scale)
+    propertyNames = list(args.property_names)
+    if not hotPaths is None:
+        addMethodValues(groupedData, hotPaths.getMethodTimes(), args.time_scale)
+        propertyNames.append(HOT_PATH_PROPERTY)
+
+    fileMethodPositions, groupedDataLink = resolveMethods(groupedData, args.program_path,
+        args.source_code_extension, jobs=args.jobs, debug=args.verbose)
+    methodLocations = getMethodLocations(fileMethodPositions, groupedDataLink)
+
+    outputFilePath = conversion.prepareOutputFile(outputFolder, args.outname, args.overwrite)
+    if not outputFilePath is None:
+        regions = conversion.createRegions(fileMethodPositions, groupedDataLink, groupedData, propertyNames)
+        regionCount = conversion.exportRegions(outputFilePath, regions)
+        LOGGER.info('Finished export to: {} (regions: {})'.format(outputFilePath, regionCount))
+
+    if not callEdges is None:
+        edgesFilePath = conversion.prepareOutputFile(outputFolder, args.edges_outname, args.overwrite)
+        if not edgesFilePath is None:
+            edges = createEdges(callEdges.stats, methodLocations, args.time_scale, args.edge_value, args.top_k)
+            exportEdges(edgesFilePath, edges)
+            LOGGER.info('Finished export to: {} (edges: {} of {})'.format(edgesFilePath, len(edges), len(callEdges.stats)))
+
+    if not hotPaths is None:
+        summaryFilePath = conversion.prepareOutputFile(outputFolder, args.summary_outname, args.overwrite)
+        if not summaryFilePath is None:
+            summary = createSummary(methodStats, hotPaths, methodLocations, args.time_scale)
+            exportSummary(summaryFilePath, summary)
+            LOGGER.info('Finished export to: {} (hot paths: {})'.format(summaryFilePath, len(summary['hot_paths'])))
+
+
+def getMethodKey(className, methodName, methodSignature=''):
+    '''
+    Returns the key of a method as used by the measurement conversion:
+    a tuple of the dot file path (e.g. "main.java.Catena") and the method name
+    with its JVM descriptor (e.g. "flap(I[B[B)[B"), so that overloaded methods are kept apart.
+    '''
+
+    return (className, methodName + (methodSignature or ''))
+
+
+def iterCallTree(treePath):
+    '''
+    Reads the call tree incrementally and yields an event for each node:
+    a tuple ("start" or "end", CallNode, depth) in document order.
+    Processed nodes are removed from the tree, so the memory usage
+    depends only on the depth of the tree and not on its size.
+    Raises an ET.ParseError if the file is no valid XML.
+    '''
+
+    elements = [] # elements of the current path (the root element first)
+    nodes = [] # call nodes of the current path
+
+    for event, element in ET.iterparse(treePath, events=('start', 'end')):
+
+        if event == 'start':
+            elements.append(element)
+            if element.tag != 'node': continue
+
+            className = element.get('class')
+            methodName = element.get('methodName')
+            method = None
+            if className and methodName:
+                method = getMethodKey(className, methodName, element.get('methodSignature'))
+
+            node = CallNode(
+                method=method,
+                time=float(element.get('time', 0)),
+                selfTime=float(element.get('selfTime', 0)),
+                count=int(element.get('count', 0))
+            )
+            nodes.append(node)
+            yield 'start', node, len(nodes)
+            continue
+
+        # end of the element: remove it from its parent
+        elements.pop()
+        element.clear()
+        if len(elements) > 0 and len(elements[-1]) > 0 and elements[-1][-1] is element:
+            del elements[-1][-1]
+
+        if element.tag == 'node':
+            yield 'end', nodes.pop(), len(nodes) + 1
+
+
+def readCallTree(treePath, collectors):
+    '''
+    Reads the call tree once and passes each method call to the collectors
+    (e.g. MethodStats and CallEdges), in document order:
+    - collector.start(node, callers) when the call starts
+    - collector.end(node, callers) when the call ends
+    The callers are the method keys of the calls on the current path (the outermost first).
+    Nodes that are no method calls are skipped, their children are called by the method above.
+    '''
+
+    callers = []
+
+    for event, node, _ in iterCallTree(treePath):
+
+        if node.method is None: continue
+
+        if event == 'start':
+            for collector in collectors: collector.start(node, callers)
+            callers.append(node.method)
+        else:
+            callers.pop()
+            for collector in collectors: collector.end(node, callers)
+
+
+class MethodStats:
+    '''
+    Sums up the times and calls of each method in the call tree (see readCallTree).
+    The inclusive time of recursive calls is only counted for the outermost call,
+    because it contains the time of the inner ones already.
+    The statistics are a dictionary of {method key: [inclusive time, self time, call count]}.
+    '''
+
+    def __init__(self):
+        self.stats = {}
+        self.activeCalls = {} # number of calls of each method in the current path
+        self.nodeCount = 0
+
+
+    def start(self, node, callers):
+
+        self.nodeCount += 1
+        stats = self.stats.get(node.method)
+        if stats is None:
+            stats = [0.0, 0.0, 0]
+            self.stats[node.method] = stats
+
+        active = self.activeCalls.get(node.method, 0)
+        if active == 0: stats[0] += node.time
+        stats[1] += node.selfTime
+        stats[2] += node.count
+        self.activeCalls[node.method] = active + 1
+
+
+    def end(self, node, callers):
+        self.activeCalls[node.method] -= 1
+
+
+class CallEdges:
+    '''
+    Collapses the calls of the call tree (see readCallTree) into one edge per caller and callee,
+    no matter in how many contexts the same call occurs.
+    The time of an edge is the inclusive time of the callee when called by the caller.
+    Like for MethodStats, it is only counted for the outermost of nested calls of the same edge.
+    The statistics are a dictionary of {(caller key, callee key): [time, call count]}.
+    '''
+
+    def __init__(self):
+        self.stats = {}
+        self.activeEdges = {} # number of calls of each edge in the current path
+        self.edgePath = [] # edge of each call in the current path (None for calls without caller)
+
+
+    def start(self, node, callers):
+
+        if len(callers) == 0:
+            self.edgePath.append(None)
+            return
+
+        edge = (callers[-1], node.method)
+        self.edgePath.append(edge)
+
+        stats = self.stats.get(edge)
+        if stats is None:
+            stats = [0.0, 0]
+            self.stats[edge] = stats
+
+        active = self.activeEdges.get(edge, 0)
+        if active == 0: stats[0] += node.time
+        stats[1] += node.count
+        self.activeEdges[edge] = active + 1
+
+
+    def end(self, node, callers):
+
+        edge = self.edgePath.pop()
+        if not edge is None: self.activeEdges[edge] -= 1
+
+
+class HotPaths:
+    '''
+    Finds the heaviest paths from a root call to a leaf call (a call without further calls)
+    in the call tree (see readCallTree).
+    The weight of a path is the inclusive time of its leaf call,
+    which is contained in the time of each call on the path.
+    Only the top K paths are kept (min-heap), so the memory does not depend on the tree size.
+    Also sums up the time of the root calls (total time).
+    '''
+
+    def __init__(self, topK):
+        '''
+        Parameters:
+        - topK: number of paths to keep
+        '''
+
+        self.topK = topK
+        self.heap = [] # entries (time, -index, path, calls) with the lightest path first
+        self.hasCalls = [] # if each call of the current path has calls itself
+        self.leafCount = 0
+        self.totalTime = 0.0
+
+
+    def start(self, node, callers):
+
+        if len(self.hasCalls) > 0: self.hasCalls[-1] = True
+        else: self.totalTime += node.time
+        self.hasCalls.append(False)
+
+
+    def end(self, node, callers):
+
+        if self.hasCalls.pop(): return
+
+        # leaf call (the path is only created if it is one of the heaviest)
+        self.leafCount += 1
+        if len(self.heap) < self.topK:
+            heapq.heappush(self.heap, (node.time, -self.leafCount, tuple(callers) + (node.method,), node.count))
+        elif node.time > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (node.time, -self.leafCount, tuple(callers) + (node.method,), node.count))
+
+
+    def getPaths(self):
+        ''' Returns the paths as tuples (time, method keys from the root call, leaf calls), the heaviest first. '''
+
+        return [(time, path, count) for time, _, path, count in sorted(self.heap, reverse=True)]
+
+
+    def getMethodTimes(self):
+        ''' Returns the time of the heaviest path through each method of the paths. '''
+
+        methodTimes = {}
+        for time, path, _ in self.getPaths():
+            for method in path:
+                if not method in methodTimes: methodTimes[method] = time
+        return methodTimes
+
+
+def loadMethodStats(treePath):
+    '''
+    Reads the call tree and returns the statistics of each method (see MethodStats).
+    Raises an ET.ParseError if the file is no valid XML.
+    '''
+
+    methodStats = MethodStats()
+    readCallTree(treePath, [methodStats])
+    return methodStats.stats
+
+
+def groupMethodStats(methodStats, timeScale=TIME_SCALE):
+    '''
+    Groups the method statistics like the loaded measurements (see conversion.loadMeasurements),
+    with one single value array per property:
+    - dotFilePath: methodName: [[inclusive time], [self time], [call count]]
+    Times are multiplied by the time scale.
+    '''
+
+    groupedData = {}
+    for (dotFilePath, methodName), (inclusiveTime, selfTime, count) in methodStats.items():
+        groupedData.setdefault(dotFilePath, {})[methodName] = [
+            [round(inclusiveTime * timeScale, conversion.DECIMALS_AFTER_COMMA)],
+            [round(selfTime * timeScale, conversion.DECIMALS_AFTER_COMMA)],
+            [count]
+        ]
+    return groupedData
+
+
+def addMethodValues(groupedData, methodValues, timeScale=TIME_SCALE):
+    '''
+    Adds a property value to each method of the grouped statistics (see groupMethodStats).
+    Methods without value get zero.
+
+    Parameters:
+    - methodValues: time per method key (e.g. HotPaths.getMethodTimes)
+    - timeScale: factor to convert the times of the call tree to milliseconds
+    '''
+
+    for dotFilePath, methods in groupedData.items():
+        for methodName, values in methods.items():
+            value = methodValues.get((dotFilePath, methodName), 0.0)
+            values.append([round(value * timeScale, conversion.DECIMALS_AFTER_COMMA)])
+
+
+def resolveMethods(groupedData, programPath, srcCodeExtension, jobs=1, debug=False):
+    '''
+    Searches for the methods of the grouped statistics (see groupMethodStats) in the source files
+    like the measurement conversion does (see conversion.convert).
+    Returns a tuple of fileMethodPositions and groupedDataLink (see conversion.mergeMethodPositions).
+
+    Parameters:
+    - programPath: path to folder with program files the call tree refers to (e.g. "src")
+    - srcCodeExtension: extension of source code files (e.g. ".java")
+    - jobs: number of processes to search for methods with (0 = one per CPU)
+    '''
+
+    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
+    tasks = conversion.collectSourceFiles(programPath, srcCodeExtension, groupedData, debug)
+    results = conversion.resolveMethodPositions(tasks, jobs=jobs, debug=debug)
+
+    # classes without source file (e.g. of the JDK) are expected
+    resolved = set(dataPath for task in tasks for dataPath in task['dataPaths'].values())
+    LOGGER.info('Types found in source files: {} of {}'.format(len(resolved), len(groupedData)))
+    if debug:
+        for dotFilePath in sorted(set(groupedData) - resolved):
+            LOGGER.debug('Type not found in source files: {}'.format(dotFilePath))
+
+    return conversion.mergeMethodPositions(tasks, results)
+
+
+def getMethodLocations(fileMethodPositions, groupedDataLink):
+    ''' Returns the location and position ({from, to}) of each found method by its method key. '''
+
+    methodLocations = {}
+    for location, methodLinks in groupedDataLink.items():
+        for regionMethod, methodKey in methodLinks.items():
+            methodLocations[methodKey] = (location, fileMethodPositions[location][regionMethod])
+    return methodLocations
+
+
+def getEdgePoint(location, position):
+    ''' Returns the start or end point of an edge (see "Documentation/file-specs/edges.md"). '''
+
+    lines = OrderedDict([('from', position['from'])])
+    if 'to' in position: lines['to'] = position['to']
+    return OrderedDict([('file', location), ('lines', lines)])
+
+
+def getMethodLabel(methodKey):
+    ''' Returns a short name of the method (e.g. "Catena.flap"). '''
+
+    className, method = methodKey
+    return className.rsplit('.', 1)[-1] + '.' + method.split('(', 1)[0]
+
+
+def createEdges(edgeStats, methodLocations, timeScale=TIME_SCALE, edgeValue='time', topK=0):
+    '''
+    Creates the edges between the found methods (see CallEdges).
+    Calls of or to methods without source code are skipped.
+    Returns a list of edges (JSON objects).
+
+    Parameters:
+    - edgeStats: statistics of each edge (see CallEdges)
+    - methodLocations: location and position of each found method (see getMethodLocations)
+    - timeScale: factor to convert the times of the call tree to milliseconds
+    - edgeValue: value of the edges ("time" or "calls")
+    - topK: only create the edges with the highest values (0 for all)
+    '''
+
+    edges = [(edge, stats) for edge, stats in edgeStats.items()
+        if edge[0] in methodLocations and edge[1] in methodLocations]
+
+    valueIndex = EDGE_VALUES.index(edgeValue)
+    if topK > 0 and topK < len(edges):
+        edges = heapq.nlargest(topK, edges, key=lambda entry: entry[1][valueIndex])
+
+    edgeEntries = []
+    for (caller, callee), (time, count) in edges:
+        time = round(time * timeScale, conversion.DECIMALS_AFTER_COMMA)
+        edgeEntries.append(OrderedDict([
+            ('type', EDGE_TYPE),
+            ('label', '{} -> {}'.format(getMethodLabel(caller), getMethodLabel(callee))),
+            ('from', getEdgePoint(*methodLocations[caller])),
+            ('to', getEdgePoint(*methodLocations[callee])),
+            ('value', time if edgeValue == 'time' else count),
+            ('time', time),
+            ('calls', count)
+        ]))
+    return edgeEntries
+
+
+def exportEdges(outputFilePath, edges):
+    ''' Writes the edges to an edge file ("edges_<name>.json"). '''
+
+    indentation = 4 if conversion.EXPORT_INDENTED else None
+    with open(outputFilePath, 'w') as file:
+        json.dump({'edges': edges}, file, indent=indentation)
+
+
+def getMethodName(methodKey):
+    ''' Returns the full name of the method (e.g. "main.java.Catena.flap(I[B[B)[B"). '''
+
+    return methodKey[0] + '.' + methodKey[1]
+
+
+def getMethodRegion(methodKey, methodLocations):
+    ''' Returns the region of a method as "location:nodes" (e.g. "src/main/java/Catena.java:12-14") or None if it was not found. '''
+
+    if not methodKey in methodLocations: return None
+    location, position = methodLocations[methodKey]
+    return '{}:{}-{}'.format(location, position['from'], position.get('to', position['from'] + 1))
+
+
+def createSummary(methodStats, hotPaths, methodLocations, timeScale=TIME_SCALE):
+    '''
+    Creates the summary of the call tree (JSON object) with the hot paths (see HotPaths)
+    and the time of each method, sorted by self time (the heaviest first).
+    Methods are given by their full name and region (None if not found in the source code).
+    '''
+
+    scale = lambda value: round(value * timeScale, conversion.DECIMALS_AFTER_COMMA)
+
+    paths = []
+    for time, path, count in hotPaths.getPaths():
+        paths.append(OrderedDict([
+            ('time', scale(time)),
+            ('calls', count),
+            ('methods', [getMethodName(method) for method in path]),
+            ('regions', [getMethodRegion(method, methodLocations) for method in path])
+        ]))
+
+    methods = []
+    for method, (inclusiveTime, selfTime, count) in sorted(methodStats.stats.items(), key=lambda entry: -entry[1][1]):
+        methods.append(OrderedDict([
+            ('method', getMethodName(method)),
+            ('region', getMethodRegion(method, methodLocations)),
+            ('time', scale(inclusiveTime)),
+            ('self_time', scale(selfTime)),
+            ('calls', count)
+        ]))
+
+    return OrderedDict([
+        ('total_time', scale(hotPaths.totalTime)),
+        ('nodes', methodStats.nodeCount),
+        ('leaves', hotPaths.leafCount),
+        ('hot_paths', paths),
+        ('methods', methods)
+    ])
+
+
+def exportSummary(outputFilePath, summary):
+    ''' Writes the summary (see createSummary) to a JSON file. '''
+
+    indentation = 4 if conversion.EXPORT_INDENTED else None
+    with open(outputFilePath, 'w') as file:
+        json.dump(summary, file, indent=indentation)
+
+
+def prepareParser(parser):
+    ''' Prepares the argument parser by adding required arguments to it. '''
+
+    parser.add_argument('-t', '-tree', '--tree', required=True, type=str,
+        help='Path to the call tree (XML export of JProfiler, e.g. "profiler_data/catena/tree.xml")')
+
+    parser.add_argument('-pp', '-ppath', '--program_path', required=True, type=str,
+        help='Path to the folder with the source code of the profiled program (e.g. "src")')
+
+    parser.add_argument('-op', '-opath', '--outpath', required=False, type=str, default='.',
+        help='Path to the folder to write the region file to')
+
+    parser.add_argument('-on', '-oname', '--outname', required=False, type=str, default='regions_profile.json',
+        help='Name of the region file')
+
+    parser.add_argument('-sce', '-sc_extension', '--source_code_extension', required=False, type=str, default='.java',
+        help='Extension of the source code files')
+
+    parser.add_argument('-ts', '-time_scale', '--time_scale', required=False, type=float, default=TIME_SCALE,
+        help='Factor to convert the times of the call tree to milliseconds')
+
+    parser.add_argument('-pn', '-pnames', '--property_names', required=False, type=str, nargs=3, default=PROPERTY_NAMES,
+        help='Names of the properties for inclusive time, self time and call count')
+
+    parser.add_argument('-e', '-edges', '--edges', required=False, action='store_true',
+        help='Add this flag to export the calls between the methods as edges as well')
+
+    parser.add_argument('-en', '-ename', '--edges_outname', required=False, type=str, default='edges_calls.json',
+        help='Name of the edge file')
+
+    parser.add_argument('-ev', '-evalue', '--edge_value', required=False, type=str, default='time', choices=EDGE_VALUES,
+        help='Value of the edges (summed inclusive time or number of calls)')
+
+    parser.add_argument('-k', '-top_k', '--top_k', required=False, type=int, default=0,
+        help='Only export the edges with the highest values (0 for all edges)')
+
+    parser.add_argument('-hp', '-hot_paths', '--hot_paths', required=False, type=int, default=0,
+        help='Number of hot paths to export in a summary and as region property (0 to disable)')
+
+    parser.add_argument('-sn', '-sname', '--summary_outname', required=False, type=str, default='calltree_summary.json',
+        help='Name of the summary file (hot paths and time of each method)')
+
+    parser.add_argument('-ni', '-nindentation', '--no_indentation', required=False, action='store_true',
+        help='Add this flag to disable indentation of the exported files')
+
+    parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
+        help='Add this flag to overwrite existing files')
+
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes to search for methods with (0 = number of CPUs)')
+
+    parser.add_argument('-lf', '-logfile', '--logfile', required=False, type=str, default="logging",
+        help='Path and name of the log file. Set empty to disable logging to a file.')
+
+    parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
+        help='Add this flag for verbose output (debug logging enabled)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# This tool compares two call trees exported by a profiler
+# (e.g. of two configurations, see "calltree.py").
+#
+# Both trees are read incrementally, one after another.
+# Their calls are aligned by the path of methods from the root call
+# (class, method name and signature of each call on the path),
+# using an index of all paths so that the comparison is linear in the tree sizes.
+#
+# Results:
+# - regions with the difference of each method (compared - base),
+#   e.g. to be shown with the "Green_Red_Delta" color method
+# - summary (JSON) with the call paths and methods ranked by their regression
+
+import heapq
+import argparse
+from collections import OrderedDict
+import xml.etree.ElementTree as ET
+
+# adds the measurement conversion to the path as well
+import calltree
+
+conversion = calltree.conversion
+parser_and_logger = calltree.parser_and_logger
+
+LOGGER = None
+
+PROPERTY_NAMES = ['time_delta', 'self_time_delta', 'calls_delta'] # inclusive time, self time, call count
+TOP_K = 20
+
+
+class PathIndex:
+    '''
+    Assigns an ID to each path of methods from the root call (e.g. "main -> catena -> flap").
+    A path is stored as its last method and the ID of the path of the caller,
+    so each path needs the same memory, no matter how deep it is.
+    The same index is used for both trees, so that equal paths get equal IDs.
+    '''
+
+    def __init__(self):
+        self.ids = {} # (caller path ID, method key) -> path ID
+        self.paths = [] # (caller path ID, method key) of each path ID
+
+
+    def getID(self, callerID, method):
+        ''' Returns the ID of the path (added if not known yet). Root calls have the caller path ID -1. '''
+
+        key = (callerID, method)
+        pathID = self.ids.get(key)
+        if pathID is None:
+            pathID = len(self.paths)
+            self.ids[key] = pathID
+            self.paths.append(key)
+        return pathID
+
+
+    def getMethods(self, pathID):
+        ''' Returns the method keys of the path, from the root call to the last one. '''
+
+        methods = []
+        while pathID >= 0:
+            pathID, method = self.paths[pathID]
+            methods.append(method)
+        methods.reverse()
+        return methods
+
+
+class PathStats:
+    '''
+    Sums up the time, self time and calls of each call path in a call tree (see calltree.readCallTree).
+    The statistics are a dictionary of {path ID: [time, self time, call count]} (see PathIndex).
+    '''
+
+    def __init__(self, pathIndex):
+        self.pathIndex = pathIndex
+        self.stats = {}
+        self.pathIDs = [] # path ID of each call in the current path
+
+
+    def start(self, node, callers):
+
+        callerID = self.pathIDs[-1] if len(self.pathIDs) > 0 else -1
+        pathID = self.pathIndex.getID(callerID, node.method)
+        self.pathIDs.append(pathID)
+
+        stats = self.stats.get(pathID)
+        if stats is None:
+            stats = [0.0, 0.0, 0]
+            self.stats[pathID] = stats
+
+        stats[0] += node.time
+        stats[1] += node.selfTime
+        stats[2] += node.count
+
+
+    def end(self, node, callers):
+        self.pathIDs.pop()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='Compare two profiler call trees (JProfiler XML exports) and export the differences.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    prepareParser(parser)
+    args = parser.parse_args()
+
+    global LOGGER
+    LOGGER = parser_and_logger.prepareLogger(name='calltreeDiffLogger', logPath=args.logfile, verboseLogging=args.verbose)
+    calltree.LOGGER = LOGGER
+    conversion.LOGGER = LOGGER
+    conversion.EXPORT_INDENTED = not args.no_indentation
+
+    outputFolder = conversion.validateOutputPath(args.outpath)
+    if outputFolder is None: return
+
+    # read both trees with the same path index
+    pathIndex = PathIndex()
+    treeStats = []
+    for treePath in (args.base, args.compare):
+        methodStats = calltree.MethodStats()
+        pathStats = PathStats(pathIndex)
+        try: calltree.readCallTree(treePath, [methodStats, pathStats])
+        except (OSError, ET.ParseError) as ex:
+            LOGGER.error('Failed to read the call tree: {} - {}'.format(treePath, str(ex)))
+            return
+        LOGGER.info('Finished reading the call tree: {} (nodes: {}, methods: {})'.format(treePath, methodStats.nodeCount, len(methodStats.stats)))
+        treeStats.append((methodStats, pathStats))
+
+    (baseMethods, basePaths), (compareMethods, comparePaths) = treeStats
+    LOGGER.info('Call paths: {} (base: {}, compared: {})'.format(len(pathIndex.paths), len(basePaths.stats), len(comparePaths.stats)))
+
+    # find the methods of both trees in the source code
+    groupedData = groupMethodDeltas(baseMethods.stats, compareMethods.stats, args.time_scale)
+    fileMethodPositions, groupedDataLink = calltree.resolveMethods(groupedData, args.program_path,
+        args.source_code_extension, jobs=args.jobs, debug=args.verbose)
+
+    outputFilePath = conversion.prepareOutputFile(outputFolder, args.outname, args.overwrite)
+    if not outputFilePath is None:
+        regions = conversion.createRegions(fileMethodPositions, groupedDataLink, groupedData, args.property_names)
+        regionCount = conversion.exportRegions(outputFilePath, regions)
+        LOGGER.info('Finished export to: {} (regions: {})'.format(outputFilePath, regionCount))
+
+    summaryFilePath = conversion.prepareOutputFile(outputFolder, args.summary_outname, args.overwrite)
+    if not summaryFilePath is None:
+        methodLocations = calltree.getMethodLocations(fileMethodPositions, groupedDataLink)
+        summary = createSummary(pathIndex, basePaths.stats, comparePaths.stats, baseMethods.stats, compareMethods.stats,
+            methodLocations, args.time_scale, args.top_k)
+        summary['base'] = args.base
+        summary['compared'] = args.compare
+        calltree.exportSummary(summaryFilePath, summary)
+        LOGGER.info('Finished export to: {} (regressions: {})'.format(summaryFilePath, len(summary['regressions'])))
+
+
+def getDeltas(baseStats, compareStats):
+    '''
+    Yields the key, base statistics, compared statistics and their difference (compared - base)
+    of each entry of the two statistics (e.g. MethodStats or PathStats).
+    Entries of only one of them are compared with zero.
+    '''
+
+    zero = [0.0, 0.0, 0]
+    for key, base in baseStats.items():
+        compared = compareStats.get(key, zero)
+        yield key, base, compared, [c - b for b, c in zip(base, compared)]
+
+    for key, compared in compareStats.items():
+        if key in baseStats: continue
+        yield key, zero, compared, list(compared)
+
+
+def groupMethodDeltas(baseStats, compareStats, timeScale=calltree.TIME_SCALE):
+    '''
+    Groups the difference of each method like calltree.groupMethodStats:
+    - dotFilePath: methodName: [[time delta], [self time delta], [calls delta]]
+    '''
+
+    deltaStats = {key: delta for key, _, _, delta in getDeltas(baseStats, compareStats)}
+    return calltree.groupMethodStats(deltaStats, timeScale)
+
+
+def createSummary(pathIndex, basePaths, comparePaths, baseMethods, compareMethods, methodLocations, timeScale=calltree.TIME_SCALE, topK=TOP_K):
+    '''
+    Creates the summary of the comparison (JSON object) with:
+    - the call paths with the highest increase (regressions) and decrease (improvements) of their self time
+    - the methods ranked by the increase of their inclusive time
+    '''
+
+    scale = lambda value: round(value * timeScale, conversion.DECIMALS_AFTER_COMMA)
+    selfDelta = lambda entry: entry[3][1]
+
+    def createEntry(base, compared, delta):
+        return [
+            ('time', OrderedDict([('base', scale(base[0])), ('compared', scale(compared[0])), ('delta', scale(delta[0]))])),
+            ('self_time', OrderedDict([('base', scale(base[1])), ('compared', scale(compared[1])), ('delta', scale(delta[1]))])),
+            ('calls', OrderedDict([('base', base[2]), ('compared', compared[2]), ('delta', delta[2])]))
+        ]
+
+    def createPathEntry(pathID, base, compared, delta):
+        methods = pathIndex.getMethods(pathID)
+        return OrderedDict([
+            ('methods', [calltree.getMethodName(method) for method in methods]),
+            ('region', calltree.getMethodRegion(methods[-1], methodLocations))
+        ] + createEntry(base, compared, delta))
+
+    pathDeltas = list(getDeltas(basePaths, comparePaths))
+    regressions = [entry for entry in heapq.nlargest(topK, pathDeltas, key=selfDelta) if selfDelta(entry) > 0]
+    improvements = [entry for entry in heapq.nsmallest(topK, pathDeltas, key=selfDelta) if selfDelta(entry) < 0]
+
+    methods = []
+    for method, base, compared, delta in sorted(getDeltas(baseMethods, compareMethods), key=lambda entry: -entry[3][0]):
+        methods.append(OrderedDict([
+            ('method', calltree.getMethodName(method)),
+            ('region', calltree.getMethodRegion(method, methodLocations))
+        ] + createEntry(base, compared, delta)))
+
+    rootTime = lambda paths: sum(stats[0] for pathID, stats in paths.items() if pathIndex.paths[pathID][0] < 0)
+    baseTime, compareTime = rootTime(basePaths), rootTime(comparePaths)
+
+    return OrderedDict([
+        ('total_time', OrderedDict([('base', scale(baseTime)), ('compared', scale(compareTime)), ('delta', scale(compareTime - baseTime))])),
+        ('paths', len(pathIndex.paths)),
+        ('regressions', [createPathEntry(*entry) for entry in regressions]),
+        ('improvements', [createPathEntry(*entry) for entry in improvements]),
+        ('methods', methods)
+    ])
+
+
+def prepareParser(parser):
+    ''' Prepares the argument parser by adding required arguments to it. '''
+
+    parser.add_argument('-b', '-base', '--base', required=True, type=str,
+        help='Path to the call tree to compare with (e.g. of the default configuration)')
+
+    parser.add_argument('-c', '-compare', '--compare', required=True, type=str,
+        help='Path to the call tree to compare (differences are "compared - base")')
+
+    parser.add_argument('-pp', '-ppath', '--program_path', required=True, type=str,
+        help='Path to the folder with the source code of the profiled program (e.g. "src")')
+
+    parser.add_argument('-op', '-opath', '--outpath', required=False, type=str, default='.',
+        help='Path to the folder to write the files to')
+
+    parser.add_argument('-on', '-oname', '--outname', required=False, type=str, default='regions_profile_delta.json',
+        help='Name of the region file')
+
+    parser.add_argument('-sn', '-sname', '--summary_outname', required=False, type=str, default='calltree_diff.json',
+        help='Name of the summary file (ranked regressions)')
+
+    parser.add_argument('-sce', '-sc_extension', '--source_code_extension', required=False, type=str, default='.java',
+        help='Extension of the source code files')
+
+    parser.add_argument('-ts', '-time_scale', '--time_scale', required=False, type=float, default=calltree.TIME_SCALE,
+        help='Factor to convert the times of the call trees to milliseconds')
+
+    parser.add_argument('-pn', '-pnames', '--property_names', required=False, type=str, nargs=3, default=PROPERTY_NAMES,
+        help='Names of the properties for the difference of inclusive time, self time and call count')
+
+    parser.add_argument('-k', '-top_k', '--top_k', required=False, type=int, default=TOP_K,
+        help='Number of regressions and improvements in the summary')
+
+    parser.add_argument('-ni', '-nindentation', '--no_indentation', required=False, action='store_true',
+        help='Add this flag to disable indentation of the exported files')
+
+    parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
+        help='Add this flag to overwrite existing files')
+
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes to search for methods with (0 = number of CPUs)')
+
+    parser.add_argument('-lf', '-logfile', '--logfile', required=False, type=str, default="logging",
+        help='Path and name of the log file. Set empty to disable logging to a file.')
+
+    parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
+        help='Add this flag for verbose output (debug logging enabled)')
+
+
+if __name__ == '__main__':
+    main()
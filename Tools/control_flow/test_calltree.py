@@ -0,0 +1,288 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the call tree conversion.
+# The statistics read incrementally are compared with the ones of the whole document (ElementTree).
+# Run with: python -m unittest test_calltree
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import calltree
+from calltree import CallNode
+
+calltree.LOGGER = logging.getLogger('calltreeTestLogger')
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+CATENA_TREE = os.path.join(FOLDER, 'profiler_data', 'catena', 'tree.xml')
+
+# call tree with recursion, the same calls in several contexts,
+# a node that is no method call (e.g. a thread) and overloaded methods
+TEST_TREE = '''<?xml version="1.0" encoding="UTF-8"?>
+<tree type="Call Tree">
+  <node class="a.Main" methodName="main" methodSignature="()V" time="1000" selfTime="50" count="1">
+    <node class="a.Main" methodName="run" methodSignature="(I)V" time="600" selfTime="100" count="2">
+      <node class="b.Rec" methodName="rec" methodSignature="(I)I" time="500" selfTime="200" count="2">
+        <node class="b.Rec" methodName="rec" methodSignature="(I)I" time="300" selfTime="100" count="3">
+          <node class="java.lang.String" methodName="length" methodSignature="()I" time="200" selfTime="200" count="5"/>
+        </node>
+      </node>
+    </node>
+    <node time="340" selfTime="0" count="1" leaf="false">
+      <node class="a.Main" methodName="run" methodSignature="(I)V" time="340" selfTime="10" count="1">
+        <node class="b.Rec" methodName="rec" methodSignature="(I)I" time="330" selfTime="5" count="1">
+          <node class="a.Main" methodName="run" methodSignature="(I)V" time="325" selfTime="25" count="1">
+            <node class="b.Rec" methodName="rec" methodSignature="(I)I" time="300" selfTime="300" count="4"/>
+          </node>
+        </node>
+      </node>
+    </node>
+    <node class="a.Main" methodName="helper" methodSignature="(I)V" time="8" selfTime="8" count="2"/>
+    <node class="a.Main" methodName="helper" methodSignature="(J)V" time="2" selfTime="2" count="1"/>
+  </node>
+  <node class="a.Main" methodName="init" methodSignature="()V" time="40" selfTime="40" count="1"/>
+</tree>
+'''
+
+MAIN = ('a.Main', 'main()V')
+RUN = ('a.Main', 'run(I)V')
+REC = ('b.Rec', 'rec(I)I')
+LENGTH = ('java.lang.String', 'length()I')
+
+
+def getCallNode(element):
+    ''' Returns the call node of a method call element or None if it is no method call. '''
+
+    if element.tag != 'node' or not element.get('class') or not element.get('methodName'): return None
+    return CallNode(
+        method=calltree.getMethodKey(element.get('class'), element.get('methodName'), element.get('methodSignature')),
+        time=float(element.get('time', 0)),
+        selfTime=float(element.get('selfTime', 0)),
+        count=int(element.get('count', 0))
+    )
+
+
+def collectCalls(element, path=(), calls=None):
+    '''
+    Returns the method calls of the whole document in document order (reference of calltree.readCallTree):
+    a list of tuples (method keys from the root call to the call, CallNode, if the call has no further calls).
+    '''
+
+    if calls is None: calls = []
+
+    for child in element:
+        node = getCallNode(child)
+        if node is None:
+            # the calls of other nodes are calls of the method above
+            collectCalls(child, path, calls)
+            continue
+
+        index = len(calls)
+        calls.append(None)
+        callPath = path + (node.method,)
+        childCount = len(calls)
+        collectCalls(child, callPath, calls)
+        calls[index] = (callPath, node, len(calls) == childCount)
+
+    return calls
+
+
+def referenceMethodStats(calls):
+    ''' Sums up the statistics of each method, the inclusive time only for calls without the same method above. '''
+
+    stats = {}
+    for path, node, _ in calls:
+        entry = stats.setdefault(node.method, [0.0, 0.0, 0])
+        if not node.method in path[:-1]: entry[0] += node.time
+        entry[1] += node.selfTime
+        entry[2] += node.count
+    return stats
+
+
+def referenceEdgeStats(calls):
+    ''' Sums up the statistics of each edge, the time only for calls without the same edge above. '''
+
+    stats = {}
+    for path, node, _ in calls:
+        if len(path) < 2: continue
+        edge = (path[-2], path[-1])
+        entry = stats.setdefault(edge, [0.0, 0])
+        if not edge in zip(path[:-2], path[1:-1]): entry[0] += node.time
+        entry[1] += node.count
+    return stats
+
+
+def referenceHotPaths(calls, topK):
+    ''' Returns the heaviest paths to leaf calls (time, path, calls), the earlier leaf first for equal times. '''
+
+    leaves = [(-node.time, index, path, node.count) for index, (path, node, isLeaf) in enumerate(calls) if isLeaf]
+    return [(-time, path, count) for time, _, path, count in sorted(leaves)[:topK]]
+
+
+class TestCallTree(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.treePath = os.path.join(self.folder, 'tree.xml')
+        with open(self.treePath, 'w') as file:
+            file.write(TEST_TREE)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def readReference(self, treePath):
+        return collectCalls(ET.parse(treePath).getroot())
+
+    def test_events(self):
+        events = [(event, node.method, depth) for event, node, depth in calltree.iterCallTree(self.treePath)]
+        self.assertEqual(len(events), 2 * 13)
+        self.assertEqual(events[:3], [('start', MAIN, 1), ('start', RUN, 2), ('start', REC, 3)])
+        self.assertEqual(events[-1], ('end', ('a.Main', 'init()V'), 1))
+
+        # the node that is no method call keeps its depth
+        self.assertIn(('start', None, 2), events)
+        self.assertIn(('start', RUN, 3), events)
+
+    def test_calls(self):
+        calls = []
+        class Collector:
+            def start(self, node, callers): calls.append(tuple(callers) + (node.method,))
+            def end(self, node, callers): pass
+
+        calltree.readCallTree(self.treePath, [Collector()])
+        self.assertEqual(calls, [path for path, _, _ in self.readReference(self.treePath)])
+        self.assertIn((MAIN, RUN, REC, RUN, REC), calls)
+
+    def test_methodStats(self):
+        stats = calltree.loadMethodStats(self.treePath)
+        self.assertEqual(stats, referenceMethodStats(self.readReference(self.treePath)))
+
+        # recursive calls are counted by the outermost call only
+        self.assertEqual(stats[REC], [500.0 + 330.0, 605.0, 10])
+        self.assertEqual(stats[RUN], [600.0 + 340.0, 135.0, 4])
+        self.assertEqual(stats[('a.Main', 'helper(I)V')], [8.0, 8.0, 2])
+        self.assertEqual(stats[('a.Main', 'helper(J)V')], [2.0, 2.0, 1])
+
+    def test_methodStatsCatena(self):
+        self.assertEqual(calltree.loadMethodStats(CATENA_TREE), referenceMethodStats(self.readReference(CATENA_TREE)))
+
+    def test_groupMethodStats(self):
+        groupedData = calltree.groupMethodStats(calltree.loadMethodStats(self.treePath), timeScale=0.001)
+        self.assertEqual(groupedData['b.Rec']['rec(I)I'], [[0.83], [0.605], [10]])
+        self.assertEqual(sorted(groupedData['a.Main']), ['helper(I)V', 'helper(J)V', 'init()V', 'main()V', 'run(I)V'])
+
+    def test_invalidTree(self):
+        with open(self.treePath, 'w') as file:
+            file.write('<tree><node class="a.Main" methodName="main" time="1">')
+        with self.assertRaises(ET.ParseError):
+            calltree.loadMethodStats(self.treePath)
+
+
+    def readEdges(self, treePath):
+        callEdges = calltree.CallEdges()
+        calltree.readCallTree(treePath, [callEdges])
+        return callEdges.stats
+
+    def test_edgeStats(self):
+        stats = self.readEdges(self.treePath)
+        self.assertEqual(stats, referenceEdgeStats(self.readReference(self.treePath)))
+
+        # nested calls of the same edge are counted by the outermost call only
+        self.assertEqual(stats[(RUN, REC)], [830.0, 7])
+        self.assertEqual(stats[(MAIN, RUN)], [940.0, 3])
+        self.assertEqual(stats[(REC, REC)], [300.0, 3])
+        self.assertFalse(any(callee == ('a.Main', 'init()V') for _, callee in stats))
+
+    def test_edgeStatsCatena(self):
+        self.assertEqual(self.readEdges(CATENA_TREE), referenceEdgeStats(self.readReference(CATENA_TREE)))
+
+    def test_createEdges(self):
+        stats = self.readEdges(self.treePath)
+        methodLocations = {
+            MAIN: ('src/a/Main.java', {'from': 3, 'to': 10}),
+            RUN: ('src/a/Main.java', {'from': 12, 'to': 20}),
+            REC: ('src/b/Rec.java', {'from': 5})
+        }
+
+        edges = calltree.createEdges(stats, methodLocations, timeScale=0.001)
+        self.assertEqual(len(edges), 4) # methods without location (e.g. of the JDK) are skipped
+        edge = next(edge for edge in edges if edge['label'] == 'Main.run -> Rec.rec')
+        self.assertEqual(edge['type'], calltree.EDGE_TYPE)
+        self.assertEqual(edge['from'], {'file': 'src/a/Main.java', 'lines': {'from': 12, 'to': 20}})
+        self.assertEqual(edge['to'], {'file': 'src/b/Rec.java', 'lines': {'from': 5}})
+        self.assertEqual((edge['value'], edge['time'], edge['calls']), (0.83, 0.83, 7))
+
+        edges = calltree.createEdges(stats, methodLocations, edgeValue='calls', topK=2)
+        self.assertEqual([(edge['label'], edge['value']) for edge in edges], [('Main.run -> Rec.rec', 7), ('Main.main -> Main.run', 3)])
+
+    def test_exportEdges(self):
+        edgesPath = os.path.join(self.folder, 'edges_calls.json')
+        methodLocations = {MAIN: ('src/a/Main.java', {'from': 3}), RUN: ('src/a/Main.java', {'from': 12})}
+        calltree.exportEdges(edgesPath, calltree.createEdges(self.readEdges(self.treePath), methodLocations))
+        with open(edgesPath, 'r') as file:
+            edges = json.load(file)['edges']
+        self.assertEqual([edge['label'] for edge in edges], ['Main.main -> Main.run'])
+
+
+    def readHotPaths(self, treePath, topK):
+        hotPaths = calltree.HotPaths(topK)
+        calltree.readCallTree(treePath, [hotPaths])
+        return hotPaths
+
+    def test_hotPaths(self):
+        hotPaths = self.readHotPaths(self.treePath, 2)
+        self.assertEqual(hotPaths.getPaths(), [(300.0, (MAIN, RUN, REC, RUN, REC), 4), (200.0, (MAIN, RUN, REC, REC, LENGTH), 5)])
+        self.assertEqual(hotPaths.leafCount, 5)
+        self.assertEqual(hotPaths.totalTime, 1040.0)
+        self.assertEqual(hotPaths.getMethodTimes(), {MAIN: 300.0, RUN: 300.0, REC: 300.0, LENGTH: 200.0})
+
+    def test_hotPathsReference(self):
+        for treePath in (self.treePath, CATENA_TREE):
+            calls = self.readReference(treePath)
+            for topK in (1, 3, 10, 1000):
+                self.assertEqual(self.readHotPaths(treePath, topK).getPaths(), referenceHotPaths(calls, topK), '{} (top {})'.format(treePath, topK))
+
+    def test_deepTree(self):
+        depth = 5000
+        with open(self.treePath, 'w') as file:
+            file.write('<tree>')
+            for i in range(depth):
+                file.write('<node class="a.Deep" methodName="m{}" time="{}" selfTime="1" count="1">'.format(i % 2, depth - i))
+            file.write('</node>' * depth + '</tree>')
+
+        methodStats = calltree.MethodStats()
+        hotPaths = calltree.HotPaths(1)
+        calltree.readCallTree(self.treePath, [methodStats, hotPaths])
+        self.assertEqual(methodStats.stats[('a.Deep', 'm0')], [float(depth), depth / 2, depth // 2])
+        self.assertEqual(len(hotPaths.getPaths()[0][1]), depth)
+        self.assertEqual(hotPaths.getPaths()[0][0], 1.0)
+
+    def test_summary(self):
+        methodStats = calltree.MethodStats()
+        hotPaths = calltree.HotPaths(2)
+        calltree.readCallTree(self.treePath, [methodStats, hotPaths])
+        methodLocations = {REC: ('src/b/Rec.java', {'from': 5, 'to': 9})}
+
+        summary = calltree.createSummary(methodStats, hotPaths, methodLocations, timeScale=0.001)
+        self.assertEqual(summary['total_time'], 1.04)
+        self.assertEqual((summary['nodes'], summary['leaves']), (12, 5))
+        self.assertEqual(summary['hot_paths'][0]['methods'], ['a.Main.main()V', 'a.Main.run(I)V', 'b.Rec.rec(I)I', 'a.Main.run(I)V', 'b.Rec.rec(I)I'])
+        self.assertEqual(summary['hot_paths'][0]['regions'], [None, None, 'src/b/Rec.java:5-9', None, 'src/b/Rec.java:5-9'])
+        self.assertEqual(summary['methods'][0]['method'], 'b.Rec.rec(I)I')
+        selfTimes = [method['self_time'] for method in summary['methods']]
+        self.assertEqual(selfTimes, sorted(selfTimes, reverse=True))
+
+    def test_hotPathProperty(self):
+        groupedData = calltree.groupMethodStats(calltree.loadMethodStats(self.treePath), timeScale=0.001)
+        calltree.addMethodValues(groupedData, self.readHotPaths(self.treePath, 1).getMethodTimes(), timeScale=0.001)
+        self.assertEqual(groupedData['b.Rec']['rec(I)I'][3], [0.3])
+        self.assertEqual(groupedData['a.Main']['init()V'][3], [0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
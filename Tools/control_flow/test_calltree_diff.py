@@ -0,0 +1,142 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the comparison of two call trees.
+# Run with: python -m unittest test_calltree_diff
+
+import os
+import shutil
+import logging
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import calltree
+import calltree_diff
+from test_calltree import TEST_TREE, MAIN, RUN, REC, collectCalls
+
+calltree.LOGGER = logging.getLogger('calltreeDiffTestLogger')
+calltree_diff.LOGGER = calltree.LOGGER
+
+HELPER_J = ('a.Main', 'helper(J)V')
+
+# slower recursion, one overload less and one more
+COMPARED_TREE = TEST_TREE.replace(
+    'time="300" selfTime="300" count="4"', 'time="700" selfTime="700" count="6"').replace(
+    'methodSignature="(J)V"', 'methodSignature="(D)V"').replace(
+    'methodName="length" methodSignature="()I" time="200" selfTime="200"', 'methodName="length" methodSignature="()I" time="150" selfTime="150"')
+
+
+def referencePathStats(treePath):
+    ''' Sums up the statistics of each path of methods (reference of PathStats). '''
+
+    stats = {}
+    for path, node, _ in collectCalls(ET.parse(treePath).getroot()):
+        entry = stats.setdefault(path, [0.0, 0.0, 0])
+        entry[0] += node.time
+        entry[1] += node.selfTime
+        entry[2] += node.count
+    return stats
+
+
+class TestCallTreeDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.basePath = self.writeTree('base.xml', TEST_TREE)
+        self.comparePath = self.writeTree('compared.xml', COMPARED_TREE)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def writeTree(self, name, content):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def readTrees(self):
+        ''' Reads both trees like calltree_diff.main and returns the path index and the statistics. '''
+
+        pathIndex = calltree_diff.PathIndex()
+        treeStats = []
+        for treePath in (self.basePath, self.comparePath):
+            methodStats = calltree.MethodStats()
+            pathStats = calltree_diff.PathStats(pathIndex)
+            calltree.readCallTree(treePath, [methodStats, pathStats])
+            treeStats.append((methodStats.stats, pathStats.stats))
+        return pathIndex, treeStats
+
+    def getPathStats(self, pathIndex, pathStats):
+        return {tuple(pathIndex.getMethods(pathID)): stats for pathID, stats in pathStats.items()}
+
+    def test_pathIndex(self):
+        pathIndex = calltree_diff.PathIndex()
+        mainID = pathIndex.getID(-1, MAIN)
+        runID = pathIndex.getID(mainID, RUN)
+        self.assertEqual(pathIndex.getID(-1, MAIN), mainID)
+        self.assertNotEqual(pathIndex.getID(runID, MAIN), mainID)
+        self.assertEqual(pathIndex.getMethods(pathIndex.getID(runID, REC)), [MAIN, RUN, REC])
+
+    def test_pathStats(self):
+        pathIndex, ((_, basePaths), (_, comparePaths)) = self.readTrees()
+        self.assertEqual(self.getPathStats(pathIndex, basePaths), referencePathStats(self.basePath))
+        self.assertEqual(self.getPathStats(pathIndex, comparePaths), referencePathStats(self.comparePath))
+
+        # equal paths of both trees have the same ID
+        self.assertEqual(len(pathIndex.paths), len(basePaths) + 1)
+        self.assertEqual(set(basePaths) - set(comparePaths), {pathIndex.ids[(0, HELPER_J)]})
+
+    def test_getDeltas(self):
+        deltas = {key: (base, compared, delta) for key, base, compared, delta in calltree_diff.getDeltas(
+            {'a': [1.0, 1.0, 1], 'b': [2.0, 1.0, 3]}, {'b': [5.0, 0.5, 3], 'c': [1.0, 1.0, 2]})}
+        self.assertEqual(deltas, {
+            'a': ([1.0, 1.0, 1], [0.0, 0.0, 0], [-1.0, -1.0, -1]),
+            'b': ([2.0, 1.0, 3], [5.0, 0.5, 3], [3.0, -0.5, 0]),
+            'c': ([0.0, 0.0, 0], [1.0, 1.0, 2], [1.0, 1.0, 2])
+        })
+
+    def test_methodDeltas(self):
+        _, ((baseMethods, _), (compareMethods, _)) = self.readTrees()
+        groupedData = calltree_diff.groupMethodDeltas(baseMethods, compareMethods, timeScale=0.001)
+        self.assertEqual(groupedData['b.Rec']['rec(I)I'], [[0.0], [0.4], [2]])
+        self.assertEqual(groupedData['java.lang.String']['length()I'], [[-0.05], [-0.05], [0]])
+        self.assertEqual(groupedData['a.Main']['helper(J)V'], [[-0.002], [-0.002], [-1]])
+        self.assertEqual(groupedData['a.Main']['helper(D)V'], [[0.002], [0.002], [1]])
+
+    def test_summary(self):
+        pathIndex, ((baseMethods, basePaths), (compareMethods, comparePaths)) = self.readTrees()
+        methodLocations = {REC: ('src/b/Rec.java', {'from': 5, 'to': 9})}
+        summary = calltree_diff.createSummary(pathIndex, basePaths, comparePaths, baseMethods, compareMethods,
+            methodLocations, timeScale=0.001, topK=2)
+
+        self.assertEqual(summary['total_time'], {'base': 1.04, 'compared': 1.04, 'delta': 0.0})
+        self.assertEqual(summary['paths'], len(pathIndex.paths))
+
+        regressions = summary['regressions']
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(regressions[0]['methods'], ['a.Main.main()V', 'a.Main.run(I)V', 'b.Rec.rec(I)I', 'a.Main.run(I)V', 'b.Rec.rec(I)I'])
+        self.assertEqual(regressions[0]['region'], 'src/b/Rec.java:5-9')
+        self.assertEqual(regressions[0]['self_time'], {'base': 0.3, 'compared': 0.7, 'delta': 0.4})
+        self.assertEqual(regressions[0]['calls'], {'base': 4, 'compared': 6, 'delta': 2})
+        self.assertEqual(regressions[1]['methods'][-1], 'a.Main.helper(D)V')
+
+        improvements = summary['improvements']
+        self.assertEqual([entry['methods'][-1] for entry in improvements], ['java.lang.String.length()I', 'a.Main.helper(J)V'])
+        self.assertEqual(improvements[0]['self_time']['delta'], -0.05)
+
+        timeDeltas = [method['time']['delta'] for method in summary['methods']]
+        self.assertEqual(timeDeltas, sorted(timeDeltas, reverse=True))
+        self.assertEqual(len(summary['methods']), 8)
+
+    def test_sameTree(self):
+        self.comparePath = self.basePath
+        pathIndex, ((baseMethods, basePaths), (compareMethods, comparePaths)) = self.readTrees()
+        summary = calltree_diff.createSummary(pathIndex, basePaths, comparePaths, baseMethods, compareMethods, {})
+        self.assertEqual(summary['regressions'], [])
+        self.assertEqual(summary['improvements'], [])
+        self.assertTrue(all(method['time']['delta'] == 0 for method in summary['methods']))
+
+
+if __name__ == '__main__':
+    unittest.main()
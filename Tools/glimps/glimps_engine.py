@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Evaluates the performance-influence models of glimps
+# ("glimps_models/<class>.<method>.json" of a software system)
+# for many configurations at once and exports the predicted time
+# of each method as region property.
+#
+# All models are compiled into NumPy arrays once:
+# - the unique option changes (option, from, to) used by the terms
+# - a mask with the option changes each term requires
+# - the time of each term per method (coefficients)
+# The evaluation of all configurations is then a few array operations.
+#
+# The models are evaluated like by the VR application (see "LocalModel.cs"):
+# a term applies if each of its options changes from "from" in the first
+# to "to" in the second configuration. Its time is added to the prediction.
+
+import os
+import sys
+import json
+import argparse
+
+try: import numpy
+except ImportError: numpy = None
+
+# the measurement conversion is a script in its own folder
+TOOLS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TOOLS_PATH, 'nfp_conversion'))
+
+import conversion
+import parser_and_logger
+
+LOGGER = None
+
+MODEL_NAME = 'default' # model used of each model file
+PROPERTY_NAME = 'performance'
+
+# option types of a configuration
+OPTION_MISSING = 0
+OPTION_BINARY = 1
+OPTION_NUMERIC = 2
+OPTION_SELECT = 3
+
+
+def loadModels(modelsPath, modelName=MODEL_NAME):
+    '''
+    Loads the terms of the model with the given name from each model file in the folder.
+    The file names are the method names, including the class (e.g. "main.java.Task.prep.json").
+    Returns a list of tuples (method key, terms) with the method key (dot file path, method name).
+    '''
+
+    methodModels = []
+
+    for fileName in sorted(os.listdir(modelsPath)):
+        if not fileName.endswith('.json'): continue
+
+        with open(os.path.join(modelsPath, fileName), 'r') as file:
+            models = json.load(file).get('models', [])
+
+        terms = None
+        for model in models:
+            if model.get('name') == modelName:
+                terms = model.get('terms', [])
+                break
+
+        if terms is None:
+            LOGGER.warning('Model "{}" missing in file: {}'.format(modelName, fileName))
+            continue
+
+        dotFilePath, methodName = fileName[:-len('.json')].rsplit('.', 1)
+        methodModels.append(((dotFilePath, methodName), terms))
+
+    LOGGER.info('Loaded models: {}'.format(len(methodModels)))
+    return methodModels
+
+
+def loadConfiguration(configPath):
+    ''' Loads a configuration file (e.g. "configs/default/default.json"). '''
+
+    with open(configPath, 'r') as file:
+        configuration = json.load(file)
+
+    for key in ('binaryOptions', 'numericOptions', 'selectOptions'):
+        configuration.setdefault(key, {})
+    return configuration
+
+
+def collectConfigurations(paths):
+    '''
+    Returns the paths of the configuration files.
+    Folders are searched recursively for configuration files (JSON files with "binaryOptions").
+    '''
+
+    configPaths = []
+
+    for path in paths:
+
+        if not os.path.isdir(path):
+            configPaths.append(path)
+            continue
+
+        for curDir, subDirs, files in os.walk(path):
+            subDirs.sort()
+            for file in sorted(files):
+                if not file.endswith('.json'): continue
+                filePath = os.path.join(curDir, file)
+                try:
+                    with open(filePath, 'r') as f:
+                        if 'binaryOptions' in json.load(f): configPaths.append(filePath)
+                except (OSError, ValueError):
+                    LOGGER.debug('Skipping file: {}'.format(filePath))
+
+    return configPaths
+
+
+def getOption(configuration, optionName):
+    '''
+    Returns the type of an option and its value as text like the VR application compares it with the models:
+    as binary option ("true" if the value is 1, "false" otherwise)
+    and as numeric option (the shortest number, e.g. "5" or "0.5", binary options are 1 or 0).
+    Options that are no binary or numeric options are missing (even if they are select options).
+    '''
+
+    if optionName in configuration['binaryOptions']:
+        value = numpy.float32(1 if configuration['binaryOptions'][optionName] else 0)
+    elif optionName in configuration['numericOptions']:
+        value = numpy.float32(configuration['numericOptions'][optionName])
+    else:
+        return OPTION_MISSING, '', ''
+
+    if optionName in configuration['selectOptions']: optionType = OPTION_SELECT
+    elif optionName in configuration['binaryOptions']: optionType = OPTION_BINARY
+    else: optionType = OPTION_NUMERIC
+
+    return optionType, 'true' if value == 1 else 'false', numpy.format_float_positional(value, trim='-')
+
+
+class GlimpsEngine:
+    '''
+    Compiles the models of all methods into arrays (requires NumPy)
+    and evaluates them for many pairs of configurations at once (see evaluate).
+    '''
+
+    def __init__(self, methodModels):
+        '''
+        Parameters:
+        - methodModels: list of tuples (method key, terms) (see loadModels)
+        '''
+
+        self.methods = [method for method, _ in methodModels]
+
+        # unique option changes (option, from, to) and the ones of each term
+        self.changes = []
+        changeIndices = {}
+        termChanges = []
+        termTimes = []
+        termMethods = []
+
+        for methodIndex, (_, terms) in enumerate(methodModels):
+            for term in terms:
+                indices = set()
+                for option in term.get('options', []):
+                    change = (option['option'], str(option['from']), str(option['to']))
+                    if not change in changeIndices:
+                        changeIndices[change] = len(self.changes)
+                        self.changes.append(change)
+                    indices.add(changeIndices[change])
+                termChanges.append(indices)
+                termTimes.append(float(term.get('time', 0)))
+                termMethods.append(methodIndex)
+
+        # required option changes of each term (terms x changes)
+        self.termMask = numpy.zeros((len(termChanges), len(self.changes)), dtype=numpy.int32)
+        for termIndex, indices in enumerate(termChanges):
+            self.termMask[termIndex, list(indices)] = 1
+
+        # time of each term per method (methods x terms)
+        self.coefficients = numpy.zeros((len(self.methods), len(termChanges)), dtype=numpy.float64)
+        self.coefficients[termMethods, numpy.arange(len(termChanges))] = termTimes
+
+        # option of each change and the keys of select option values ("<option>_<VALUE>")
+        self.options = sorted(set(option for option, _, _ in self.changes))
+        optionIndices = {option: i for i, option in enumerate(self.options)}
+        self.changeOptions = numpy.array([optionIndices[option] for option, _, _ in self.changes], dtype=numpy.int64)
+        self.changeFrom = numpy.array([fromValue for _, fromValue, _ in self.changes], dtype=str)
+        self.changeTo = numpy.array([toValue for _, _, toValue in self.changes], dtype=str)
+
+        selectKeys = [option + '_' + value.upper() for option, fromValue, toValue in self.changes for value in (fromValue, toValue)]
+        self.selectKeys = sorted(set(selectKeys))
+        selectIndices = {key: i for i, key in enumerate(self.selectKeys)}
+        self.changeFromKeys = numpy.array([selectIndices[key] for key in selectKeys[0::2]], dtype=numpy.int64)
+        self.changeToKeys = numpy.array([selectIndices[key] for key in selectKeys[1::2]], dtype=numpy.int64)
+
+        LOGGER.info('Compiled models (methods: {}, terms: {}, option changes: {})'.format(
+            len(self.methods), len(termChanges), len(self.changes)))
+
+
+    def encode(self, configurations):
+        '''
+        Returns the option type of each option change (configurations x option changes)
+        and the option changes each configuration can start (as first configuration)
+        and end (as second configuration) if the option is of a type (option type -> configurations x option changes).
+        '''
+
+        count = len(configurations)
+        types = numpy.zeros((count, len(self.options)), dtype=numpy.int8)
+        binaryValues = numpy.full((count, len(self.options)), '', dtype=object)
+        numericValues = numpy.full((count, len(self.options)), '', dtype=object)
+        selectValues = numpy.zeros((count, len(self.selectKeys)), dtype=bool)
+
+        for i, configuration in enumerate(configurations):
+            for j, option in enumerate(self.options):
+                types[i, j], binaryValues[i, j], numericValues[i, j] = getOption(configuration, option)
+            binaryOptions = configuration['binaryOptions']
+            for j, key in enumerate(self.selectKeys):
+                selectValues[i, j] = bool(binaryOptions.get(key, False))
+
+        changeBinary = binaryValues.astype(str)[:, self.changeOptions]
+        changeNumeric = numericValues.astype(str)[:, self.changeOptions]
+        selectFrom = selectValues[:, self.changeFromKeys]
+        selectTo = selectValues[:, self.changeToKeys]
+
+        starts = {
+            OPTION_BINARY: changeBinary == self.changeFrom,
+            OPTION_NUMERIC: changeNumeric == self.changeFrom,
+            OPTION_SELECT: selectFrom & ~selectTo
+        }
+        ends = {
+            OPTION_BINARY: changeBinary == self.changeTo,
+            OPTION_NUMERIC: changeNumeric == self.changeTo,
+            OPTION_SELECT: ~selectFrom & selectTo
+        }
+        return types[:, self.changeOptions], starts, ends
+
+
+    def evaluate(self, configurations1, configurations2):
+        '''
+        Predicts the time of each method for each pair of configurations
+        (the i-th configuration of both lists).
+        Returns an array (pairs x methods) in the order of the methods.
+        '''
+
+        types1, starts, _ = self.encode(configurations1)
+        types2, _, ends = self.encode(configurations2)
+
+        # the option type of the first configuration decides how both are compared (like in "LocalModel.cs")
+        changed = numpy.zeros(types1.shape, dtype=bool)
+        for optionType in (OPTION_BINARY, OPTION_NUMERIC, OPTION_SELECT):
+            changed |= (types1 == optionType) & starts[optionType] & ends[optionType]
+        changed &= types2 != OPTION_MISSING
+
+        # a term applies if none of its option changes is missing
+        missing = (~changed).astype(numpy.int32) @ self.termMask.T
+        return (missing == 0).astype(numpy.float64) @ self.coefficients.T
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='Evaluate the glimps models of a software system for configurations and export the predictions as regions.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    prepareParser(parser)
+    args = parser.parse_args()
+
+    if numpy is None:
+        parser.error('NumPy is required to evaluate the models')
+
+    global LOGGER
+    LOGGER = parser_and_logger.prepareLogger(name='glimpsLogger', logPath=args.logfile, verboseLogging=args.verbose)
+    conversion.LOGGER = LOGGER
+    conversion.EXPORT_INDENTED = not args.no_indentation
+
+    outputFolder = conversion.validateOutputPath(args.outpath or args.system)
+    if outputFolder is None: return
+
+    modelsPath = args.models_path or os.path.join(args.system, 'glimps_models')
+    baseConfigPath = args.base_config or os.path.join(args.system, 'configs', 'default', 'default.json')
+    configPaths = collectConfigurations(args.configs or [os.path.join(args.system, 'configs')])
+
+    try:
+        methodModels = loadModels(modelsPath, args.model_name)
+        baseConfiguration = loadConfiguration(baseConfigPath)
+        configurations = [loadConfiguration(configPath) for configPath in configPaths]
+    except (OSError, ValueError) as ex:
+        LOGGER.error('Failed to load the models or configurations: {}'.format(str(ex)))
+        return
+
+    if len(methodModels) == 0 or len(configurations) == 0:
+        LOGGER.error('No models or configurations found.')
+        return
+
+    # each value of a region is the prediction of one configuration
+    for i, configPath in enumerate(configPaths):
+        LOGGER.info('Configuration {}: {}'.format(i, configPath))
+
+    engine = GlimpsEngine(methodModels)
+    predictions = engine.evaluate([baseConfiguration] * len(configurations), configurations)
+    predictions = numpy.round(predictions, conversion.DECIMALS_AFTER_COMMA)
+
+    # find the methods in the source code
+    groupedData = {}
+    for (dotFilePath, methodName), values in zip(engine.methods, predictions.T):
+        groupedData.setdefault(dotFilePath, {})[methodName] = values.tolist()
+
+    programPath = args.program_path
+    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
+    tasks = conversion.collectSourceFiles(programPath, args.source_code_extension, groupedData, args.verbose)
+    results = conversion.resolveMethodPositions(tasks, jobs=args.jobs, debug=args.verbose)
+    fileMethodPositions, groupedDataLink = conversion.mergeMethodPositions(tasks, results)
+    conversion.logUnusedFiles(groupedData, tasks)
+
+    outputFilePath = conversion.prepareOutputFile(outputFolder, args.outname, args.overwrite)
+    if outputFilePath is None: return
+
+    regions = conversion.createRegions(fileMethodPositions, groupedDataLink, groupedData, args.property_name)
+    regionCount = conversion.exportRegions(outputFilePath, regions)
+    LOGGER.info('Finished export to: {} (regions: {}, configurations: {})'.format(outputFilePath, regionCount, len(configurations)))
+
+
+def prepareParser(parser):
+    ''' Prepares the argument parser by adding required arguments to it. '''
+
+    parser.add_argument('-s', '-system', '--system', required=True, type=str,
+        help='Path to the software system folder (with "glimps_models" and "configs")')
+
+    parser.add_argument('-pp', '-ppath', '--program_path', required=True, type=str,
+        help='Path to the folder with the source code of the system (e.g. "src")')
+
+    parser.add_argument('-c', '-configs', '--configs', required=False, type=str, nargs='*', default=None,
+        help='Configuration files or folders to evaluate the models for (default: "configs" of the system)')
+
+    parser.add_argument('-bc', '-base_config', '--base_config', required=False, type=str, default=None,
+        help='Configuration the option changes start from (default: "configs/default/default.json" of the system)')
+
+    parser.add_argument('-mp', '-models_path', '--models_path', required=False, type=str, default=None,
+        help='Folder of the model files (default: "glimps_models" of the system)')
+
+    parser.add_argument('-mn', '-model_name', '--model_name', required=False, type=str, default=MODEL_NAME,
+        help='Name of the model to use of each model file')
+
+    parser.add_argument('-op', '-opath', '--outpath', required=False, type=str, default=None,
+        help='Path to the folder to write the region file to (default: the system folder)')
+
+    parser.add_argument('-on', '-oname', '--outname', required=False, type=str, default='regions_glimps.json',
+        help='Name of the region file')
+
+    parser.add_argument('-pn', '-pname', '--property_name', required=False, type=str, default=PROPERTY_NAME,
+        help='Name of the property with the predicted times')
+
+    parser.add_argument('-sce', '-sc_extension', '--source_code_extension', required=False, type=str, default='.java',
+        help='Extension of the source code files')
+
+    parser.add_argument('-ni', '-nindentation', '--no_indentation', required=False, action='store_true',
+        help='Add this flag to disable indentation of the region file')
+
+    parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
+        help='Add this flag to overwrite an existing region file')
+
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes to search for methods with (0 = number of CPUs)')
+
+    parser.add_argument('-lf', '-logfile', '--logfile', required=False, type=str, default="logging",
+        help='Path and name of the log file. Set empty to disable logging to a file.')
+
+    parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
+        help='Add this flag for verbose output (debug logging enabled)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the glimps engine.
+# The predictions are compared with the ones of each term evaluated like by "LocalModel.cs".
+# Run with: python -m unittest test_glimps_engine
+
+import os
+import random
+import logging
+import unittest
+
+import glimps_engine
+from glimps_engine import GlimpsEngine
+
+glimps_engine.LOGGER = logging.getLogger('glimpsEngineTestLogger')
+
+numpy = glimps_engine.numpy
+
+SYSTEM_PATH = os.path.join(glimps_engine.TOOLS_PATH, '..', 'SoftwareSystems', 'example_system')
+
+
+def getConfiguration(binaryOptions=None, numericOptions=None, selectOptions=None):
+    return {'binaryOptions': binaryOptions or {}, 'numericOptions': numericOptions or {}, 'selectOptions': selectOptions or {}}
+
+
+def getTerm(time, *options):
+    ''' Returns a term of a model with the option changes (option, from, to). '''
+    return {'options': [{'option': option, 'from': fromValue, 'to': toValue} for option, fromValue, toValue in options], 'time': time}
+
+
+def getOptionValue(configuration, optionName):
+    ''' Configuration.GetOptionValue of the VR application. '''
+
+    if optionName in configuration['binaryOptions']:
+        return 1.0 if configuration['binaryOptions'][optionName] else 0.0
+    return float(configuration['numericOptions'][optionName])
+
+
+def getNumberText(value):
+    ''' Shortest text of a float (like float.ToString of C#). '''
+    return numpy.format_float_positional(numpy.float32(value), trim='-')
+
+
+def optionChanged(config1, config2, option):
+    ''' The check of each option of a term by LocalModel.EvaluateConfigurations. '''
+
+    name = option['option']
+    hasOption = lambda config: name in config['binaryOptions'] or name in config['numericOptions']
+    if not hasOption(config1) or not hasOption(config2): return False
+
+    if name in config1['selectOptions']:
+        # keys missing in a configuration are not set (LocalModel fails for them)
+        fromKey = name + '_' + option['from'].upper()
+        toKey = name + '_' + option['to'].upper()
+        isSet = lambda config, key: config['binaryOptions'].get(key, False)
+        return isSet(config1, fromKey) and not isSet(config1, toKey) and not isSet(config2, fromKey) and isSet(config2, toKey)
+
+    if name in config1['binaryOptions']:
+        getText = lambda config: 'true' if getOptionValue(config, name) == 1 else 'false'
+    else:
+        getText = lambda config: getNumberText(getOptionValue(config, name))
+    return option['from'] == getText(config1) and option['to'] == getText(config2)
+
+
+def evaluateTerms(terms, config1, config2):
+    ''' LocalModel.EvaluateConfigurations: summed time of the terms whose option changes happened. '''
+
+    return sum(term['time'] for term in terms if all(optionChanged(config1, config2, option) for option in term['options']))
+
+
+@unittest.skipIf(numpy is None, 'requires NumPy')
+class TestGlimpsEngine(unittest.TestCase):
+
+    def evaluate(self, terms, config1, config2):
+        engine = GlimpsEngine([(('a.Task', 'run'), terms)])
+        return engine.evaluate([config1], [config2])[0, 0]
+
+    def assertSameAsTerms(self, terms, config1, config2, expected):
+        self.assertEqual(evaluateTerms(terms, config1, config2), expected)
+        self.assertEqual(self.evaluate(terms, config1, config2), expected)
+
+    def test_noOptions(self):
+        terms = [getTerm(1.5), getTerm(2.0)]
+        self.assertSameAsTerms(terms, getConfiguration(), getConfiguration(), 3.5)
+
+    def test_binary(self):
+        terms = [getTerm(1.0, ('CLEAN', 'false', 'true')), getTerm(2.0, ('CLEAN', 'true', 'false')), getTerm(4.0, ('CLEAN', 'false', 'false'))]
+        config1 = getConfiguration({'CLEAN': False})
+        self.assertSameAsTerms(terms, config1, getConfiguration({'CLEAN': True}), 1.0)
+        self.assertSameAsTerms(terms, config1, config1, 4.0)
+
+    def test_numeric(self):
+        terms = [getTerm(1.0, ('SIZE', '5', '10')), getTerm(2.0, ('SIZE', '0.5', '10')), getTerm(4.0, ('SIZE', '5.0', '10'))]
+        self.assertSameAsTerms(terms, getConfiguration(numericOptions={'SIZE': 5}), getConfiguration(numericOptions={'SIZE': 10.0}), 1.0)
+        self.assertSameAsTerms(terms, getConfiguration(numericOptions={'SIZE': 0.5}), getConfiguration(numericOptions={'SIZE': 10}), 2.0)
+
+    def test_select(self):
+        terms = [getTerm(1.0, ('MODE', 'fast', 'slow')), getTerm(2.0, ('MODE', 'slow', 'fast'))]
+        config1 = getConfiguration({'MODE': True, 'MODE_FAST': True, 'MODE_SLOW': False}, selectOptions={'MODE': 'fast'})
+        config2 = getConfiguration({'MODE': True, 'MODE_FAST': False, 'MODE_SLOW': True}, selectOptions={'MODE': 'slow'})
+        self.assertSameAsTerms(terms, config1, config2, 1.0)
+        self.assertSameAsTerms(terms, config2, config1, 2.0)
+
+        # the select option itself has to be a binary or numeric option as well
+        del config2['binaryOptions']['MODE']
+        self.assertSameAsTerms(terms, config1, config2, 0.0)
+
+    def test_missingOption(self):
+        terms = [getTerm(1.0, ('CLEAN', 'false', 'true')), getTerm(2.0, ('CLEAN', 'false', 'true'), ('OTHER', 'false', 'true'))]
+        self.assertSameAsTerms(terms, getConfiguration({'CLEAN': False}), getConfiguration({'CLEAN': True}), 1.0)
+        self.assertSameAsTerms(terms, getConfiguration({'CLEAN': False}), getConfiguration(numericOptions={'ROUNDS': 1}), 0.0)
+
+    def test_typeOfFirstConfiguration(self):
+        terms = [getTerm(1.0, ('CLEAN', 'true', 'true')), getTerm(2.0, ('CLEAN', 'true', '1')), getTerm(4.0, ('CLEAN', '1', '0'))]
+        self.assertSameAsTerms(terms, getConfiguration({'CLEAN': True}), getConfiguration(numericOptions={'CLEAN': 1}), 1.0)
+        self.assertSameAsTerms(terms, getConfiguration(numericOptions={'CLEAN': 1}), getConfiguration({'CLEAN': False}), 4.0)
+
+    def test_randomModels(self):
+        rng = random.Random(42)
+        optionValues = {
+            'A': ['true', 'false'],
+            'B': ['true', 'false'],
+            'N': ['1', '2', '0.5', '5', '10'],
+            'S': ['x', 'y', 'z'],
+            'T': ['true', 'false', '1', '0'],
+            'MISSING': ['true', 'false']
+        }
+
+        def getRandomConfiguration():
+            configuration = getConfiguration(
+                {'A': rng.random() < 0.5, 'S_X': False, 'S_Y': False, 'S_Z': False},
+                {'N': rng.choice([1, 2, 0.5, 5, 10])}, {'S': 'x'})
+            if rng.random() < 0.8: configuration['binaryOptions']['B'] = rng.random() < 0.5
+            if rng.random() < 0.8: configuration['binaryOptions']['S'] = True
+            configuration['binaryOptions']['S_' + rng.choice('XYZ')] = True
+            if rng.random() < 0.5: configuration['binaryOptions']['T'] = rng.random() < 0.5
+            else: configuration['numericOptions']['T'] = rng.choice([0, 1, 2])
+            return configuration
+
+        methodModels = []
+        for i in range(20):
+            terms = []
+            for _ in range(rng.randint(0, 8)):
+                options = rng.sample(sorted(optionValues), rng.randint(0, 3))
+                terms.append(getTerm(rng.randint(1, 100) / 4, *[(option, rng.choice(optionValues[option]), rng.choice(optionValues[option])) for option in options]))
+            methodModels.append((('a.Task', 'method{}'.format(i)), terms))
+
+        configurations1 = [getRandomConfiguration() for _ in range(300)]
+        configurations2 = [getRandomConfiguration() for _ in range(300)]
+        predictions = GlimpsEngine(methodModels).evaluate(configurations1, configurations2)
+
+        applied = 0
+        for i, (config1, config2) in enumerate(zip(configurations1, configurations2)):
+            for j, (_, terms) in enumerate(methodModels):
+                expected = evaluateTerms(terms, config1, config2)
+                self.assertAlmostEqual(predictions[i, j], expected, places=9)
+                applied += expected > 0
+        self.assertGreater(applied, 0)
+
+    def test_exampleSystem(self):
+        methodModels = glimps_engine.loadModels(os.path.join(SYSTEM_PATH, 'glimps_models'))
+        base = glimps_engine.loadConfiguration(os.path.join(SYSTEM_PATH, 'configs', 'default', 'default.json'))
+        user = glimps_engine.loadConfiguration(os.path.join(SYSTEM_PATH, 'configs', 'user', 'user.json'))
+
+        engine = GlimpsEngine(methodModels)
+        predictions = engine.evaluate([base, user], [user, user])
+        methods = [methodName for _, methodName in engine.methods]
+        self.assertEqual(predictions[0, methods.index('populate')], 6.0)
+
+        for i, (config1, config2) in enumerate([(base, user), (user, user)]):
+            for j, (_, terms) in enumerate(methodModels):
+                self.assertAlmostEqual(predictions[i, j], evaluateTerms(terms, config1, config2), places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
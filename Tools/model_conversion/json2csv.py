@@ -1,27 +1,358 @@
-import json
+# Converts a region file ("regions_<property>.json") to a model file (CSV).
+# The option columns are the features of the "app_config.json" of the system.
+#
+# The regions are read one after another and the rows are written in batches,
+# so that even very large region files are converted in constant memory.
+# With NumPy, the option matrix can be exported as sparse (COO, ".npz") or dense (".npy") matrix as well.
+
+import os
+import re
+import sys
 import csv
+import json
+import argparse
+
+try: import numpy
+except ImportError: numpy = None
+
+VALUE_COLUMN = 'performance(ms;<)'
+BATCH_SIZE = 1000 # rows written at once
+CHUNK_SIZE = 1 << 16 # characters read from the region file at once
+MATRIX_FORMATS = ['npz', 'npy']
+
+# characters of a number that could continue in the next chunk (e.g. "3." of "3.25")
+NUMBER_END = re.compile(r'[0-9.eE+-]*\Z')
+
+
+class RegionReader:
+  '''
+  Reads the entries of the "regions" array of a region file one after another
+  without loading the whole file (see "Documentation/file-specs/regions.md").
+  Other keys of the file are skipped.
+  Raises a ValueError if the file is no valid region file.
+  '''
+
+  def __init__(self, file, chunkSize=CHUNK_SIZE):
+    '''
+    Parameters:
+    - file: file object of the region file (opened in text mode)
+    - chunkSize: number of characters to read at once
+    '''
+
+    self.file = file
+    self.chunkSize = chunkSize
+    self.decoder = json.JSONDecoder()
+    self.buffer = ''
+    self.position = 0
+    self.eof = False
+
+
+  def __iter__(self):
+
+    self.expect('{')
+    if self.peek() == '}': return
+
+    while True:
+      key = self.decode()
+      self.expect(':')
+
+      if key == 'regions':
+        self.expect('[')
+        if self.peek() == ']':
+          self.position += 1
+        else:
+          while True:
+            yield self.decode()
+            if self.expect(',]') == ']': break
+      else:
+        self.decode()
+
+      if self.expect(',}') == '}': return
+
+
+  def read(self):
+    ''' Reads the next chunk into the buffer. Returns False at the end of the file. '''
+
+    if self.eof: return False
+
+    chunk = self.file.read(self.chunkSize)
+    if len(chunk) == 0:
+      self.eof = True
+      return False
+
+    self.buffer = self.buffer[self.position:] + chunk
+    self.position = 0
+    return True
+
+
+  def peek(self):
+    ''' Skips whitespace and returns the next character (empty at the end of the file). '''
+
+    while True:
+      while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+        self.position += 1
+      if self.position < len(self.buffer) or not self.read():
+        return self.buffer[self.position:self.position+1]
+
+
+  def expect(self, chars):
+    ''' Consumes the next character if it is one of chars and returns it. '''
+
+    char = self.peek()
+    if len(char) == 0 or not char in chars:
+      raise ValueError('Expected one of "{}" but found "{}"'.format(chars, char))
+    self.position += 1
+    return char
+
+
+  def decode(self):
+    ''' Decodes and returns the next JSON value. '''
+
+    self.peek()
+    while True:
+      try:
+        value, end = self.decoder.raw_decode(self.buffer, self.position)
+      except json.JSONDecodeError:
+        if self.read(): continue
+        raise
+
+      # numbers could continue in the next chunk
+      if not NUMBER_END.match(self.buffer, end) is None and self.read(): continue
+
+      self.position = end
+      return value
+
+
+def iterRegions(regionsPath, chunkSize=CHUNK_SIZE):
+  ''' Yields the regions of a region file one after another (see RegionReader). '''
+
+  with open(regionsPath, 'r') as file:
+    for region in RegionReader(file, chunkSize):
+      yield region
+
+
+def loadFeatures(appConfigPath):
+  ''' Returns the feature names of an "app_config.json". '''
+
+  with open(appConfigPath, 'r') as file:
+    return json.load(file).get('features', [])
+
+
+def getPropertyValues(region, propertyName=None):
+  ''' Returns the values of the property (the first one if no name is given) or None if the region does not have it. '''
+
+  for prop in region.get('properties', []):
+    if propertyName is None or prop.get('name') == propertyName:
+      return prop['value']
+  return None
 
-with open('regions_performance.json') as f:
-  data = json.load(f)
 
-with open('model.csv', mode='w', newline='') as model_file:
+def getValueCount(region, values, optionCount, truncate=False):
+  '''
+  Returns the number of values of the region that get a row in the model.
+  Each value needs its own option column, so more values than option columns
+  (root, features and extra columns) raise a ValueError
+  or are dropped with a warning if truncate is set.
+  '''
+
+  if len(values) <= optionCount:
+    return len(values)
+
+  message = 'Region "{}" has {} values but the model has only {} option columns (root, features and extra columns)'.format(
+    region.get('id'), len(values), optionCount)
+  if not truncate:
+    raise ValueError(message + '. Add the missing option columns with "-ec" (e.g. "-ec hash graph").')
+
+  print('Warning: {} - dropped values: {}'.format(message, len(values) - optionCount), file=sys.stderr)
+  return optionCount
+
+
+def writeModel(regions, modelPath, features, extraColumns=(), valueColumn=VALUE_COLUMN, propertyName=None, batchSize=BATCH_SIZE, verbose=False, truncate=False):
+  '''
+  Writes the values of a property of each region to a model file (CSV).
+  Each value is one row with the option of this value set to 1 (the first value is "root").
+  Returns the number of written rows.
+
+  Parameters:
+  - regions: iterable of regions (e.g. iterRegions)
+  - modelPath: path of the model file to write
+  - features: names of the option columns (e.g. "features" of the "app_config.json")
+  - extraColumns: additional option columns after the features
+  - valueColumn: name of the value column
+  - propertyName: name of the property to use (None to use the first property of each region)
+  - batchSize: number of rows to write at once
+  - verbose: print each value (except root)
+  - truncate: drop values without option column instead of raising a ValueError (see getValueCount)
+  '''
+
+  rowCount = 0
+
+  with open(modelPath, mode='w', newline='') as model_file:
     writer = csv.writer(model_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
 
-    writer.writerow(['id', 'root', 'blake2b', 'blake2b_1', 'gamma','dbg', 'brg', 'grg', 'sbrg', 'phi', 'garlic', 'lambda', 'v_id', 'd', 'hash', 'graph', 'performance(ms;<)'])
-    for region in data['regions']:
-        i = 0
-        for influence in range(len(region['properties'][0]['value'])):
-            optionList = [0 for x in range(len(region['properties'][0]['value']) + 2)]
-            optionList[i] = 1
-            if i == 0:
-                writer.writerow([region['id']] + optionList + [region['properties'][0]['value'][i]])
-            else:   
-                writer.writerow([region['id']] + optionList + [region['properties'][0]['value'][i]])
-                print("ID: " + region['id'] + "; Value: " + str(region['properties'][0]['value'][i]))    
-            i = i + 1
+    writer.writerow(['id', 'root'] + list(features) + list(extraColumns) + [valueColumn])
+    optionCount = 1 + len(features) + len(extraColumns)
+    rows = []
+
+    # the option list of each value index is the same for all regions
+    optionLists = [[1 if i == j else 0 for j in range(optionCount)] for i in range(optionCount)]
+
+    for region in regions:
+      values = getPropertyValues(region, propertyName)
+      if values is None: continue
+
+      regionId = region['id']
+      for i in range(getValueCount(region, values, optionCount, truncate)):
+        rows.append([regionId] + optionLists[i] + [values[i]])
+        if verbose and i > 0:
+          print("ID: " + regionId + "; Value: " + str(values[i]))
+
+      if len(rows) >= batchSize:
+        writer.writerows(rows)
+        rowCount += len(rows)
+        rows = []
+
+    writer.writerows(rows)
+    rowCount += len(rows)
+
+  return rowCount
+
+
+def iterModelMatrices(regions, optionCount, propertyName=None, truncate=False):
+  '''
+  Yields the rows of each region as NumPy arrays (requires NumPy):
+  a tuple (region id, option matrix, values) with the one-hot option matrix (values x options, int8)
+  built at once for all values of the region (the same rows as in the model file).
+  '''
+
+  for region in regions:
+    values = getPropertyValues(region, propertyName)
+    if values is None: continue
+
+    valueCount = getValueCount(region, values, optionCount, truncate)
+    options = numpy.eye(valueCount, optionCount, dtype=numpy.int8)
+    yield region['id'], options, numpy.asarray(values[:valueCount], dtype=numpy.float64)
+
+
+def writeModelMatrix(regions, matrixPath, features, extraColumns=(), valueColumn=VALUE_COLUMN, propertyName=None, matrixFormat='npz', truncate=False):
+  '''
+  Writes the model (see writeModel) as NumPy matrix file (requires NumPy).
+  Returns the number of rows.
+
+  Formats:
+  - npz: sparse option matrix in COO format with the arrays
+    "row", "col", "data", "shape" (e.g. for scipy.sparse.coo_matrix),
+    "values" (value of each row), "region" (region of each row as index of "ids"),
+    "ids" (region ids) and "columns" (names of the option columns and the value column)
+  - npy: dense matrix (options and value per row, float64)
+    with the column names, the region ids and their row counts
+    in a JSON file next to it (same name with additional ".json" extension)
+
+  Parameters:
+  - regions: iterable of regions (e.g. iterRegions)
+  - matrixPath: path of the matrix file to write
+  - matrixFormat: "npz" or "npy"
+  - other parameters: see writeModel
+  '''
+
+  columns = ['root'] + list(features) + list(extraColumns)
+  optionCount = len(columns)
+
+  ids = []
+  rowCounts = []
+  blocks = [] # dense rows (npy) or column indices (npz) of each region
+  valueBlocks = []
+
+  for regionId, options, values in iterModelMatrices(regions, optionCount, propertyName, truncate):
+    ids.append(regionId)
+    rowCounts.append(len(values))
+    if matrixFormat == 'npy':
+      blocks.append(numpy.hstack((options, values[:, None])))
+    else:
+      blocks.append(options.nonzero()[1])
+      valueBlocks.append(values)
+
+  rowCount = sum(rowCounts)
+
+  # written to file objects, because NumPy appends the extension to other paths
+  if matrixFormat == 'npy':
+    matrix = numpy.vstack(blocks) if len(blocks) > 0 else numpy.empty((0, optionCount + 1))
+    with open(matrixPath, 'wb') as file:
+      numpy.save(file, matrix.astype(numpy.float64, copy=False))
+    with open(matrixPath + '.json', 'w') as file:
+      json.dump({'columns': columns + [valueColumn], 'ids': ids, 'rows': rowCounts}, file)
+    return rowCount
+
+  with open(matrixPath, 'wb') as file:
+    numpy.savez_compressed(file,
+      row=numpy.arange(rowCount, dtype=numpy.int64),
+      col=numpy.concatenate(blocks).astype(numpy.int64) if len(blocks) > 0 else numpy.empty(0, dtype=numpy.int64),
+      data=numpy.ones(rowCount, dtype=numpy.int8),
+      shape=numpy.array([rowCount, optionCount], dtype=numpy.int64),
+      values=numpy.concatenate(valueBlocks) if len(valueBlocks) > 0 else numpy.empty(0),
+      region=numpy.repeat(numpy.arange(len(ids), dtype=numpy.int32), rowCounts),
+      ids=numpy.array(ids, dtype=str),
+      columns=numpy.array(columns + [valueColumn], dtype=str)
+    )
+  return rowCount
+
+
+def main():
+
+  parser = argparse.ArgumentParser(
+    description='Convert a region file to a model file (CSV) with the features of the app config as option columns.',
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter
+  )
+
+  parser.add_argument('-r', '-regions', '--regions', required=False, type=str, default='regions_performance.json',
+    help='Path to the region file to convert')
+
+  parser.add_argument('-o', '-outpath', '--outpath', required=False, type=str, default='model.csv',
+    help='Path of the model file to write')
+
+  parser.add_argument('-ac', '-app_config', '--app_config', required=False, type=str, default='app_config.json',
+    help='Path to the "app_config.json" of the system (its "features" are the option columns)')
+
+  parser.add_argument('-ec', '-extra_columns', '--extra_columns', required=False, type=str, nargs='*', default=[],
+    help='Additional option columns after the features (e.g. "hash graph")')
+
+  parser.add_argument('-pn', '-pname', '--property_name', required=False, type=str, default=None,
+    help='Name of the property to convert (default: first property of each region)')
+
+  parser.add_argument('-vc', '-value_column', '--value_column', required=False, type=str, default=VALUE_COLUMN,
+    help='Name of the value column')
+
+  parser.add_argument('-bs', '-batch_size', '--batch_size', required=False, type=int, default=BATCH_SIZE,
+    help='Number of rows to write at once')
+
+  parser.add_argument('-f', '-format', '--format', required=False, type=str, default='csv', choices=['csv'] + MATRIX_FORMATS,
+    help='Format of the model file: CSV, sparse NumPy matrix (npz, COO) or dense NumPy matrix (npy)')
+
+  parser.add_argument('-t', '-truncate', '--truncate', required=False, action='store_true',
+    help='Add this flag to drop values without option column (with a warning) instead of failing')
+
+  parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
+    help='Add this flag to print each converted value (CSV only)')
 
+  args = parser.parse_args()
 
-        
+  if args.format in MATRIX_FORMATS and numpy is None:
+    parser.error('NumPy is required for the format: {}'.format(args.format))
 
+  features = loadFeatures(args.app_config)
+  try:
+    if args.format in MATRIX_FORMATS:
+      rowCount = writeModelMatrix(iterRegions(args.regions), args.outpath, features, args.extra_columns,
+        args.value_column, args.property_name, args.format, args.truncate)
+    else:
+      rowCount = writeModel(iterRegions(args.regions), args.outpath, features, args.extra_columns,
+        args.value_column, args.property_name, max(1, args.batch_size), args.verbose, args.truncate)
+  except ValueError as ex:
+    # do not leave an incomplete model file behind
+    if os.path.isfile(args.outpath): os.remove(args.outpath)
+    sys.exit('Failed to convert: {}'.format(str(ex)))
+  print('Exported {} rows to: {}'.format(rowCount, os.path.abspath(args.outpath)))
 
 
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,175 @@
+# Tests of the region reader and the model conversion.
+# Run with: python -m unittest test_json2csv
+
+import io
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+import json2csv
+from json2csv import RegionReader
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+REGIONS = [
+  {'id': 'a1', 'location': 'src/Main.java', 'nodes': '10-50',
+    'properties': [{'type': 'nfp', 'name': 'performance', 'value': [1.5, -0.25, 1e-3, 12345678]}]},
+  {'id': 'b"2', 'location': 'src/Ä]p{fel}.java', 'nodes': [3, 7],
+    'properties': [{'type': 'nfp', 'name': 'energy', 'value': [0.5]}, {'type': 'nfp', 'name': 'performance', 'value': [2.0, 3.0]}]},
+  {'id': 'c3', 'location': 'src/Empty.java', 'nodes': [], 'properties': []}
+]
+
+# keys before and after the regions are skipped
+REGION_FILE = {'version': '1.0', 'meta': {'regions': [1, 2], 'text': '[{"x": 1}]'}, 'regions': REGIONS, 'count': 3.25}
+
+
+def readRegions(text, chunkSize=json2csv.CHUNK_SIZE):
+  return list(RegionReader(io.StringIO(text), chunkSize))
+
+
+class TestRegionReader(unittest.TestCase):
+
+  def test_chunkBoundaries(self):
+    for indent in (None, 4):
+      text = json.dumps(REGION_FILE, indent=indent, ensure_ascii=False)
+      for chunkSize in (1, 2, 3, 7, 64, json2csv.CHUNK_SIZE):
+        self.assertEqual(readRegions(text, chunkSize), REGIONS, 'chunk size {}, indent {}'.format(chunkSize, indent))
+
+  def test_numberAtChunkEnd(self):
+    # numbers must not be split (e.g. into "12" and "345" or "3." and "25")
+    text = '{"regions": [{"value": [12345, 3.25, 1.5e-3, -2E+2]}]}'
+    for chunkSize in range(1, len(text) + 1):
+      self.assertEqual(readRegions(text, chunkSize), [{'value': [12345, 3.25, 1.5e-3, -2E+2]}], 'chunk size {}'.format(chunkSize))
+
+  def test_noRegions(self):
+    for text in ('{}', ' { } ', '{"regions": []}', '{"regions": [ ]}', '{"other": [1, 2]}'):
+      self.assertEqual(readRegions(text, 2), [], text)
+
+  def test_invalidFiles(self):
+    for text in ('', '[]', '{"regions": [', '{"regions": [1 2]}', '{"regions": [1,]}', '{"regions" [1]}', '{"regions": [1]'):
+      with self.assertRaises(ValueError, msg=text):
+        readRegions(text, 3)
+
+  def test_regionFile(self):
+    path = os.path.join(FOLDER, 'regions_performance.json')
+    with open(path, 'r') as file:
+      expected = json.load(file)['regions']
+    self.assertEqual(list(json2csv.iterRegions(path, chunkSize=7)), expected)
+
+
+class TestWriteModel(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.modelPath = os.path.join(self.folder, 'model.csv')
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def readModel(self, path=None):
+    with open(path or self.modelPath, 'r', newline='') as file:
+      return list(csv.reader(file))
+
+  def test_rows(self):
+    rowCount = json2csv.writeModel(REGIONS, self.modelPath, ['f1', 'f2'], ['extra'], propertyName='performance', batchSize=1)
+    self.assertEqual(rowCount, 6)
+    self.assertEqual(self.readModel(), [
+      ['id', 'root', 'f1', 'f2', 'extra', json2csv.VALUE_COLUMN],
+      ['a1', '1', '0', '0', '0', '1.5'],
+      ['a1', '0', '1', '0', '0', '-0.25'],
+      ['a1', '0', '0', '1', '0', '0.001'],
+      ['a1', '0', '0', '0', '1', '12345678'],
+      ['b"2', '1', '0', '0', '0', '2.0'],
+      ['b"2', '0', '1', '0', '0', '3.0']
+    ])
+
+  def test_firstProperty(self):
+    json2csv.writeModel(REGIONS[1:], self.modelPath, ['f1'])
+    self.assertEqual(self.readModel()[1:], [['b"2', '1', '0', '0.5']])
+
+  def test_tooManyValues(self):
+    with self.assertRaises(ValueError) as context:
+      json2csv.writeModel(REGIONS, self.modelPath, ['f1'], propertyName='performance')
+    self.assertIn('"a1"', str(context.exception))
+    self.assertIn('-ec', str(context.exception))
+
+  def test_truncate(self):
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+      rowCount = json2csv.writeModel(REGIONS, self.modelPath, ['f1'], propertyName='performance', truncate=True)
+    self.assertEqual(rowCount, 4)
+    self.assertEqual([row[0] for row in self.readModel()[1:]], ['a1', 'a1', 'b"2', 'b"2'])
+    self.assertIn('dropped values: 2', stderr.getvalue())
+
+  def test_sameAsModelFile(self):
+    features = json2csv.loadFeatures(os.path.join(FOLDER, 'app_config.json'))
+    regions = json2csv.iterRegions(os.path.join(FOLDER, 'regions_performance.json'))
+    json2csv.writeModel(regions, self.modelPath, features, ['hash', 'graph'], batchSize=7)
+    self.assertEqual(self.readModel(), self.readModel(os.path.join(FOLDER, 'model.csv')))
+
+
+
+@unittest.skipIf(json2csv.numpy is None, 'requires NumPy')
+class TestWriteModelMatrix(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.modelPath = os.path.join(self.folder, 'model.csv')
+    self.matrixPath = os.path.join(self.folder, 'model.matrix')
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def writeBoth(self, regions, matrixFormat):
+    ''' Writes the model file and matrix and returns the rows of the model file. '''
+
+    rowCount = json2csv.writeModel(regions, self.modelPath, ['f1', 'f2'], ['extra'], propertyName='performance')
+    self.assertEqual(json2csv.writeModelMatrix(regions, self.matrixPath, ['f1', 'f2'], ['extra'],
+      propertyName='performance', matrixFormat=matrixFormat), rowCount)
+    with open(self.modelPath, 'r', newline='') as file:
+      return list(csv.reader(file))
+
+  def test_npz(self):
+    numpy = json2csv.numpy
+    rows = self.writeBoth(REGIONS, 'npz')
+
+    with numpy.load(self.matrixPath) as matrix:
+      options = numpy.zeros(tuple(matrix['shape']), dtype=numpy.int8)
+      options[matrix['row'], matrix['col']] = matrix['data']
+      self.assertEqual(list(matrix['columns']), rows[0][1:])
+      self.assertEqual(options.tolist(), [[int(v) for v in row[1:-1]] for row in rows[1:]])
+      self.assertEqual(matrix['values'].tolist(), [float(row[-1]) for row in rows[1:]])
+      self.assertEqual([matrix['ids'][i] for i in matrix['region']], [row[0] for row in rows[1:]])
+
+  def test_npy(self):
+    numpy = json2csv.numpy
+    rows = self.writeBoth(REGIONS, 'npy')
+
+    matrix = numpy.load(self.matrixPath)
+    with open(self.matrixPath + '.json', 'r') as file:
+      info = json.load(file)
+    self.assertEqual(matrix.tolist(), [[float(v) for v in row[1:]] for row in rows[1:]])
+    self.assertEqual(info, {'columns': rows[0][1:], 'ids': ['a1', 'b"2'], 'rows': [4, 2]})
+
+  def test_noRows(self):
+    numpy = json2csv.numpy
+    self.assertEqual(json2csv.writeModelMatrix(REGIONS[2:], self.matrixPath, ['f1'], matrixFormat='npz'), 0)
+    with numpy.load(self.matrixPath) as matrix:
+      self.assertEqual(matrix['shape'].tolist(), [0, 2])
+      self.assertEqual(len(matrix['col']), 0)
+
+    self.assertEqual(json2csv.writeModelMatrix(REGIONS[2:], self.matrixPath, ['f1'], matrixFormat='npy'), 0)
+    self.assertEqual(numpy.load(self.matrixPath).shape, (0, 3))
+
+  def test_tooManyValues(self):
+    for matrixFormat in json2csv.MATRIX_FORMATS:
+      with self.assertRaises(ValueError):
+        json2csv.writeModelMatrix(REGIONS, self.matrixPath, [], propertyName='performance', matrixFormat=matrixFormat)
+
+
+if __name__ == '__main__':
+  unittest.main()
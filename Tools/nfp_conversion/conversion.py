@@ -19,13 +19,24 @@
 
 import os
 import json
+import bisect
+import time
 import uuid
 import parser_and_logger
+from method_cache import MethodPositionCache
+from region_writer import RegionWriter
+from region_binary import RegionBinaryWriter
+from symbol_index import SymbolIndex
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 # additional library
 import javalang
 
+# optional library to parse the measurement values faster
+try: import numpy
+except ImportError: numpy = None
+
 LOGGER = None
 
 
@@ -36,6 +47,13 @@ DECIMALS_AFTER_COMMA = 4
 EXPORT_NAME = "converted.json" # filename (set per argument)
 EXPORT_INDENTED = False # results in ugly but smaller files (set per argument)
 PROPERTY_TYPE = "nfp"
+EXPORT_BINARY = None # value type of the additional binary region file (set per argument)
+
+# folder of the method cache in the output folder (if no other path is given)
+CACHE_NAME = ".method_cache"
+
+# part of the method cache keys (increase if the method search changes its results)
+RESOLVER_VERSION = 4
 
 
 def main():
@@ -44,6 +62,16 @@ def main():
     parser = parser_and_logger.prepareParser(description='Tool to convert Catena performance measurements.')
     args = parser.parse_args()
 
+    if args.measurements_path is None and args.manifest is None:
+        parser.error('either the measurements path or a manifest is required')
+
+    # the manifest sets the measurements, property and file name of each conversion
+    if not args.manifest is None:
+        ignored = ['--' + name for name in ('measurements_path', 'property_name', 'outname', 'watch', 'watch_interval')
+            if getattr(args, name) != parser.get_default(name)]
+        if len(ignored) > 0:
+            parser.error('the manifest can not be combined with: {}'.format(', '.join(ignored)))
+
     # prepare logging
     global LOGGER
     LOGGER = parser_and_logger.prepareLogger(name='conversionLogger', logPath=args.logfile, verboseLogging=args.verbose)
@@ -52,6 +80,10 @@ def main():
     global EXPORT_INDENTED
     EXPORT_INDENTED = False if args.no_indentation else True
 
+    # get binary export setting
+    global EXPORT_BINARY
+    EXPORT_BINARY = args.binary
+
     # get export name setting
     global EXPORT_NAME
     EXPORT_NAME = args.outname
@@ -59,19 +91,60 @@ def main():
     # validate the output folder
     outpath = validateOutputPath(args.outpath)
 
-    # start conversion
-    convert(
-        inFilePath=args.measurements_path,
-        programPath=args.program_path,
-        srcCodeExtension=args.source_code_extension,
-        outputPath=outpath,
-        propertyName=args.property_name,
-        overwrite=args.overwrite,
-        debug=args.verbose
-    )
-
-
-def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName, overwrite=False, debug=False):
+    # prepare the cache of method positions
+    # (in the output folder by default, so that runs from other working directories share it)
+    cache = None
+    if not args.no_cache and not outpath is None:
+        try:
+            cache = MethodPositionCache(
+                cachePath=args.cache_path or os.path.join(outpath, CACHE_NAME),
+                maxSize=int(args.cache_size * 1024 * 1024),
+                version='javalang-{}:{}'.format(javalang.__version__, RESOLVER_VERSION)
+            )
+        except OSError:
+            LOGGER.exception('Failed to prepare the method cache! Continuing without it.')
+
+    # convert all measurements of the manifest at once
+    if not args.manifest is None:
+        conversions = loadManifest(args.manifest)
+        if conversions is None: return
+        convertBatch(
+            conversions=conversions,
+            programPath=args.program_path,
+            srcCodeExtension=args.source_code_extension,
+            outputPath=outpath,
+            overwrite=args.overwrite,
+            jobs=args.jobs,
+            cache=cache,
+            indexPath=args.index_path,
+            debug=args.verbose
+        )
+
+    # start conversion (and keep converting changes if desired)
+    else:
+        convertFunc = watch if args.watch else convert
+        convertArgs = {'interval': args.watch_interval} if args.watch else {}
+        convertFunc(
+            inFilePath=args.measurements_path,
+            programPath=args.program_path,
+            srcCodeExtension=args.source_code_extension,
+            outputPath=outpath,
+            propertyName=args.property_name,
+            overwrite=args.overwrite,
+            jobs=args.jobs,
+            cache=cache,
+            indexPath=args.index_path,
+            debug=args.verbose,
+            **convertArgs
+        )
+
+    # remove least recently used cache entries
+    if not cache is None:
+        removed = cache.prune()
+        if removed > 0: LOGGER.info('Removed {} entries from the method cache.'.format(removed))
+
+
+def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName, overwrite=False, jobs=1, cache=None, indexPath=None, debug=False):
     '''
     Converts the catena measurements in the format
     that can be used by the VRVis application.
@@ -83,13 +156,16 @@ def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName,
     - programPath: path to folder with program files the measurements refer to (e.g. "src")
     - outputPath: folder to write output files with regions containing the measurements
     - srcCodeExtension: extension of source code files (e.g. ".java")
+    - jobs: number of processes to search for methods with (0 = one per CPU)
+    - cache: cache of method positions (MethodPositionCache) or None to parse all files
+    - indexPath: file of the symbol index to find the source files with (instead of checking all files)
     - debug: log debug information (required the according logging level to be set as well)
 
     The input format looks as follows:
     "main.java.MyClassName:MyFunction [...]"
 
     So what we do to extract the required information:
-    - 1. Split at "[" -> result of two sections: [0] = path & method, [1] = values
+    - 1. Split at the last "[" -> result of two sections: [0] = path & method, [1] = values
     - 2. Split the result[0]  at ":" -> result of two sections: [0] = path, [1] = method
     - 3. Group all the information by file path
          - each file with methods and each method with values
@@ -99,6 +175,459 @@ def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName,
     - 7. Convert this information to the region format and store in the file.
     '''
 
+    groupedData = loadMeasurements(inFilePath, debug) # format: { dotFilePath: methodName: [...] }
+
+
+    # try to find matching files and methods
+    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
+    outputFolder = os.path.normcase(os.path.normpath(outputPath))
+
+    # files to search for methods in (resolved afterwards, in this order)
+    if indexPath is None:
+        tasks = collectSourceFiles(programPath, srcCodeExtension, groupedData, debug)
+    else:
+        index = loadSymbolIndex(indexPath, programPath, srcCodeExtension)
+        tasks = collectIndexedSourceFiles(index, programPath, srcCodeExtension, groupedData, debug)
+
+    # search for methods in files (results keep the order of the tasks)
+    results = resolveMethodPositions(tasks, jobs=jobs, cache=cache, debug=debug)
+
+    if not cache is None:
+        LOGGER.info('Method cache used (hits: {}, misses: {})'.format(cache.hits, cache.misses))
+
+    fileMethodPositions, groupedDataLink = mergeMethodPositions(tasks, results)
+
+
+    LOGGER.info('Finished processing!')
+
+
+    if debug:
+        for entry in fileMethodPositions:
+            LOGGER.debug('---> {}: {}'.format(entry, fileMethodPositions[entry]))
+
+        LOGGER.debug('Printing grouped data links:')
+        for e in groupedDataLink:
+            LOGGER.info('{} ==> {}'.format(e, groupedDataLink[e]))
+
+
+    # check if all files have been used
+    logUnusedFiles(groupedData, tasks)
+
+
+    # prepare output file
+    outputFilePath = prepareOutputFile(outputFolder, EXPORT_NAME, overwrite)
+    if outputFilePath is None: return
+
+
+    # create the regions and export them to the output file one by one
+    regionCount = exportRegions(outputFilePath, createRegions(fileMethodPositions, groupedDataLink, groupedData, propertyName))
+    LOGGER.info('Finished export to: {} (regions: {})'.format(outputFilePath, regionCount))
+
+
+def convertBatch(conversions, programPath, srcCodeExtension, outputPath, overwrite=False, jobs=1, cache=None, indexPath=None, debug=False):
+    '''
+    Converts several measurement files (e.g. of different properties) in a single run.
+    The source files are collected and parsed only once
+    for the methods of all measurement files and the result is shared.
+
+    Parameters:
+    - conversions: list of dictionaries with the keys
+      "measurements_path", "property_name" and "outname" (name of the region file to export)
+    - see convert for the other parameters
+    '''
+
+    groupedDatas = [loadMeasurements(conversion['measurements_path'], debug) for conversion in conversions]
+    combinedData = combineMeasurements(groupedDatas)
+
+    # try to find matching files and methods (once for all measurements)
+    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
+    outputFolder = os.path.normcase(os.path.normpath(outputPath))
+
+    if indexPath is None:
+        tasks = collectSourceFiles(programPath, srcCodeExtension, combinedData, debug)
+    else:
+        index = loadSymbolIndex(indexPath, programPath, srcCodeExtension)
+        tasks = collectIndexedSourceFiles(index, programPath, srcCodeExtension, combinedData, debug)
+
+    results = resolveMethodPositions(tasks, jobs=jobs, cache=cache, debug=debug)
+
+    if not cache is None:
+        LOGGER.info('Method cache used (hits: {}, misses: {})'.format(cache.hits, cache.misses))
+
+    LOGGER.info('Finished processing!')
+
+    # export the regions of each measurements file
+    for conversion, groupedData in zip(conversions, groupedDatas):
+
+        LOGGER.info('Converting measurements: {}'.format(conversion['measurements_path']))
+        dataTasks, dataResults = selectMethodPositions(tasks, results, groupedData)
+        logUnusedFiles(groupedData, dataTasks)
+
+        outputFilePath = prepareOutputFile(outputFolder, conversion['outname'], overwrite)
+        if outputFilePath is None: continue
+
+        fileMethodPositions, groupedDataLink = mergeMethodPositions(dataTasks, dataResults)
+        regions = createRegions(fileMethodPositions, groupedDataLink, groupedData, conversion['property_name'])
+        regionCount = exportRegions(outputFilePath, regions)
+        LOGGER.info('Finished export to: {} (regions: {})'.format(outputFilePath, regionCount))
+
+
+def combineMeasurements(groupedDatas):
+    '''
+    Combines the files and methods of several measurements (see loadMeasurements)
+    to search for the methods of all of them at once.
+    The values are not required to search for methods and therefore None.
+    '''
+
+    combinedData = {}
+    for groupedData in groupedDatas:
+        for dataPath in groupedData:
+            combinedMethods = combinedData.setdefault(dataPath, {})
+            for method in groupedData[dataPath]:
+                combinedMethods.setdefault(method, None)
+
+    return combinedData
+
+
+def loadManifest(manifestPath):
+    '''
+    Loads the conversions of a manifest file for convertBatch.
+    The manifest is a JSON array of objects with the keys "measurements_path",
+    "property_name" (default: "performance") and "outname" (default: "regions_<property_name>.json").
+    Relative measurement paths are relative to the folder of the manifest.
+    The measurement files must exist and the outnames must be unique.
+    Returns None on errors.
+    '''
+
+    try:
+        with open(manifestPath, 'r') as file:
+            entries = json.load(file)
+    except (OSError, ValueError) as ex:
+        LOGGER.error('Failed to load manifest: {} - {}'.format(manifestPath, str(ex)))
+        return None
+
+    manifestFolder = os.path.dirname(os.path.abspath(manifestPath))
+    conversions = []
+    outnames = {} # entry number of each outname
+    valid = True
+
+    for entryNo, entry in enumerate(entries, 1):
+
+        if not isinstance(entry, dict) or not 'measurements_path' in entry:
+            LOGGER.error('Manifest entry {} has no "measurements_path"! Skipping it.'.format(entryNo))
+            continue
+
+        measurementsPath = os.path.join(manifestFolder, entry['measurements_path'])
+        if not os.path.isfile(measurementsPath):
+            LOGGER.error('Measurements file of manifest entry {} does not exist: {}'.format(entryNo, measurementsPath))
+            valid = False
+
+        # entries with the same outname would overwrite each other
+        propertyName = entry.get('property_name', 'performance')
+        outname = entry.get('outname', 'regions_{}.json'.format(propertyName))
+        outnameKey = os.path.normcase(os.path.normpath(outname))
+        if outnameKey in outnames:
+            LOGGER.error('Manifest entry {} has the same outname as entry {}: {}'.format(entryNo, outnames[outnameKey], outname))
+            valid = False
+        outnames.setdefault(outnameKey, entryNo)
+
+        conversions.append({
+            'measurements_path': measurementsPath,
+            'property_name': propertyName,
+            'outname': outname
+        })
+
+    if not valid:
+        LOGGER.error('Invalid manifest: {}'.format(manifestPath))
+        return None
+
+    return conversions
+
+
+def selectMethodPositions(tasks, results, groupedData):
+    '''
+    Selects the tasks and method positions (see resolveMethodPositions)
+    of the methods that have measurements in groupedData.
+    Types and methods keep the order of groupedData (like the tasks of collectSourceFiles).
+    Returns a tuple of the selected tasks and their results.
+    '''
+
+    selectedTasks = []
+    selectedResults = []
+    dataOrder = {dataPath: i for i, dataPath in enumerate(groupedData)}
+
+    for task, typeMethodPositions in zip(tasks, results):
+
+        dataPaths = dict(sorted(((typeName, dataPath) for typeName, dataPath in task['dataPaths'].items() if dataPath in groupedData),
+            key=lambda entry: dataOrder[entry[1]]))
+        if len(dataPaths) == 0: continue
+
+        selectedTask = dict(task)
+        selectedTask['dataPaths'] = dataPaths
+        selectedTask['typeMethods'] = {typeName: [method for method in groupedData[dataPath]] for typeName, dataPath in dataPaths.items()}
+        selectedTasks.append(selectedTask)
+
+        if typeMethodPositions is None:
+            selectedResults.append(None)
+            continue
+
+        selectedResults.append({typeName: {method: typeMethodPositions[typeName][method] for method in groupedData[dataPath]
+            if method in typeMethodPositions[typeName]} for typeName, dataPath in dataPaths.items() if typeName in typeMethodPositions})
+
+    return selectedTasks, selectedResults
+
+
+def logUnusedFiles(groupedData, tasks):
+    ''' Logs files of the measurements that could not be found (no task exists for them). '''
+
+    # ("could this information be converted to regions?")
+    filesUsed = {file: False for file in groupedData}
+    for task in tasks:
+        for dataPath in task['dataPaths'].values():
+            filesUsed[dataPath] = True
+
+    allFilesUsed = True
+    for fName in filesUsed:
+        if not filesUsed[fName]:
+            LOGGER.warning('File not used: {}'.format(fName))
+            allFilesUsed = False
+
+    if allFilesUsed:
+        LOGGER.info('All files given by the data have been used.')
+
+
+def prepareOutputFile(outputFolder, outputName, overwrite=False):
+    '''
+    Returns the path of the output file in the output folder
+    or None if the file already exists and should not be overwritten.
+    '''
+
+    outputFilePath = os.path.normpath(os.path.normcase(outputFolder + '/' + outputName))
+    LOGGER.info('Exporting to: {}'.format(os.path.abspath(outputFilePath)))
+
+    if os.path.exists(outputFilePath):
+        if not overwrite:
+            LOGGER.error('Failed to export results! File already exists. Consider using the overwrite flag.')
+            return None
+        else: LOGGER.warning('Overwriting existing export file!')
+
+    return outputFilePath
+
+
+def exportRegions(outputFilePath, regions):
+    '''
+    Writes the regions (e.g. of createRegions) one by one to the output file.
+    If enabled, a binary region file (same name with ".bin" extension) is written as well.
+    Returns the number of exported regions.
+    '''
+
+    indentation = 4 if EXPORT_INDENTED else None
+    with RegionWriter(outputFilePath, indent=indentation) as writer:
+
+        if EXPORT_BINARY is None:
+            for regionEntry in regions:
+                writer.write(regionEntry)
+            return writer.count
+
+        binaryFilePath = os.path.splitext(outputFilePath)[0] + '.bin'
+        with RegionBinaryWriter(binaryFilePath, valueType=EXPORT_BINARY) as binaryWriter:
+            for regionEntry in regions:
+                writer.write(regionEntry)
+                binaryWriter.write(regionEntry)
+
+    return writer.count
+
+
+def mergeMethodPositions(tasks, results):
+    '''
+    Merges the method positions found for each task (see resolveMethodPositions).
+    Returns a tuple of two dictionaries:
+    - fileMethodPositions: relative_file_path -> method_name -> {from, to}
+    - groupedDataLink: relative_file_path -> method_name -> (file path of groupedData, method name of groupedData)
+    '''
+
+    fileMethodPositions = {}
+    groupedDataLink = {}
+
+    for task, typeMethodPositions in zip(tasks, results):
+
+        if typeMethodPositions is None: continue
+
+        relFilePath_region = task['location']
+        if not relFilePath_region in fileMethodPositions:
+            fileMethodPositions[relFilePath_region] = {}
+            groupedDataLink[relFilePath_region] = {}
+
+        for typeName, methodPositions in typeMethodPositions.items():
+            for methodName in methodPositions:
+
+                # methods of other types than the one named like the file are prefixed by their type
+                regionMethod = methodName
+                if typeName != task['filenameNoExt']: regionMethod = typeName + '.' + methodName
+
+                fileMethodPositions[relFilePath_region][regionMethod] = methodPositions[methodName]
+                groupedDataLink[relFilePath_region][regionMethod] = (task['dataPaths'][typeName], methodName)
+
+    return fileMethodPositions, groupedDataLink
+
+
+def createRegions(fileMethodPositions, groupedDataLink, groupedData, propertyName):
+    '''
+    Creates the region entries of the found methods and their values.
+    Yields one region (JSON object) after another.
+
+    The property name can also be a list of names to create several properties per region.
+    The values of each method are then a list with one values array per name
+    and the first name is used to create the region IDs.
+    '''
+
+    propertyNames = [propertyName] if isinstance(propertyName, str) else list(propertyName)
+
+    for location in fileMethodPositions:
+        for method in fileMethodPositions[location]:
+
+            fromLine = fileMethodPositions[location][method]['from']
+            toLine = fromLine + 1
+
+            if 'to' in fileMethodPositions[location][method]:
+                toLine = fileMethodPositions[location][method]['to']
+            else:
+                LOGGER.warning('Missing "to line" value - Location: {}, Method: {}'.format(location, method))
+
+            # generated UUID by location and method combination and property added
+            regionID = str(uuid.uuid3(uuid.NAMESPACE_X500, location + ":" + method + ":" + propertyNames[0]))
+
+            # get values array
+            valuesArray = None
+            if location in groupedDataLink and method in groupedDataLink[location]:
+                locationFormatted, dataMethod = groupedDataLink[location][method] # (with "." instead of "/")
+                if dataMethod in groupedData[locationFormatted]:
+                    valuesArray = groupedData[locationFormatted][dataMethod]
+
+            if valuesArray is None:
+                LOGGER.error('Failed to get values array! Skipping. - Location: {}, Method: {}'.format(location, method))
+                continue
+
+            valuesArrays = [valuesArray] if isinstance(propertyName, str) else valuesArray
+
+            # create the region JSON entry
+            yield OrderedDict([
+                ('id', regionID),
+                ('location', location),
+                ('nodes', str(fromLine) + "-" + str(toLine)),
+                ('properties', [{
+                    'type': PROPERTY_TYPE,
+                    'name': name,
+                    'value': values
+                } for name, values in zip(propertyNames, valuesArrays)])
+            ])
+
+
+def watch(inFilePath, programPath, srcCodeExtension, outputPath, propertyName, interval=1.0, overwrite=False, jobs=1, cache=None, indexPath=None, debug=False):
+    '''
+    Converts the measurements like convert and keeps watching
+    the measurements file and the program folder for changes afterwards.
+    Both are polled every interval (seconds) until interrupted (e.g. by Ctrl+C).
+
+    The method positions of all files are kept in memory.
+    On changes, only modified source files are parsed again and only their regions are created again
+    (all regions if the measurements changed) before the output file is rewritten.
+    Source files are looked up using the symbol index (loaded from indexPath if given).
+
+    See convert for a description of the parameters.
+    '''
+
+    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
+    outputFolder = os.path.normcase(os.path.normpath(outputPath))
+    outputFilePath = os.path.normpath(os.path.normcase(outputFolder + '/' + EXPORT_NAME))
+
+    if os.path.exists(outputFilePath) and not overwrite:
+        LOGGER.error('Failed to export results! File already exists. Consider using the overwrite flag.')
+        return
+
+    if indexPath is None: index = SymbolIndex(programPath, srcCodeExtension)
+    else: index = loadSymbolIndex(indexPath, programPath, srcCodeExtension)
+
+    groupedData = {}
+    measurementsStamp = None
+    fileStates = {} # relative_file_path -> (file stamp, methods searched for, method positions)
+    fileRegions = {} # relative_file_path -> list of regions
+
+    LOGGER.info('Watching for changes (interval: {}s, stop with Ctrl+C)...'.format(interval))
+
+    try:
+        while True:
+
+            # reload measurements if the file changed
+            stamp = getFileStamp(inFilePath)
+            dataChanged = not stamp is None and stamp != measurementsStamp
+            if dataChanged:
+                groupedData = loadMeasurements(inFilePath, debug)
+                measurementsStamp = stamp
+
+            # find files to search for methods in
+            if index.update() > 0 and not indexPath is None:
+                try: index.save(indexPath)
+                except OSError: LOGGER.exception('Failed to save the symbol index: {}'.format(indexPath))
+            tasks = collectIndexedSourceFiles(index, programPath, srcCodeExtension, groupedData, debug)
+
+            # only search again in files that changed or that have other methods to search for
+            pending = []
+            pendingStamps = []
+            for task in tasks:
+                fileStamp = getFileStamp(task['filePath'])
+                state = fileStates.get(task['location'])
+                if state is None or state[0] != fileStamp or state[1] != task['typeMethods']:
+                    pending.append(task)
+                    pendingStamps.append(fileStamp)
+
+            locations = set(task['location'] for task in tasks)
+            removed = [location for location in fileStates if not location in locations]
+
+            if not dataChanged and len(pending) == 0 and len(removed) == 0:
+                time.sleep(interval)
+                continue
+
+            results = resolveMethodPositions(pending, jobs=jobs, cache=cache, debug=debug)
+            for task, fileStamp, typeMethodPositions in zip(pending, pendingStamps, results):
+                fileStates[task['location']] = (fileStamp, task['typeMethods'], typeMethodPositions)
+
+            for location in removed:
+                del fileStates[location]
+                fileRegions.pop(location, None)
+
+            # create regions of changed files (of all files if the measurements changed)
+            for task in (tasks if dataChanged else pending):
+                positions = fileStates[task['location']][2]
+                fileMethodPositions, groupedDataLink = mergeMethodPositions([task], [positions])
+                fileRegions[task['location']] = list(createRegions(fileMethodPositions, groupedDataLink, groupedData, propertyName))
+
+            regionCount = exportRegions(outputFilePath,
+                (region for task in tasks for region in fileRegions[task['location']]))
+            LOGGER.info('Exported to: {} (changed files: {}, removed files: {}, regions: {})'.format(
+                outputFilePath, len(tasks) if dataChanged else len(pending), len(removed), regionCount))
+
+            time.sleep(interval)
+
+    except KeyboardInterrupt:
+        LOGGER.info('Stopped watching.')
+
+
+def getFileStamp(filePath):
+    ''' Returns a tuple of modification time and size of a file or None if it does not exist. '''
+
+    try: stat = os.stat(filePath)
+    except OSError: return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def loadMeasurements(inFilePath, debug=False):
+    '''
+    Loads the measurements from the input file (steps 1-3 of convert).
+    Returns the measurements grouped by file path in format:
+    - dotFilePath: methodName: [...]
+    '''
+
     lineNo = 0
     groupedData = {} # format: { dotFilePath: methodName: [...] }
     firstArrayLength = -1
@@ -155,20 +684,30 @@ def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName,
             fileNum += 1
             LOGGER.debug('File {}: {}'.format(fileNum, path))
 
+    return groupedData
 
-    # create list of files with information about usage
-    # ("could this information be converted to regions?")
-    filesUsed = {file: False for file in groupedData}
 
-    # try to find matching files and methods
-    if programPath.endswith('/') or programPath.endswith('\\'): programPath = programPath[:-1]
-    outputFolder = os.path.normcase(os.path.normpath(outputPath))
+def collectSourceFiles(programPath, srcCodeExtension, groupedData, debug=False):
+    '''
+    Walks through all files of the program folder and
+    returns a task for each source file that has measurements.
+    Measurements of nested types (e.g. "main.java.Catena$Inner") belong to the file of the outer type.
+    A task is a dictionary with the keys:
+    - location: file path relative to the program folder, including its name (e.g. "src/main/java/Catena.java")
+    - filePath: path to read the source file from
+    - filenameNoExt: file name without extension
+    - typeMethods: names of the methods to search for per type (e.g. {"Catena": [...], "Catena$Inner": [...]})
+    - dataPaths: path of the measurements in groupedData per type (e.g. {"Catena": "main.java.Catena", ...})
+    '''
+
     srcDirName = os.path.normcase(os.path.basename(programPath)) + '/'
     pathLength = len(programPath)
+    tasks = []
 
-    # dict of {relative_file_path: method_name: {from, to}}
-    fileMethodPositions = {}
-    groupedDataLink = {} # relative_file_path -> file path of groupedData
+    # measurements grouped by the path of the file they belong to
+    fileDataPaths = {}
+    for dataPath in groupedData:
+        fileDataPaths.setdefault(dataPath.split('$', 1)[0], []).append(dataPath)
 
     for curDir, subDirs, files in os.walk(programPath, topdown=True):
 
@@ -195,119 +734,180 @@ def convert(inFilePath, programPath, srcCodeExtension, outputPath, propertyName,
 
             # search for matching file in loaded data
             filePathFormatted = pathFormatted + '.' + fileNoExt
-            if not filePathFormatted in groupedData:
+            if not filePathFormatted in fileDataPaths:
                 if debug: LOGGER.debug('File NOT found in grouped data: {}'.format(filePathFormatted))
                 continue
             if debug: LOGGER.debug('File FOUND in grouped data: {}'.format(filePathFormatted))
 
-            # note this file as used (for conversion summary)
-            filesUsed[filePathFormatted] = True
+            # use relative path with source directory
+            relFilePath_region = curDir_relative.replace('\\', '/') + '/' + file
 
-            # search for methods in file
-            filePath = os.path.normpath(curDir + '/' + file)
-            methodPositions = findMethodPositionsJava(
-                methodNames=[method for method in groupedData[filePathFormatted]],
-                filePath=filePath,
-                filenameNoExt=fileNoExt,
-                debug=debug
-            )
+            task = createTask(relFilePath_region, os.path.normpath(curDir + '/' + file), fileNoExt)
+            for dataPath in fileDataPaths[filePathFormatted]:
+                typeName = fileNoExt + dataPath[len(filePathFormatted):]
+                addTaskType(task, typeName, dataPath, groupedData)
+            tasks.append(task)
 
-            if methodPositions is None: continue
+    return tasks
 
-            # use relative path with source directory
-            relFilePath_region = curDir_relative.replace('\\', '/') + '/' + file
-            if not relFilePath_region in fileMethodPositions:
-                fileMethodPositions[relFilePath_region] = {}
-                groupedDataLink[relFilePath_region] = filePathFormatted
 
-            for methodName in methodPositions:
-                fileMethodPositions[relFilePath_region][methodName] = methodPositions[methodName]
-                #groupedDataLink[relFilePath_region][filePathFormatted].append(methodName)
+def loadSymbolIndex(indexPath, programPath, srcCodeExtension):
+    '''
+    Loads the symbol index from its file, updates it (only changed folders and files)
+    and saves it again. Returns the index (SymbolIndex).
+    '''
 
+    index = SymbolIndex.load(indexPath, programPath, srcCodeExtension)
+    if not index.discarded is None:
+        LOGGER.warning('Creating the symbol index again: {} - {}'.format(indexPath, index.discarded))
+    scanned = index.update()
+    LOGGER.info('Symbol index updated (types: {}, files scanned: {})'.format(len(index.names), scanned))
 
-    LOGGER.info('Finished processing!')
+    try: index.save(indexPath)
+    except OSError:
+        LOGGER.exception('Failed to save the symbol index: {}'.format(indexPath))
 
+    return index
 
-    if debug:
-        for entry in fileMethodPositions:
-            LOGGER.debug('---> {}: {}'.format(entry, fileMethodPositions[entry]))
 
-        LOGGER.debug('Printing grouped data links:')
-        for e in groupedDataLink:
-            LOGGER.info('{} ==> {}'.format(e, groupedDataLink[e]))
+def collectIndexedSourceFiles(index, programPath, srcCodeExtension, groupedData, debug=False):
+    '''
+    Same as collectSourceFiles but uses the symbol index (SymbolIndex) to look up the files
+    of the measurements, so that only the files with measurements are visited.
+    Tasks are sorted by their location.
+    '''
 
+    srcDirName = os.path.normcase(os.path.basename(programPath)) + '/'
+    fileTasks = {} # relative_file_path -> task
 
-    # check if all files have been used
-    allFilesUsed = True
-    for fName in filesUsed:
-        if not filesUsed[fName]:
-            LOGGER.warning('File not used: {}'.format(fName))
-            allFilesUsed
+    for dataPath in groupedData:
 
-    if allFilesUsed:
-        LOGGER.info('All files given by the data have been used.')
+        found = index.lookup(dataPath)
+        if found is None:
+            if debug: LOGGER.debug('File NOT found in symbol index: {}'.format(dataPath))
+            continue
 
+        relFilePath, typeName = found
+        if debug: LOGGER.debug('File FOUND in symbol index: {} -> {}'.format(dataPath, relFilePath))
 
-    # prepare output file
-    outputFilePath = os.path.normpath(os.path.normcase(outputFolder + '/' + EXPORT_NAME))
-    LOGGER.info('Exporting to: {}'.format(os.path.abspath(outputFilePath)))
+        if not relFilePath in fileTasks:
+            fileNoExt = os.path.basename(relFilePath)[:-len(srcCodeExtension)]
+            filePath = os.path.normpath(os.path.join(programPath, relFilePath))
+            fileTasks[relFilePath] = createTask(srcDirName + relFilePath, filePath, fileNoExt)
 
-    if os.path.exists(outputFilePath):
-        if not overwrite:
-            LOGGER.error('Failed to export results! File already exists. Consider using the overwrite flag.')
-            return
-        else: LOGGER.warning('Overwriting existing export file!')
+        addTaskType(fileTasks[relFilePath], typeName, dataPath, groupedData)
 
+    return [fileTasks[relFilePath] for relFilePath in sorted(fileTasks)]
 
-    # create the JSON file content
-    jsonContent = { 'regions': [] }
 
-    for location in fileMethodPositions:
-        for method in fileMethodPositions[location]:
+def createTask(location, filePath, filenameNoExt):
+    ''' Creates a task to search for methods in a source file (see collectSourceFiles). '''
 
-            fromLine = fileMethodPositions[location][method]['from']
-            toLine = fromLine + 1
+    return {
+        'location': location,
+        'filePath': filePath,
+        'filenameNoExt': filenameNoExt,
+        'typeMethods': {},
+        'dataPaths': {}
+    }
 
-            if 'to' in fileMethodPositions[location][method]:
-                toLine = fileMethodPositions[location][method]['to']
-            else:
-                LOGGER.warning('Missing "to line" value - Location: {}, Method: {}'.format(location, method))
 
-            # generated UUID by location and method combination and property added
-            regionID = str(uuid.uuid3(uuid.NAMESPACE_X500, location + ":" + method + ":" + propertyName))
+def addTaskType(task, typeName, dataPath, groupedData):
+    ''' Adds the methods of a type with measurements to the task. '''
 
-            # get values array
-            valuesArray = None
-            if location in groupedDataLink:
-                locationFormatted = groupedDataLink[location] # (with "." instead of "/")
-                if method in groupedData[locationFormatted]:
-                    valuesArray = groupedData[locationFormatted][method]
+    task['typeMethods'][typeName] = [method for method in groupedData[dataPath]]
+    task['dataPaths'][typeName] = dataPath
 
-            if valuesArray is None:
-                LOGGER.error('Failed to get values array! Skipping. - Location: {}, Method: {}'.format(location, method))
-                continue
 
-            # create the region JSON entry
-            regionEntry = OrderedDict([
-                ('id', regionID),
-                ('location', location),
-                ('nodes', str(fromLine) + "-" + str(toLine)),
-                ('properties', [{
-                    'type': PROPERTY_TYPE,
-                    'name': propertyName,
-                    'value': valuesArray
-                }])
-            ])
+def resolveMethodPositions(tasks, jobs=1, cache=None, debug=False):
+    '''
+    Searches for the methods of each task (one task per source file).
+    Files with an entry in the cache (if given) are not parsed again.
+    With more than one job, the files are parsed by a pool of processes.
+    Returns a list with the method positions of each task per type (or None on errors)
+    in the same order as the tasks, so that the result does not depend on the jobs.
+    '''
+
+    results = [None] * len(tasks)
+    keys = [None] * len(tasks)
+    pending = [] # tasks that need to be parsed
+
+    for i, task in enumerate(tasks):
+
+        if not cache is None:
+            try: keys[i] = cache.getKey(task['filePath'])
+            except OSError: keys[i] = None
+
+            if not keys[i] is None:
+                cached = cache.get(keys[i], getCacheNames(task))
+                if not cached is None:
+                    results[i] = splitCacheNames(task, cached)
+                    continue
+
+        pending.append(task)
+
+    if jobs == 0: jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(pending) <= 1:
+        parsed = [resolveMethodPositionsTask(task, debug) for task in pending]
+
+    else:
+        jobs = min(jobs, len(pending))
+        LOGGER.info('Searching for methods in {} files using {} processes...'.format(len(pending), jobs))
+
+        # hand out tasks in chunks to reduce the inter-process overhead
+        chunkSize = max(1, len(pending) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker, initargs=(debug,)) as executor:
+            parsed = list(executor.map(resolveMethodPositionsTask, pending, [debug] * len(pending), chunksize=chunkSize))
 
-            jsonContent['regions'].append(regionEntry)
+    # fill in results of parsed files and add them to the cache
+    parsedIter = iter(parsed)
+    for i, task in enumerate(tasks):
+        if not results[i] is None: continue
+        results[i] = next(parsedIter)
+        if not cache is None and not keys[i] is None and not results[i] is None:
+            cache.put(keys[i], getCacheNames(task), joinCacheNames(results[i]))
+
+    return results
+
+
+def getCacheNames(task):
+    ''' Returns the names of the task methods as used by the cache ("type:method"). '''
+    return [typeName + ':' + method for typeName, methods in task['typeMethods'].items() for method in methods]
+
+
+def joinCacheNames(typeMethodPositions):
+    ''' Converts method positions per type to method positions per cache name. '''
+    return {typeName + ':' + method: position
+        for typeName, methodPositions in typeMethodPositions.items() for method, position in methodPositions.items()}
+
+
+def splitCacheNames(task, cachedPositions):
+    ''' Converts cached method positions back to method positions per type of the task. '''
+
+    typeMethodPositions = {typeName: {} for typeName in task['typeMethods']}
+    for name, position in cachedPositions.items():
+        typeName, method = name.split(':', 1)
+        typeMethodPositions[typeName][method] = position
+    return typeMethodPositions
+
+
+def resolveMethodPositionsTask(task, debug=False):
+    ''' Searches for the methods of a single task. Runs in a worker process if jobs are used. '''
+
+    return findMethodPositionsJava(
+        typeMethods=task['typeMethods'],
+        filePath=task['filePath'],
+        filenameNoExt=task['filenameNoExt'],
+        debug=debug
+    )
 
 
-    # export regions (jsonContent) to the output file
-    with open(outputFilePath, 'w') as outFile:
-        indentation = 4 if EXPORT_INDENTED else None
-        json.dump(jsonContent, outFile, ensure_ascii=False, indent=indentation)
+def initWorker(debug=False):
+    ''' Prepares the logger of a worker process (only required if the process was not forked). '''
 
-    LOGGER.info('Finished export to: {}'.format(outputFilePath))
+    global LOGGER
+    if LOGGER is None:
+        LOGGER = parser_and_logger.prepareLogger(name='conversionLogger', logPath='', verboseLogging=debug)
 
 
 def validateOutputPath(path):
@@ -364,8 +964,8 @@ def prepareData(line, lineNo):
     err_msg = 'Failed to parse line {}'.format(lineNo)
 
 
-    # split at the first occurrence of '['
-    split1 = line.split('[', 1)
+    # split at the last occurrence of '[' (method signatures can contain brackets as well)
+    split1 = line.rsplit('[', 1)
 
     if len(split1) != 2:
         LOGGER.error(err_msg + ' - split1 wrong size!')
@@ -395,6 +995,25 @@ def prepareData(line, lineNo):
 
     # parse values array from string
     valuesStr = split1[1].split(']', 1)[0]
+    if numpy is None: valuesArray = parseValues(valuesStr, lineNo)
+    else: valuesArray = parseValuesNumPy(valuesStr, lineNo)
+
+
+    # bring into useful format
+    return {
+        'file': filePath,
+        'method': methodName,
+        'values': valuesArray
+    }
+
+
+def parseValues(valuesStr, lineNo):
+    '''
+    Parses the comma separated values of a line to a list of floats.
+    Entries that are no valid numbers are reported and replaced by zero.
+    Values are rounded according to DECIMALS_AFTER_COMMA.
+    '''
+
     valuesArray = []
     entryNo = 0
 
@@ -409,15 +1028,6 @@ def prepareData(line, lineNo):
                 ' Using zero instead. - {}'.format(lineNo, entryNo, str(ve)))
             num = 0
 
-        # shorten decimals after comma
-        '''
-        comSplit = numStr.split('.', 1)
-        decAfterComma = int(DECIMALS_AFTER_COMMA)
-        if len(comSplit) > 1 and decAfterComma >= 0:
-            dec = decAfterComma if len(comSplit[1]) > decAfterComma else len(comSplit[1])
-            numStr = comSplit[0] + '.' + comSplit[1][:dec]
-        '''
-
         # quickly add zeros
         if num == 0 or num == -0:
             valuesArray.append(0.0)
@@ -426,135 +1036,331 @@ def prepareData(line, lineNo):
         # round a bit at decimals after comma
         decAfterComma = int(DECIMALS_AFTER_COMMA)
         if decAfterComma >= 0:
-            mulDiv = pow(10, decAfterComma) if decAfterComma > 0 else 0
+            mulDiv = pow(10, decAfterComma)
             num = round(num * mulDiv) / mulDiv
 
         if num == -0 : num = 0.0
         valuesArray.append(num)
 
+    return valuesArray
 
-    # bring into useful format
-    return {
-        'file': filePath,
-        'method': methodName,
-        'values': valuesArray
-    }
 
+def parseValuesNumPy(valuesStr, lineNo):
+    '''
+    Same as parseValues but parses, rounds and normalizes all values of the line at once using NumPy.
+    If an entry is no valid number, the line is parsed by parseValues to report each failing entry.
+    '''
+
+    try: values = numpy.array(valuesStr.split(','), dtype=numpy.float64)
+    except ValueError:
+        return parseValues(valuesStr, lineNo)
+
+    # round a bit at decimals after comma (same as round(), half to even)
+    decAfterComma = int(DECIMALS_AFTER_COMMA)
+    if decAfterComma >= 0:
+        mulDiv = pow(10, decAfterComma)
+        values = numpy.round(values * mulDiv) / mulDiv
+
+    # replace -0.0 by 0.0
+    values[values == 0] = 0.0
+    return values.tolist()
 
-def findMethodPositionsJava(methodNames, filePath, filenameNoExt, debug=False):
+
+def findMethodPositionsJava(typeMethods, filePath, filenameNoExt, debug=False, code=None):
     '''
-    Find method position in a Java file.
-    The method name "<init>" will be replaced by the
-    file name to simply search for the constructors.
+    Find method positions in a Java file.
+    All types declared in the file can be searched, including nested ones
+    (e.g. "Catena", "Catena$Inner" or a secondary class "Helper").
+    The method name "<init>" is used to search for the constructors.
     See here: https://docs.oracle.com/javase/specs/jvms/se7/html/jvms-2.html#jvms-2.9
 
-    Returns the method positions as a dictionary in format:
-    - methodName: {from, to}
+    Method names can contain a signature to select one of several overloaded methods,
+    either as Java parameter list (e.g. "help(String, int[])")
+    or as JVM descriptor (e.g. "help(Ljava/lang/String;[I)I").
+    Without signature, the first method with this name is used.
+
+    The file is read, tokenized and parsed only once for all types.
+    The same tokens are used to find the end of each method
+    (the closing bracket that matches the opening bracket of the method body after its parameters).
+    Brackets in strings and comments are therefore not taken into account.
+
+    Parameters:
+    - typeMethods: dictionary of {typeName: [methodName]}
+    - code: source code of the file if it was read already (e.g. by another tool)
+
+    Returns the method positions per type as a dictionary in format:
+    - typeName: methodName: {from, to}
 
     Note: "to" must not always be given (e.g. if no method end could be found!)
     '''
 
-    # validate file path
-    if not os.path.exists(filePath) or not os.path.isfile(filePath):
-        LOGGER.error('Failed to search for methods in file: {}'.format(os.path.abspath(filePath)))
-        return None
-
     # read source code
-    file = open(filePath, 'r')
-    javaSourceCode = file.read()
-    file.close()
+    if code is None:
+
+        # validate file path
+        if not os.path.exists(filePath) or not os.path.isfile(filePath):
+            LOGGER.error('Failed to search for methods in file: {}'.format(os.path.abspath(filePath)))
+            return None
+
+        file = open(filePath, 'r')
+        code = file.read()
+        file.close()
 
-    # parse source code
+    # tokenize and parse source code
     tree = None
-    try: tree = javalang.parse.parse(javaSourceCode)
+    try:
+        tokens = list(javalang.tokenizer.tokenize(code))
+        tree = javalang.parser.Parser(tokens).parse()
     except Exception as ex:
         LOGGER.error('Failed to parse Java file: {}'.format(os.path.abspath(filePath)))
         return None
 
-    # get available class
-    javaClasses = []
-    for t in tree.types:
-        if isinstance(t, javalang.tree.ClassDeclaration):
-            javaClasses.append(t)
-
-    if len(javaClasses) < 1:
+    # get available types (classes, interfaces, enums) by their name
+    typeDeclarations = collectTypeDeclarations(tree.types)
+    if len(typeDeclarations) < 1:
         LOGGER.error('Failed to find class in Java file: {}'.format(os.path.abspath(filePath)))
         return None
 
-    elif len(javaClasses) > 1:
-        LOGGER.warning('Multiple class instances in file: {} - Using first one.'.format(os.path.abspath(filePath)))
+    # find method offsets (not given by javalang) using the brackets of the token stream
+    tokenPositions, bodyStarts, bodyEndLines, parenthesisEnds = matchBracketTokens(tokens)
+
+    typeMethodPositions = {}
+    for typeName, methodNames in typeMethods.items():
+
+        if not typeName in typeDeclarations:
+            LOGGER.warning('Failed to find type "{}" in Java file: {}'.format(typeName, os.path.abspath(filePath)))
+            continue
+
+        methodPositions = {}
+        typeMethodPositions[typeName] = methodPositions
+        jType = typeDeclarations[typeName]
+
+        # try to find method names
+        for method in methodNames:
+
+            declaration = findMethodDeclaration(jType, method)
+            if declaration is None: continue
+
+            methodPositions[method] = {'from': declaration.position.line}
+            toLine = findDeclarationEndLine(declaration, tokens, tokenPositions, bodyStarts, bodyEndLines, parenthesisEnds)
+            if not toLine is None:
+                methodPositions[method]['to'] = toLine
+
+    return typeMethodPositions
+
 
-    # (only one class is supported currently - see given example data)
-    jClass = javaClasses[0]
+def collectTypeDeclarations(types, outerName=None, typeDeclarations=None):
+    '''
+    Returns all (nested) type declarations as dictionary of {typeName: declaration}.
+    Nested types are named like "Outer$Inner".
+    '''
+
+    if typeDeclarations is None: typeDeclarations = {}
+
+    for t in types:
+        if not isinstance(t, javalang.tree.TypeDeclaration): continue
+
+        typeName = t.name if outerName is None else outerName + '$' + t.name
+        if not typeName in typeDeclarations:
+            typeDeclarations[typeName] = t
+
+        collectTypeDeclarations(getTypeMembers(t), typeName, typeDeclarations)
+
+    return typeDeclarations
+
+
+def getTypeMembers(jType):
+    ''' Returns the declarations in the body of a type (e.g. methods, constructors and nested types). '''
+
+    if isinstance(jType.body, javalang.tree.EnumBody):
+        return jType.body.declarations or []
+    return jType.body or []
+
+
+def findMethodDeclaration(jType, method):
+    '''
+    Returns the first declaration of the type that matches the method name
+    (and signature, if the name contains one) or None if there is no such method.
+    '''
+
+    try: methodName, signature = parseMethodSignature(method)
+    except ValueError:
+        LOGGER.warning('Failed to parse signature of method: {}'.format(method))
+        return None
+
+    # type parameters match any parameter type (erasure is unknown)
+    typeParameters = set(p.name for p in (getattr(jType, 'type_parameters', None) or []))
 
-    # try to find method names
-    fromLines = {}
-    methodPositions = {}
-    for method in methodNames:
+    for e in getTypeMembers(jType):
 
         # treat "<init>" as constructor
-        if method == "<init>":
-
-            # search for constructors
-            for e in jClass.body:
-                if isinstance(e, javalang.tree.ConstructorDeclaration):
-                    if not method in methodPositions:
-                        methodPositions[method] = {'from': e.position.line}
-                        fromLines[e.position.line] = True
-
-        # get start line info of each method declaration
-        for m in jClass.methods:
-            if m.name != method: continue
-            if not method in methodPositions:
-                methodPositions[method] = {'from': m.position.line}
-                fromLines[m.position.line] = True
-
-    # find method offsets (somehow not given by javalang)
-    with open(filePath, 'r') as file:
-
-        lineNo = 0
-        justStartedSearching = False
-        searchingMethodEnd = False
-        curMethod = None
-        firstBracketFound = False
-        scopesOpen = 0
-        startLine = 0
-
-        for line in file:
-
-            # find the method
-            lineNo += 1
+        if methodName == "<init>":
+            if not isinstance(e, javalang.tree.ConstructorDeclaration): continue
+        elif not isinstance(e, javalang.tree.MethodDeclaration) or e.name != methodName:
+            continue
+
+        if signature is None: return e
+
+        parameterTypes = [getParameterType(p) for p in e.parameters]
+        if len(parameterTypes) != len(signature): continue
+
+        genericNames = typeParameters | set(p.name for p in (e.type_parameters or []))
+        if all(p == s or (p[0] in genericNames and p[1] == s[1]) for p, s in zip(parameterTypes, signature)):
+            return e
+
+    return None
+
+
+def getParameterType(parameter):
+    ''' Returns the simple type name and array dimensions of a formal parameter. '''
+
+    t = parameter.type
+    dimensions = len(t.dimensions or []) + (1 if parameter.varargs else 0)
+    while not getattr(t, 'sub_type', None) is None:
+        t = t.sub_type
+    return (t.name, dimensions)
+
+
+# type names of JVM descriptor characters
+DESCRIPTOR_TYPES = {
+    'B': 'byte', 'C': 'char', 'D': 'double', 'F': 'float',
+    'I': 'int', 'J': 'long', 'S': 'short', 'Z': 'boolean'
+}
+
+
+def parseMethodSignature(method):
+    '''
+    Splits a method name into the name and its parameter types.
+    Each parameter type is a tuple of (simple type name, array dimensions).
+    The parameter types are None if the method has no signature.
+    Raises a ValueError if the signature is invalid.
+    '''
+
+    if not '(' in method:
+        return method, None
+
+    methodName, rest = method.split('(', 1)
+    if not ')' in rest:
+        raise ValueError('Missing closing parenthesis')
+    parameters, returnType = rest.split(')', 1)
+
+    # JVM descriptor (e.g. "(I[B)V")
+    if len(returnType.strip()) > 0 or ';' in parameters or '/' in parameters:
+        parameterTypes = []
+        dimensions = 0
+        i = 0
+        while i < len(parameters):
+            c = parameters[i]
+            if c == '[':
+                dimensions += 1
+                i += 1
+                continue
+            if c == 'L':
+                end = parameters.index(';', i)
+                typeName = parameters[i+1:end].replace('$', '/').rsplit('/', 1)[-1]
+                i = end + 1
+            elif c in DESCRIPTOR_TYPES:
+                typeName = DESCRIPTOR_TYPES[c]
+                i += 1
+            else:
+                raise ValueError('Invalid descriptor character: {}'.format(c))
+            parameterTypes.append((typeName, dimensions))
+            dimensions = 0
+        return methodName.strip(), parameterTypes
+
+    # Java parameter list (e.g. "(int, byte[])"), generic arguments are ignored
+    parameterTypes = []
+    depth = 0
+    current = ''
+    for c in parameters + ',':
+        if c == '<': depth += 1
+        elif c == '>': depth -= 1
+        elif c == ',' and depth == 0:
+            if len(current.strip()) > 0:
+                parameterTypes.append(parseSourceType(current))
+            current = ''
+        elif depth == 0: current += c
+    return methodName.strip(), parameterTypes
+
+
+def parseSourceType(typeStr):
+    ''' Returns the simple type name and array dimensions of a Java type (e.g. "java.lang.String[]"). '''
+
+    typeStr = ''.join(part for part in typeStr.split() if part != 'final')
+    dimensions = typeStr.count('[]') + (1 if typeStr.endswith('...') else 0)
+    typeName = typeStr.replace('[]', '').replace('...', '').strip()
+    return (typeName.replace('$', '.').rsplit('.', 1)[-1], dimensions)
+
+
+def matchBracketTokens(tokens):
+    '''
+    Matches the curly brackets and parentheses of the token stream in a single pass.
+    Returns a tuple of:
+    - list of the positions of all tokens (sorted, to search for the index of a token)
+    - list of token indices of all opening brackets (sorted)
+    - dictionary of {index of opening bracket: line of matching closing bracket}
+    - dictionary of {index of opening parenthesis: index of matching closing parenthesis}
+    '''
+
+    tokenPositions = [t.position for t in tokens]
+    bodyStarts = []
+    bodyEndLines = {}
+    parenthesisEnds = {}
+    scopesOpen = []
+    parenthesesOpen = []
+
+    for i, t in enumerate(tokens):
+        if not isinstance(t, javalang.tokenizer.Separator): continue
+        if t.value == '{':
+            scopesOpen.append(i)
+            bodyStarts.append(i)
+        elif t.value == '}' and len(scopesOpen) > 0:
+            bodyEndLines[scopesOpen.pop()] = t.position.line
+        elif t.value == '(':
+            parenthesesOpen.append(i)
+        elif t.value == ')' and len(parenthesesOpen) > 0:
+            parenthesisEnds[parenthesesOpen.pop()] = i
+
+    return tokenPositions, bodyStarts, bodyEndLines, parenthesisEnds
+
+
+def findDeclarationEndLine(declaration, tokens, tokenPositions, bodyStarts, bodyEndLines, parenthesisEnds):
+    '''
+    Returns the line where the declaration (method or constructor) ends.
+    This is the line of the bracket that closes its body or
+    the line of the semicolon for methods without body (e.g. abstract methods).
+    The body is searched after the formal parameters, so that brackets
+    of annotations (e.g. "@SuppressWarnings({"a", "b"})") are skipped.
+    Returns None if no end could be found.
+    '''
+
+    startIndex = bisect.bisect_left(tokenPositions, declaration.position)
+
+    # the name followed by the opening parenthesis of the formal parameters
+    # (the declaration position is before the name, e.g. at its modifiers or return type)
+    parametersEnd = None
+    for i in range(startIndex, len(tokens) - 1):
+        t = tokens[i]
+        if isinstance(t, javalang.tokenizer.Identifier) and t.value == declaration.name and tokens[i+1].value == '(':
+            parametersEnd = parenthesisEnds.get(i+1)
+            break
+
+    if parametersEnd is None:
+        return None
+
+    # methods without body end with a semicolon
+    if declaration.body is None:
+        for t in tokens[parametersEnd:]:
+            if isinstance(t, javalang.tokenizer.Separator) and t.value == ';':
+                return t.position.line
+        return None
+
+    # first opening bracket after the parameters (and the throws clause) opens the body
+    bracketNo = bisect.bisect_left(bodyStarts, parametersEnd)
+    if bracketNo >= len(bodyStarts):
+        return None
 
-            if not searchingMethodEnd:
-
-                # skip line if there is no method starting here
-                if not lineNo in fromLines: continue
-
-                # a method is starting here
-                for method in methodPositions:
-                    fromLine = methodPositions[method]['from']
-                    if fromLine == lineNo:
-                        curMethod = method
-                        searchingMethodEnd = True
-                        firstBracketFound = False
-                        scopesOpen = 0
-                        methodLinesOffset = 0
-                        startLine = lineNo
-                        break
-
-            # count scopes using opening and closing brackets
-            for character in line:
-                if character == "{":
-                    scopesOpen += 1
-                    firstBracketFound = True
-                elif character == "}": scopesOpen -= 1
-
-            # assume that this is the end of a method
-            if (firstBracketFound and scopesOpen < 1) or (lineNo + 1) in fromLines:
-                searchingMethodEnd = False
-                methodPositions[method]['to'] = lineNo
-
-    return methodPositions
+    return bodyEndLines.get(bodyStarts[bracketNo])
 
 
 if __name__ == '__main__':
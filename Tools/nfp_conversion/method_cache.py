@@ -0,0 +1,149 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# On-disk cache of the method positions found in source files.
+# Used by the conversion tool to skip parsing files that did not change.
+
+import os
+import json
+import hashlib
+
+
+class MethodPositionCache:
+    '''
+    Stores the method positions ({methodName: {from, to}}) of source files.
+    Entries are keyed by the hash of the file content and a version string
+    (e.g. the javalang version), so changed files or parser updates are never served from the cache.
+
+    Each entry is a small JSON file in the cache folder.
+    If the total size of the entries exceeds the maximum size,
+    the least recently used entries are removed (see prune()).
+    '''
+
+    def __init__(self, cachePath, maxSize=64*1024*1024, version=''):
+        '''
+        Parameters:
+        - cachePath: folder to store the cache entries in (created if missing)
+        - maxSize: maximum size of all entries in bytes
+        - version: string that is part of each key (e.g. parser and resolver version)
+        '''
+
+        self.cachePath = cachePath
+        self.maxSize = maxSize
+        self.version = version
+
+        # statistics for the conversion summary
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.isdir(self.cachePath):
+            os.makedirs(self.cachePath)
+
+
+    def getKey(self, filePath):
+        ''' Returns the cache key of a file (hash of its content and the version). '''
+
+        sha = hashlib.sha1(self.version.encode('utf-8'))
+        with open(filePath, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+
+    def getEntryPath(self, key):
+        return os.path.join(self.cachePath, key + '.json')
+
+
+    def get(self, key, methodNames):
+        '''
+        Returns the cached method positions for the given method names
+        or None if at least one of the methods was not searched for yet.
+        Methods that could not be found in the file are not part of the result.
+        '''
+
+        entryPath = self.getEntryPath(key)
+        entry = self.loadEntry(entryPath)
+
+        if entry is None or not all(m in entry['methods'] or m in entry['missing'] for m in methodNames):
+            self.misses += 1
+            return None
+
+        # mark entry as recently used
+        try: os.utime(entryPath)
+        except OSError: pass
+
+        self.hits += 1
+        return {m: entry['methods'][m] for m in methodNames if m in entry['methods']}
+
+
+    def put(self, key, methodNames, methodPositions):
+        '''
+        Adds the method positions found for the given method names to the entry of this key.
+        Method names without a position are remembered as missing.
+        '''
+
+        entryPath = self.getEntryPath(key)
+        entry = self.loadEntry(entryPath)
+        if entry is None: entry = {'methods': {}, 'missing': []}
+
+        for method in methodNames:
+            if method in methodPositions:
+                entry['methods'][method] = methodPositions[method]
+                if method in entry['missing']: entry['missing'].remove(method)
+            elif not method in entry['missing']:
+                entry['missing'].append(method)
+
+        # write to a temporary file first so that no broken entries remain
+        tmpPath = entryPath + '.tmp'
+        try:
+            with open(tmpPath, 'w') as file:
+                json.dump(entry, file)
+            os.replace(tmpPath, entryPath)
+        except OSError:
+            if os.path.exists(tmpPath): os.remove(tmpPath)
+
+
+    def loadEntry(self, entryPath):
+        ''' Returns the entry stored at this path or None if missing or invalid. '''
+
+        if not os.path.isfile(entryPath):
+            return None
+
+        try:
+            with open(entryPath, 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or not 'methods' in entry or not 'missing' in entry:
+            return None
+
+        return entry
+
+
+    def prune(self):
+        '''
+        Removes the least recently used entries until the cache fits its maximum size.
+        Returns the number of removed entries.
+        '''
+
+        entries = []
+        totalSize = 0
+        for name in os.listdir(self.cachePath):
+            if not name.endswith('.json'): continue
+            path = os.path.join(self.cachePath, name)
+            try: stat = os.stat(path)
+            except OSError: continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            totalSize += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for mtime, size, path in entries:
+            if totalSize <= self.maxSize: break
+            try: os.remove(path)
+            except OSError: continue
+            totalSize -= size
+            removed += 1
+
+        return removed
@@ -16,8 +16,8 @@ def prepareParser(description):
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
 
-    parser.add_argument('-mp', '-mpath', '--measurements_path', required=True, type=str,
-        help='Path to the file with measurements (one line equals one entry)')
+    parser.add_argument('-mp', '-mpath', '--measurements_path', required=False, type=str, default=None,
+        help='Path to the file with measurements (one line equals one entry, required if no manifest is given)')
 
     parser.add_argument('-pp', '-ppath', '--program_path', required=True, type=str,
         help='Path to a folder that contains all required program files (e.g. "src" of "src/main/java...")')
@@ -43,6 +43,34 @@ def prepareParser(description):
     parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
         help='Add this flag to overwrite output files that already exist')
 
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes used to search for methods in the source files (0 = one per CPU)')
+
+    parser.add_argument('-nc', '-nocache', '--no_cache', required=False, action='store_true',
+        help='Add this flag to parse all source files instead of using cached method positions')
+
+    parser.add_argument('-cp', '-cpath', '--cache_path', required=False, type=str, default=None,
+        help='Path of the folder that stores the cached method positions (default: ".method_cache" in the output folder)')
+
+    parser.add_argument('-cs', '-csize', '--cache_size', required=False, type=float, default=64,
+        help='Maximum size of the method cache in MB (least recently used entries are removed)')
+
+    parser.add_argument('-ip', '-ipath', '--index_path', required=False, type=str, default=None,
+        help='Path of a symbol index file (created if missing) to find the source files of the measurements with')
+
+    parser.add_argument('-w', '-watch', '--watch', required=False, action='store_true',
+        help='Add this flag to keep watching the measurements and program files and convert again on changes')
+
+    parser.add_argument('-wi', '-winterval', '--watch_interval', required=False, type=float, default=1.0,
+        help='Seconds between checks for changes in watch mode')
+
+    parser.add_argument('-b', '-binary', '--binary', required=False, type=str, nargs='?', const='float64', default=None,
+        choices=['float32', 'float64'],
+        help='Additionally export a compact binary region file (".bin") with values of this type (default: float64)')
+
+    parser.add_argument('-mf', '-manifest', '--manifest', required=False, type=str, default=None,
+        help='Path to a JSON manifest of several measurement files to convert in one run (see README)')
+
     parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
         help='Add this flag for verbose output (debug logging enabled)')
 
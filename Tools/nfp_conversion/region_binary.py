@@ -0,0 +1,326 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Compact binary version of region files ("regions_*.json").
+# Contains the writer used by the conversion tool and a reader.
+# Run this file with a binary region file to convert it back to JSON.
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+from array import array
+from collections import OrderedDict
+
+
+MAGIC = b'VRRB'
+FORMAT_VERSION = 1
+
+# magic, version, value size, reserved,
+# string count, region count, property count, node count, value count
+HEADER = struct.Struct('<4sHBBIIIQQ')
+
+# unsigned ints per region: id string, location string,
+# nodes kind, node offset, node count, property offset, property count
+REGION_SIZE = 7
+
+# type string, name string, value offset, value count, reserved
+PROPERTY = struct.Struct('<IIQII')
+
+# nodes given as range string ("10-50") or as array of line numbers
+NODES_RANGE = 0
+NODES_ARRAY = 1
+
+VALUE_TYPES = {'float32': 'f', 'float64': 'd'}
+
+
+def align(offset, alignment=8):
+    ''' Returns the next offset that is a multiple of the alignment. '''
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class RegionBinaryWriter:
+    '''
+    Writes regions to a compact binary region file.
+    Same usage as RegionWriter (write regions one by one, then close() or abort()).
+
+    Strings (ids, locations, property types and names) are stored once in a string table,
+    node lines and property values in contiguous blocks of unsigned ints and floats.
+    All sections start at multiples of 8 bytes so they can be used directly from a memory-mapped file.
+    See "Documentation/file-specs/regions.md" for the layout.
+
+    Only properties with numeric array values (NFPs) are supported.
+    '''
+
+    def __init__(self, filePath, valueType='float64'):
+        '''
+        Parameters:
+        - filePath: path of the binary region file to write
+        - valueType: "float64" or "float32" (smaller but less precise)
+        '''
+
+        if not valueType in VALUE_TYPES:
+            raise ValueError('Unknown value type: {}'.format(valueType))
+
+        self.filePath = filePath
+        self.tmpPath = '{}.{}.tmp'.format(filePath, os.getpid())
+        self.count = 0
+
+        self.strings = []
+        self.stringIndices = {}
+        self.regions = array('I')
+        self.nodes = array('I')
+        self.properties = bytearray()
+        self.propertyCount = 0
+        self.values = array(VALUE_TYPES[valueType])
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None: self.close()
+        else: self.abort()
+        return False
+
+
+    def getStringIndex(self, string):
+        ''' Returns the index of the string in the string table (adding it if missing). '''
+
+        index = self.stringIndices.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.stringIndices[string] = index
+        return index
+
+
+    def write(self, region):
+        ''' Adds the next region (same structure as in the JSON file). '''
+
+        nodes = region['nodes']
+        nodeOffset = len(self.nodes)
+        if isinstance(nodes, str):
+            nodesKind = NODES_RANGE
+            lineFrom, lineTo = nodes.split('-')
+            self.nodes.extend((int(lineFrom), int(lineTo)))
+        else:
+            nodesKind = NODES_ARRAY
+            self.nodes.extend(nodes)
+
+        properties = region.get('properties', [])
+        for prop in properties:
+            values = prop['value']
+            self.properties += PROPERTY.pack(
+                self.getStringIndex(prop['type']),
+                self.getStringIndex(prop['name']),
+                len(self.values), len(values), 0
+            )
+            self.values.extend(values)
+
+        self.regions.extend((
+            self.getStringIndex(region['id']),
+            self.getStringIndex(region['location']),
+            nodesKind, nodeOffset, len(self.nodes) - nodeOffset,
+            self.propertyCount, len(properties)
+        ))
+
+        self.propertyCount += len(properties)
+        self.count += 1
+
+
+    def close(self):
+        ''' Writes the file and moves it to the output path. '''
+
+        if self.regions is None: return
+
+        encoded = [string.encode('utf-8') for string in self.strings]
+        stringOffsets = array('I', [0])
+        for data in encoded:
+            stringOffsets.append(stringOffsets[-1] + len(data))
+
+        # the file is always little endian
+        blocks = [stringOffsets, self.regions, self.nodes, self.values]
+        if sys.byteorder == 'big':
+            for block in blocks: block.byteswap()
+
+        with open(self.tmpPath, 'wb') as file:
+
+            file.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, self.values.itemsize, 0,
+                len(self.strings), self.count, self.propertyCount, len(self.nodes), len(self.values)
+            ))
+
+            for section in (stringOffsets.tobytes(), b''.join(encoded), self.regions.tobytes(),
+                            self.nodes.tobytes(), bytes(self.properties), self.values.tobytes()):
+                file.write(b'\0' * (align(file.tell()) - file.tell()))
+                file.write(section)
+
+        self.regions = None
+        os.replace(self.tmpPath, self.filePath)
+
+
+    def abort(self):
+        ''' Discards the regions without touching the output file. '''
+
+        self.regions = None
+        if os.path.exists(self.tmpPath): os.remove(self.tmpPath)
+
+
+class RegionBinaryReader:
+    '''
+    Reads a binary region file (see RegionBinaryWriter) through a memory map.
+    Regions are decoded on access, so opening even large files is cheap.
+    Close the reader (or use it as context manager) when finished.
+    '''
+
+    def __init__(self, filePath):
+
+        self.file = open(filePath, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, valueSize, _, self.stringCount, self.regionCount,
+            self.propertyCount, self.nodeCount, self.valueCount) = HEADER.unpack_from(self.data, 0)
+
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError('Not a binary region file of version {}: {}'.format(FORMAT_VERSION, filePath))
+
+        # section offsets (same order as written)
+        offset = align(HEADER.size)
+        self.stringOffsets = self.getBlock(offset, 'I', self.stringCount + 1)
+        offset = align(offset + self.stringOffsets.nbytes)
+        self.stringDataOffset = offset
+        offset = align(offset + self.stringOffsets[-1])
+        self.regions = self.getBlock(offset, 'I', self.regionCount * REGION_SIZE)
+        offset = align(offset + self.regions.nbytes)
+        self.nodes = self.getBlock(offset, 'I', self.nodeCount)
+        offset = align(offset + self.nodes.nbytes)
+        self.propertyOffset = offset
+        offset = align(offset + self.propertyCount * PROPERTY.size)
+        self.values = self.getBlock(offset, 'f' if valueSize == 4 else 'd', self.valueCount)
+
+        self.strings = [None] * self.stringCount
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+
+
+    def __len__(self):
+        return self.regionCount
+
+
+    def __iter__(self):
+        for regionIndex in range(self.regionCount):
+            yield self.getRegion(regionIndex)
+
+
+    def getBlock(self, offset, typecode, count):
+        ''' Returns a block of the file as typed memoryview (or a copy on big endian systems). '''
+
+        block = memoryview(self.data)[offset:offset + count * struct.calcsize(typecode)].cast(typecode)
+        if sys.byteorder == 'big':
+            swapped = array(typecode, block.tobytes())
+            swapped.byteswap()
+            block = memoryview(swapped)
+        return block
+
+
+    def getString(self, index):
+        string = self.strings[index]
+        if string is None:
+            start = self.stringDataOffset + self.stringOffsets[index]
+            end = self.stringDataOffset + self.stringOffsets[index + 1]
+            string = self.data[start:end].decode('utf-8')
+            self.strings[index] = string
+        return string
+
+
+    def getValues(self, regionIndex, propertyNo=0):
+        '''
+        Returns the values of a property of a region as memoryview
+        (or as NumPy array without copying if NumPy is installed).
+        '''
+
+        propertyIndex = self.regions[regionIndex * REGION_SIZE + 5] + propertyNo
+        _, _, valueOffset, valueCount, _ = PROPERTY.unpack_from(self.data, self.propertyOffset + propertyIndex * PROPERTY.size)
+        values = self.values[valueOffset:valueOffset + valueCount]
+
+        try: import numpy
+        except ImportError: return values
+        return numpy.frombuffer(values, dtype=values.format)
+
+
+    def getRegion(self, regionIndex):
+        ''' Returns the region as ordered dictionary like in the JSON file. '''
+
+        idIndex, locationIndex, nodesKind, nodeOffset, nodeCount, propertyIndex, propertyCount = \
+            self.regions[regionIndex * REGION_SIZE:(regionIndex + 1) * REGION_SIZE]
+
+        nodes = self.nodes[nodeOffset:nodeOffset + nodeCount].tolist()
+        if nodesKind == NODES_RANGE: nodes = '{}-{}'.format(nodes[0], nodes[1])
+
+        properties = []
+        for offset in range(propertyIndex, propertyIndex + propertyCount):
+            typeIndex, nameIndex, valueOffset, valueCount, _ = \
+                PROPERTY.unpack_from(self.data, self.propertyOffset + offset * PROPERTY.size)
+            properties.append(OrderedDict([
+                ('type', self.getString(typeIndex)),
+                ('name', self.getString(nameIndex)),
+                ('value', self.values[valueOffset:valueOffset + valueCount].tolist())
+            ]))
+
+        return OrderedDict([
+            ('id', self.getString(idIndex)),
+            ('location', self.getString(locationIndex)),
+            ('nodes', nodes),
+            ('properties', properties)
+        ])
+
+
+    def close(self):
+
+        if self.data is None: return
+
+        # release views on the memory map before closing it
+        # (still used arrays of getValues keep it open until they are deleted)
+        self.stringOffsets = self.regions = self.nodes = self.values = None
+        try: self.data.close()
+        except BufferError: pass
+        self.file.close()
+        self.data = None
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Converts a binary region file back to JSON.')
+    parser.add_argument('path', type=str, help='Path to the binary region file')
+    parser.add_argument('-o', '-opath', '--outpath', required=False, type=str, default=None,
+        help='Path of the JSON file to write (prints to the console if not given)')
+    parser.add_argument('-i', '-indent', '--indent', required=False, action='store_true',
+        help='Add this flag to write indented JSON')
+    args = parser.parse_args()
+
+    with RegionBinaryReader(args.path) as reader:
+        content = {'regions': list(reader)}
+
+    indent = 4 if args.indent else None
+    if args.outpath is None:
+        print(json.dumps(content, ensure_ascii=False, indent=indent))
+        return
+
+    with open(args.outpath, 'w') as file:
+        json.dump(content, file, ensure_ascii=False, indent=indent)
+
+
+if __name__ == '__main__':
+    main()
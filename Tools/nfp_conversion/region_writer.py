@@ -0,0 +1,89 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Writes region files ("regions_<name>.json") incrementally.
+
+import os
+import json
+
+
+class RegionWriter:
+    '''
+    Writes regions one after another to a region file
+    instead of building the whole JSON content in memory first.
+    The output is the same as of json.dump({'regions': [...]}).
+
+    The regions are written to a temporary file next to the output file
+    that replaces the output file on close(), so that readers never see a partial file.
+    Use as context manager or call close() (or abort() on errors) when finished.
+    '''
+
+    def __init__(self, filePath, indent=None):
+        '''
+        Parameters:
+        - filePath: path of the region file to write
+        - indent: indentation as used by json.dump (None to write a single line)
+        '''
+
+        self.filePath = filePath
+        self.indent = indent
+        self.tmpPath = '{}.{}.tmp'.format(filePath, os.getpid())
+        self.count = 0
+
+        # separators and indentation of region entries inside the "regions" array
+        if indent is None:
+            self.regionPrefix = ''
+            self.regionSeparator = ', '
+        else:
+            self.regionPrefix = '\n' + ' ' * (2 * indent)
+            self.regionSeparator = ','
+
+        self.file = open(self.tmpPath, 'w')
+        self.file.write('{' + ('' if indent is None else '\n' + ' ' * indent) + '"regions": [')
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None: self.close()
+        else: self.abort()
+        return False
+
+
+    def write(self, region):
+        ''' Writes the next region (a JSON object) to the file. '''
+
+        regionJSON = json.dumps(region, ensure_ascii=False, indent=self.indent)
+        if not self.indent is None:
+            regionJSON = regionJSON.replace('\n', self.regionPrefix)
+
+        if self.count > 0: self.file.write(self.regionSeparator)
+        self.file.write(self.regionPrefix + regionJSON)
+        self.count += 1
+
+
+    def close(self):
+        ''' Finishes the file and moves it to the output path. '''
+
+        if self.file is None: return
+
+        if self.indent is None or self.count == 0:
+            self.file.write(']}' if self.indent is None else ']\n}')
+        else:
+            self.file.write('\n' + ' ' * self.indent + ']\n}')
+
+        self.file.close()
+        self.file = None
+        os.replace(self.tmpPath, self.filePath)
+
+
+    def abort(self):
+        ''' Closes and removes the temporary file without touching the output file. '''
+
+        if self.file is None: return
+
+        self.file.close()
+        self.file = None
+        if os.path.exists(self.tmpPath): os.remove(self.tmpPath)
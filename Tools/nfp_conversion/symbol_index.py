@@ -0,0 +1,259 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Index of the types declared in the source files of a program.
+# Maps fully qualified type names (e.g. "main.java.Catena$Inner")
+# to the source file they are declared in.
+
+import os
+import json
+
+# additional library
+import javalang
+
+
+# increase if the format of the stored index changes
+INDEX_VERSION = 2
+
+
+class SymbolIndex:
+    '''
+    Index of fully qualified type names to source files of a program folder.
+    Besides the class named like the file, secondary top-level types
+    and nested types ("Outer$Inner") are indexed as well.
+
+    The name of a type is the path of its folder relative to the program folder
+    with dots instead of slashes, followed by the type name (as used by the measurements).
+
+    The index can be saved to a file and updated incrementally:
+    only folders with a changed modification time are listed again
+    and only their files with a changed modification time or size are scanned again.
+    Files of unchanged folders are not checked at all, so files changed in place
+    (without changing the modification time of their folder) are scanned again
+    once their folder changes or the index file is deleted.
+    '''
+
+    def __init__(self, programPath, srcCodeExtension):
+        '''
+        Parameters:
+        - programPath: path to folder with program files (e.g. "src")
+        - srcCodeExtension: extension of source code files in lower case (e.g. ".java")
+        '''
+
+        self.programPath = programPath
+        self.srcCodeExtension = srcCodeExtension
+
+        # reason why the stored index was not used (see load)
+        self.discarded = None
+
+        # format: { relative_folder_path: {mtime, subdirs, files: { file_name: {mtime, size, types} }} }
+        self.dirs = {}
+
+        # format: { qualified_type_name: (relative_file_path, type_name) }
+        self.names = {}
+
+
+    @staticmethod
+    def load(indexPath, programPath, srcCodeExtension):
+        '''
+        Loads the index from a file.
+        Returns an empty index if the file does not exist
+        or was created for another program folder, extension or index version.
+        '''
+
+        index = SymbolIndex(programPath, srcCodeExtension)
+        if not os.path.isfile(indexPath):
+            return index
+
+        try:
+            with open(indexPath, 'r') as file:
+                content = json.load(file)
+        except (OSError, ValueError) as ex:
+            index.discarded = 'failed to read it ({})'.format(str(ex))
+            return index
+
+        if content.get('version') != INDEX_VERSION:
+            index.discarded = 'other index version'
+        elif content.get('extension') != srcCodeExtension:
+            index.discarded = 'other extension ({})'.format(content.get('extension'))
+        elif content.get('program') != getProgramKey(programPath):
+            index.discarded = 'other program folder ({})'.format(content.get('program'))
+
+        if not index.discarded is None:
+            return index
+
+        index.dirs = content.get('dirs', {})
+        index.buildNames()
+        return index
+
+
+    def save(self, indexPath):
+        ''' Saves the index to a file (through a temporary file). '''
+
+        tmpPath = indexPath + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump({
+                'version': INDEX_VERSION,
+                'program': getProgramKey(self.programPath),
+                'extension': self.srcCodeExtension,
+                'dirs': self.dirs
+            }, file)
+        os.replace(tmpPath, indexPath)
+
+
+    def update(self):
+        '''
+        Updates the index to the current state of the program folder.
+        Returns the number of files that had to be scanned for types.
+        '''
+
+        newDirs = {}
+        scanned = 0
+        pending = ['']
+
+        while len(pending) > 0:
+
+            relDir = pending.pop()
+            absDir = os.path.join(self.programPath, relDir)
+
+            try: dirMtime = os.stat(absDir).st_mtime
+            except OSError: continue
+
+            # keep the entries of unchanged folders (without checking their files)
+            oldDir = self.dirs.get(relDir)
+            if not oldDir is None and oldDir['mtime'] == dirMtime:
+                newDirs[relDir] = oldDir
+                pending.extend(reversed(oldDir['subdirs']))
+                continue
+
+            oldDir = oldDir or {'files': {}}
+            subdirs, fileNames = self.listDir(absDir, relDir)
+
+            # scan changed files
+            files = {}
+            for fileName in fileNames:
+
+                try: stat = os.stat(os.path.join(absDir, fileName))
+                except OSError: continue
+
+                oldFile = oldDir['files'].get(fileName)
+                if not oldFile is None and oldFile['mtime'] == stat.st_mtime and oldFile['size'] == stat.st_size:
+                    files[fileName] = oldFile
+                    continue
+
+                files[fileName] = {
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    'types': scanTypeNames(os.path.join(absDir, fileName))
+                }
+                scanned += 1
+
+            newDirs[relDir] = {'mtime': dirMtime, 'subdirs': subdirs, 'files': files}
+            pending.extend(reversed(subdirs))
+
+        self.dirs = newDirs
+        self.buildNames()
+        return scanned
+
+
+    def listDir(self, absDir, relDir):
+        ''' Returns the relative paths of the sub-folders and the source file names of a folder. '''
+
+        subdirs = []
+        fileNames = []
+
+        try: entries = sorted(os.scandir(absDir), key=lambda e: e.name)
+        except OSError: return subdirs, fileNames
+
+        for entry in entries:
+            if entry.is_dir():
+                subdirs.append(entry.name if relDir == '' else relDir + '/' + entry.name)
+            elif entry.name.lower().endswith(self.srcCodeExtension):
+                fileNames.append(entry.name)
+
+        return subdirs, fileNames
+
+
+    def buildNames(self):
+        ''' Builds the mapping of qualified type names to files. '''
+
+        self.names = {}
+        for relDir in sorted(self.dirs):
+
+            prefix = relDir.replace('/', '.') + '.' if relDir != '' else ''
+            for fileName, fileInfo in self.dirs[relDir]['files'].items():
+
+                relFilePath = fileName if relDir == '' else relDir + '/' + fileName
+                fileNoExt = fileName[:-len(self.srcCodeExtension)]
+
+                # files are found by their name even if scanning failed
+                self.names.setdefault(prefix + fileNoExt, (relFilePath, fileNoExt))
+                for typeName in fileInfo['types']:
+                    self.names.setdefault(prefix + typeName, (relFilePath, typeName))
+
+
+    def lookup(self, qualifiedName):
+        '''
+        Returns a tuple (relative_file_path, type_name) of the source file
+        that declares the type or None if the type is unknown.
+        '''
+        return self.names.get(qualifiedName)
+
+
+def getProgramKey(programPath):
+    ''' Returns the program folder as stored in the index file (absolute and normalized). '''
+    return os.path.normcase(os.path.abspath(programPath))
+
+
+def scanTypeNames(filePath):
+    '''
+    Returns the names of all types (classes, interfaces and enums) declared in a Java file.
+    Nested types are named like "Outer$Inner".
+    Only the tokens are used (no parsing), so broken files can still be scanned.
+    '''
+
+    try:
+        with open(filePath, 'r') as file:
+            tokens = javalang.tokenizer.tokenize(file.read())
+            return scanTypeNamesFromTokens(tokens)
+    except Exception:
+        return []
+
+
+def scanTypeNamesFromTokens(tokens):
+    ''' Returns the names of all types declared in the token stream (see scanTypeNames). '''
+
+    typeNames = []
+    openTypes = [] # stack of (type name, scope depth of its body)
+    depth = 0
+    prevToken = None
+    expectName = False
+    pendingType = None
+
+    for t in tokens:
+
+        if expectName:
+            expectName = False
+            if isinstance(t, javalang.tokenizer.Identifier):
+                outer = openTypes[-1][0] + '$' if len(openTypes) > 0 else ''
+                pendingType = outer + t.value
+                typeNames.append(pendingType)
+
+        # type declaration (but not e.g. "Main.class")
+        elif isinstance(t, javalang.tokenizer.Keyword) and t.value in ('class', 'interface', 'enum'):
+            expectName = not (isinstance(prevToken, javalang.tokenizer.Separator) and prevToken.value == '.')
+
+        elif isinstance(t, javalang.tokenizer.Separator):
+            if t.value == '{':
+                depth += 1
+                if not pendingType is None:
+                    openTypes.append((pendingType, depth))
+                    pendingType = None
+            elif t.value == '}':
+                if len(openTypes) > 0 and openTypes[-1][1] == depth:
+                    openTypes.pop()
+                depth -= 1
+
+        prevToken = t
+
+    return typeNames
@@ -0,0 +1,303 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the method search and the manifest of the measurement conversion.
+# Run with: python -m unittest test_conversion
+
+import os
+import json
+import random
+import shutil
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+import conversion
+
+conversion.LOGGER = logging.getLogger('conversionTestLogger')
+
+JAVA_CODE = """package a;
+
+public class A {
+
+  @Deprecated
+  void params(@SuppressWarnings({"a", "b"}) int y) {
+    int x = 1;
+    if (x > 0) {
+      x++;
+    }
+  }
+
+  @SuppressWarnings({"a", "b"})
+  public <T> T generic(@Ann({1}) final T t, int[] z)
+      throws java.io.IOException, RuntimeException {
+    return t;
+  }
+
+  abstract void noBody(@Ann({2}) int y);
+
+  A(@Ann({3}) int y) {
+    this.y = y;
+  }
+}
+"""
+
+
+class TestFindMethodPositionsJava(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filePath = tempfile.mkstemp(suffix='.java')
+        with os.fdopen(fd, 'w') as file:
+            file.write(JAVA_CODE)
+
+    def tearDown(self):
+        os.remove(self.filePath)
+
+    def findPositions(self, methods):
+        return conversion.findMethodPositionsJava({'A': methods}, self.filePath, 'A')['A']
+
+    def test_bracketsInParameterAnnotation(self):
+        self.assertEqual(self.findPositions(['params'])['params'], {'from': 6, 'to': 11})
+
+    def test_bracketsInMethodAnnotationAndThrows(self):
+        self.assertEqual(self.findPositions(['generic'])['generic']['to'], 17)
+
+    def test_noBody(self):
+        self.assertEqual(self.findPositions(['noBody'])['noBody']['to'], 19)
+
+    def test_constructor(self):
+        self.assertEqual(self.findPositions(['<init>'])['<init>'], {'from': 21, 'to': 23})
+
+
+class TestLoadManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in ('performance.txt', 'energy.txt'):
+            with open(os.path.join(self.folder, name), 'w') as file:
+                file.write('main.java.A:params [1.0, 2.0]\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def loadManifest(self, entries):
+        manifestPath = os.path.join(self.folder, 'manifest.json')
+        with open(manifestPath, 'w') as file:
+            json.dump(entries, file)
+        return conversion.loadManifest(manifestPath)
+
+    def test_defaults(self):
+        conversions = self.loadManifest([
+            {'measurements_path': 'performance.txt'},
+            {'measurements_path': 'energy.txt', 'property_name': 'energy', 'outname': 'energy.json'}
+        ])
+        self.assertEqual([(c['property_name'], c['outname']) for c in conversions],
+            [('performance', 'regions_performance.json'), ('energy', 'energy.json')])
+        self.assertEqual(conversions[0]['measurements_path'], os.path.join(self.folder, 'performance.txt'))
+
+    def test_missingMeasurements(self):
+        self.assertIsNone(self.loadManifest([{'measurements_path': 'missing.txt'}]))
+
+    def test_duplicateOutname(self):
+        self.assertIsNone(self.loadManifest([
+            {'measurements_path': 'performance.txt'},
+            {'measurements_path': 'energy.txt', 'outname': 'regions_performance.json'}
+        ]))
+
+
+
+class TestResolveMethodPositions(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.tasks = []
+        for i in range(5):
+            className = 'A{}'.format(i)
+            filePath = os.path.join(self.folder, className + '.java')
+            with open(filePath, 'w') as file:
+                file.write(JAVA_CODE.replace('class A', 'class ' + className).replace('  A(', '  {}('.format(className)))
+            task = conversion.createTask('src/{}.java'.format(className), filePath, className)
+            task['typeMethods'][className] = ['params', '<init>'][:i % 2 + 1]
+            self.tasks.append(task)
+
+        # files that can not be read or parsed have no result
+        self.tasks.append(conversion.createTask('src/Missing.java', os.path.join(self.folder, 'Missing.java'), 'Missing'))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_sameResultsWithJobs(self):
+        results = conversion.resolveMethodPositions(self.tasks, jobs=1)
+        self.assertEqual(results[0], {'A0': {'params': {'from': 6, 'to': 11}}})
+        self.assertEqual(results[1], {'A1': {'params': {'from': 6, 'to': 11}, '<init>': {'from': 21, 'to': 23}}})
+        self.assertIsNone(results[-1])
+
+        for jobs in (2, 0):
+            self.assertEqual(conversion.resolveMethodPositions(self.tasks, jobs=jobs), results, 'jobs {}'.format(jobs))
+
+
+
+@unittest.skipIf(conversion.numpy is None, 'requires NumPy')
+class TestParseValues(unittest.TestCase):
+
+    def assertSameValues(self, valuesStr):
+        expected = conversion.parseValues(valuesStr, 1)
+        values = conversion.parseValuesNumPy(valuesStr, 1)
+        self.assertEqual(values, expected, valuesStr)
+        self.assertEqual([str(value) for value in values], [str(value) for value in expected], valuesStr)
+
+    def test_sameAsWithoutNumPy(self):
+        self.assertSameValues('1.0, 2.5,-3.25')
+        self.assertSameValues(' 0.00005, 0.00015, 0.00025, -0.00005, 1e-9, -0.0, 0')
+        self.assertSameValues('123456789.123456, 1E3, -2.71828182')
+        self.assertSameValues('1.0, abc, 3.0')
+        self.assertSameValues('')
+
+        rng = random.Random(5)
+        valuesStr = ', '.join(repr(rng.uniform(-10, 10) * 10 ** rng.randint(-6, 6)) for _ in range(1000))
+        self.assertSameValues(valuesStr)
+
+    def test_noNegativeZero(self):
+        values = conversion.parseValuesNumPy('-0.0, -0.00001, 0.00001', 1)
+        self.assertEqual([str(value) for value in values], ['0.0', '0.0', '0.0'])
+
+    def test_prepareData(self):
+        data = conversion.prepareData('main.java.A:help(String[], int) [1.23456, 2]', 1)
+        self.assertEqual(data, {'file': 'main.java.A', 'method': 'help(String[], int)', 'values': [1.2346, 2.0]})
+
+
+
+NESTED_CODE = """package p;
+
+public class Outer {
+  void run() {
+  }
+
+  static class Inner {
+    void run() {
+      Runnable r = new Runnable() { public void run() {} };
+    }
+
+    class Deep {
+      int get() { return 1; }
+    }
+  }
+
+  enum Mode {
+    FAST;
+    void apply() {
+    }
+  }
+}
+
+class Helper {
+  void help() {}
+}
+"""
+
+
+class TestNestedTypes(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.programPath = os.path.join(self.folder, 'src')
+        os.makedirs(os.path.join(self.programPath, 'p'))
+        self.filePath = os.path.join(self.programPath, 'p', 'Outer.java')
+        with open(self.filePath, 'w') as file:
+            file.write(NESTED_CODE)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_allTypesOneParse(self):
+        typeMethods = {'Outer': ['run'], 'Outer$Inner': ['run'], 'Outer$Inner$Deep': ['get'], 'Outer$Mode': ['apply'], 'Helper': ['help'], 'Outer$Missing': ['run']}
+        with mock.patch('javalang.tokenizer.tokenize', wraps=conversion.javalang.tokenizer.tokenize) as tokenize:
+            positions = conversion.findMethodPositionsJava(typeMethods, self.filePath, 'Outer')
+        self.assertEqual(tokenize.call_count, 1)
+
+        self.assertEqual(positions, {
+            'Outer': {'run': {'from': 4, 'to': 5}},
+            'Outer$Inner': {'run': {'from': 8, 'to': 10}},
+            'Outer$Inner$Deep': {'get': {'from': 13, 'to': 13}},
+            'Outer$Mode': {'apply': {'from': 19, 'to': 20}},
+            'Helper': {'help': {'from': 25, 'to': 25}}
+        })
+
+    def test_oneTaskPerFile(self):
+        groupedData = {'p.Outer': {'run': [[1.0]]}, 'p.Outer$Inner': {'run': [[2.0]]}, 'p.Outer$Mode': {'apply': [[3.0]]}}
+        tasks = conversion.collectSourceFiles(self.programPath, '.java', groupedData)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0]['typeMethods'], {'Outer': ['run'], 'Outer$Inner': ['run'], 'Outer$Mode': ['apply']})
+        self.assertEqual(tasks[0]['dataPaths'], {'Outer': 'p.Outer', 'Outer$Inner': 'p.Outer$Inner', 'Outer$Mode': 'p.Outer$Mode'})
+
+
+RESOLVE_METHOD_POSITIONS = conversion.resolveMethodPositions
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.programPath = os.path.join(self.folder, 'src')
+        self.outputPath = os.path.join(self.folder, 'watch')
+        self.dataPath = os.path.join(self.folder, 'values.txt')
+        os.makedirs(os.path.join(self.programPath, 'p'))
+        os.mkdir(self.outputPath)
+        for className in ('A', 'B'):
+            self.writeFile(os.path.join(self.programPath, 'p', className + '.java'), self.getCode(className))
+        self.writeFile(self.dataPath, 'p.A:params [1.0, 2.0]\np.B:<init> [3.0, 4.0]\np.B:params [5.0, 6.0]\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def getCode(self, className, header=''):
+        return JAVA_CODE.replace('package a;', 'package p;' + header).replace('class A', 'class ' + className).replace('  A(', '  {}('.format(className))
+
+    def writeFile(self, path, content):
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def readRegions(self, outputPath):
+        with open(os.path.join(outputPath, conversion.EXPORT_NAME), 'r') as file:
+            return sorted(json.load(file)['regions'], key=lambda region: region['id'])
+
+    def convertRegions(self):
+        ''' Converts the current files with convert to compare the watched output with. '''
+
+        outputPath = tempfile.mkdtemp(dir=self.folder)
+        with mock.patch('conversion.resolveMethodPositions', RESOLVE_METHOD_POSITIONS):
+            conversion.convert(self.dataPath, self.programPath, '.java', outputPath, 'performance')
+        return self.readRegions(outputPath)
+
+    def test_sameAsConvert(self):
+        changes = [
+            lambda: self.writeFile(os.path.join(self.programPath, 'p', 'A.java'), self.getCode('A', '\n\n// moved\n')),
+            lambda: self.writeFile(self.dataPath, 'p.A:params [7.0, 8.0]\np.B:params [9.5, 10.0]\n'),
+            lambda: os.remove(os.path.join(self.programPath, 'p', 'B.java'))
+        ]
+        snapshots = []
+
+        def sleep(interval):
+            snapshots.append((self.readRegions(self.outputPath), self.convertRegions()))
+            if len(changes) == 0: raise KeyboardInterrupt()
+            changes.pop(0)()
+
+        with mock.patch.object(conversion.time, 'sleep', side_effect=sleep), \
+            mock.patch('conversion.resolveMethodPositions', wraps=conversion.resolveMethodPositions) as resolve:
+            conversion.watch(self.dataPath, self.programPath, '.java', self.outputPath, 'performance', interval=0)
+
+        self.assertEqual(len(snapshots), 4)
+        for i, (watched, converted) in enumerate(snapshots):
+            self.assertEqual(watched, converted, 'snapshot {}'.format(i))
+        self.assertEqual(len(snapshots[0][0]), 3)
+        self.assertEqual([region['nodes'] for region in snapshots[0][0] if region['location'].endswith('A.java')], ['6-11'])
+        self.assertEqual([region['nodes'] for region in snapshots[1][0] if region['location'].endswith('A.java')], ['9-14'])
+        self.assertEqual(len(snapshots[3][0]), 1)
+
+        # only changed files and files with other methods to search for are parsed again
+        self.assertEqual([len(call.args[0]) for call in resolve.call_args_list], [2, 1, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the cache of method positions.
+# Run with: python -m unittest test_method_cache
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+import conversion
+from method_cache import MethodPositionCache
+from test_conversion import JAVA_CODE
+
+conversion.LOGGER = logging.getLogger('methodCacheTestLogger')
+
+POSITIONS = {'A:params': {'from': 6, 'to': 11}, 'A:<init>': {'from': 21, 'to': 23}}
+
+
+class TestMethodPositionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cachePath = os.path.join(self.folder, 'out', '.method_cache')
+        self.filePath = self.writeFile('A.java', JAVA_CODE)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def writeFile(self, name, content):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def test_missAndHit(self):
+        cache = MethodPositionCache(self.cachePath, version='1')
+        self.assertTrue(os.path.isdir(self.cachePath))
+
+        key = cache.getKey(self.filePath)
+        self.assertIsNone(cache.get(key, list(POSITIONS)))
+        cache.put(key, list(POSITIONS), POSITIONS)
+        self.assertEqual(cache.get(key, ['A:params']), {'A:params': POSITIONS['A:params']})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_missingMethods(self):
+        cache = MethodPositionCache(self.cachePath)
+        key = cache.getKey(self.filePath)
+        cache.put(key, ['A:params', 'A:unknown'], POSITIONS)
+
+        # methods that were not found are served from the cache as well
+        self.assertEqual(cache.get(key, ['A:params', 'A:unknown']), {'A:params': POSITIONS['A:params']})
+
+        # methods that were not searched for yet are a miss
+        self.assertIsNone(cache.get(key, ['A:params', 'A:<init>']))
+        cache.put(key, ['A:<init>', 'A:unknown'], POSITIONS)
+        self.assertEqual(cache.get(key, list(POSITIONS) + ['A:unknown']), POSITIONS)
+
+    def test_keys(self):
+        key = MethodPositionCache(self.cachePath, version='1').getKey(self.filePath)
+        self.assertEqual(MethodPositionCache(self.cachePath, version='1').getKey(self.filePath), key)
+        self.assertNotEqual(MethodPositionCache(self.cachePath, version='2').getKey(self.filePath), key)
+
+        self.writeFile('A.java', JAVA_CODE + '\n')
+        self.assertNotEqual(MethodPositionCache(self.cachePath, version='1').getKey(self.filePath), key)
+
+    def test_invalidEntry(self):
+        cache = MethodPositionCache(self.cachePath)
+        key = cache.getKey(self.filePath)
+        with open(cache.getEntryPath(key), 'w') as file:
+            file.write('{"methods": {')
+
+        self.assertIsNone(cache.get(key, ['A:params']))
+        cache.put(key, ['A:params'], POSITIONS)
+        self.assertEqual(cache.get(key, ['A:params']), {'A:params': POSITIONS['A:params']})
+
+    def test_prune(self):
+        cache = MethodPositionCache(self.cachePath)
+        now = time.time()
+        for i in range(4):
+            key = 'entry{}'.format(i)
+            cache.put(key, ['A:params'], POSITIONS)
+            os.utime(cache.getEntryPath(key), (now - 100 + i, now - 100 + i))
+        entrySize = os.path.getsize(cache.getEntryPath('entry0'))
+
+        # the oldest entry is used again and kept
+        cache.get('entry0', ['A:params'])
+        cache.maxSize = 2 * entrySize
+        self.assertEqual(cache.prune(), 2)
+        self.assertEqual(sorted(os.listdir(self.cachePath)), ['entry0.json', 'entry3.json'])
+        self.assertEqual(cache.prune(), 0)
+
+
+class TestResolveWithCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.folder, 'A.java')
+        with open(self.filePath, 'w') as file:
+            file.write(JAVA_CODE)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def resolve(self, cache):
+        task = conversion.createTask('src/A.java', self.filePath, 'A')
+        task['typeMethods']['A'] = ['params', '<init>', 'unknown']
+        return conversion.resolveMethodPositions([task], cache=cache)
+
+    def test_cachedFilesNotParsed(self):
+        cache = MethodPositionCache(os.path.join(self.folder, conversion.CACHE_NAME), version=str(conversion.RESOLVER_VERSION))
+        results = self.resolve(cache)
+        self.assertEqual(results, [{'A': {'params': {'from': 6, 'to': 11}, '<init>': {'from': 21, 'to': 23}}}])
+
+        with mock.patch('conversion.resolveMethodPositionsTask') as parse:
+            self.assertEqual(self.resolve(cache), results)
+        parse.assert_not_called()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Round-trip tests of the binary region files:
+# regions are exported as JSON and binary file (see conversion.exportRegions)
+# and the binary file is read back with the memory-mapped reader.
+# Run with: python -m unittest test_region_binary
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+
+import conversion
+from region_binary import RegionBinaryReader, RegionBinaryWriter
+
+conversion.LOGGER = logging.getLogger('regionBinaryTestLogger')
+
+REGIONS = [
+    {
+        'id': 'a1', 'location': 'src/main/java/Catena.java', 'nodes': '10-50',
+        'properties': [
+            {'type': 'nfp', 'name': 'performance', 'value': [1.5, -2.25, 0.0, 1e-3, 123456.789]},
+            {'type': 'nfp', 'name': 'energy', 'value': [0.1, 0.2]}
+        ]
+    },
+    {
+        'id': 'b2', 'location': 'src/main/java/Äpfel.java', 'nodes': [3, 7, 8, 12],
+        'properties': [{'type': 'nfp', 'name': 'performance', 'value': []}]
+    },
+    {
+        'id': 'c3', 'location': 'src/main/java/Catena.java', 'nodes': '60-61',
+        'properties': []
+    },
+    {
+        'id': 'd4', 'location': 'src/main/java/Helper.java', 'nodes': [],
+        'properties': [{'type': 'nfp', 'name': 'performance', 'value': [-0.5]}]
+    }
+]
+
+
+class TestRegionBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.jsonPath = os.path.join(self.folder, 'regions_performance.json')
+        self.binaryPath = os.path.join(self.folder, 'regions_performance.bin')
+
+    def tearDown(self):
+        conversion.EXPORT_BINARY = None
+        shutil.rmtree(self.folder)
+
+    def export(self, regions, valueType):
+        ''' Exports the regions like the conversion tool and returns the regions of the JSON file. '''
+
+        conversion.EXPORT_BINARY = valueType
+        self.assertEqual(conversion.exportRegions(self.jsonPath, iter(regions)), len(regions))
+        with open(self.jsonPath, 'r') as file:
+            return json.load(file)['regions']
+
+    def readBinary(self):
+        with RegionBinaryReader(self.binaryPath) as reader:
+            return [json.loads(json.dumps(region)) for region in reader]
+
+    def test_float64(self):
+        jsonRegions = self.export(REGIONS, 'float64')
+        self.assertEqual(self.readBinary(), jsonRegions)
+
+    def test_float32(self):
+        jsonRegions = self.export(REGIONS, 'float32')
+        binaryRegions = self.readBinary()
+        self.assertEqual(len(binaryRegions), len(jsonRegions))
+
+        for binaryRegion, jsonRegion in zip(binaryRegions, jsonRegions):
+            for key in ('id', 'location', 'nodes'):
+                self.assertEqual(binaryRegion[key], jsonRegion[key])
+            self.assertEqual(len(binaryRegion['properties']), len(jsonRegion['properties']))
+
+            for binaryProperty, jsonProperty in zip(binaryRegion['properties'], jsonRegion['properties']):
+                self.assertEqual(binaryProperty['type'], jsonProperty['type'])
+                self.assertEqual(binaryProperty['name'], jsonProperty['name'])
+                self.assertEqual(len(binaryProperty['value']), len(jsonProperty['value']))
+                for binaryValue, jsonValue in zip(binaryProperty['value'], jsonProperty['value']):
+                    self.assertAlmostEqual(binaryValue, jsonValue, delta=abs(jsonValue) * 1e-6)
+
+    def test_nodeKinds(self):
+        self.export(REGIONS, 'float64')
+        with RegionBinaryReader(self.binaryPath) as reader:
+            self.assertEqual(reader.getRegion(0)['nodes'], '10-50')
+            self.assertEqual(reader.getRegion(1)['nodes'], [3, 7, 8, 12])
+            self.assertEqual(reader.getRegion(3)['nodes'], [])
+
+    def test_getValues(self):
+        self.export(REGIONS, 'float64')
+        with RegionBinaryReader(self.binaryPath) as reader:
+            self.assertEqual(list(reader.getValues(0)), REGIONS[0]['properties'][0]['value'])
+            self.assertEqual(list(reader.getValues(0, 1)), REGIONS[0]['properties'][1]['value'])
+            self.assertEqual(len(reader.getValues(1)), 0)
+
+    def test_onlyEmptyValues(self):
+        jsonRegions = self.export([REGIONS[1], REGIONS[2]], 'float32')
+        self.assertEqual(self.readBinary(), jsonRegions)
+
+    def test_noRegions(self):
+        self.assertEqual(self.readBinaryOf([]), [])
+
+    def readBinaryOf(self, regions):
+        ''' Writes the regions with the binary writer only and reads them back. '''
+
+        with RegionBinaryWriter(self.binaryPath, valueType='float32') as writer:
+            for region in regions: writer.write(region)
+        return self.readBinary()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the incremental region file writer.
+# Run with: python -m unittest test_region_writer
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from region_writer import RegionWriter
+
+REGIONS = [
+    {'id': 'a1', 'location': 'src/main/java/Catena.java', 'nodes': '10-50',
+        'properties': [{'type': 'nfp', 'name': 'performance', 'value': [1.5, 0.0]}]},
+    {'id': 'b2', 'location': 'src/main/java/Äpfel.java', 'nodes': [3, 7],
+        'properties': [{'type': 'nfp', 'name': 'performance', 'value': []}]},
+    {'id': 'c3', 'location': 'src/main/java/Helper.java', 'nodes': '1-2', 'properties': []}
+]
+
+
+class TestRegionWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.folder, 'regions_performance.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def readFile(self):
+        with open(self.filePath, 'r') as file:
+            return file.read()
+
+    def test_sameAsJsonDump(self):
+        for indent in (None, 2, 4):
+            for count in (0, 1, len(REGIONS)):
+                with RegionWriter(self.filePath, indent=indent) as writer:
+                    for region in REGIONS[:count]: writer.write(region)
+
+                expected = json.dumps({'regions': REGIONS[:count]}, ensure_ascii=False, indent=indent)
+                self.assertEqual(self.readFile(), expected, 'indent {}, regions {}'.format(indent, count))
+                self.assertEqual(writer.count, count)
+
+    def test_noPartialFile(self):
+        with open(self.filePath, 'w') as file:
+            file.write('previous')
+
+        writer = RegionWriter(self.filePath)
+        writer.write(REGIONS[0])
+        self.assertEqual(self.readFile(), 'previous')
+        writer.close()
+        self.assertEqual(json.loads(self.readFile()), {'regions': REGIONS[:1]})
+        self.assertEqual(os.listdir(self.folder), ['regions_performance.json'])
+
+    def test_abortOnError(self):
+        with open(self.filePath, 'w') as file:
+            file.write('previous')
+
+        with self.assertRaises(ValueError):
+            with RegionWriter(self.filePath, indent=4) as writer:
+                writer.write(REGIONS[0])
+                raise ValueError('failed to create the next region')
+
+        self.assertEqual(self.readFile(), 'previous')
+        self.assertEqual(os.listdir(self.folder), ['regions_performance.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
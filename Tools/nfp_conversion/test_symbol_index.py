@@ -0,0 +1,82 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the symbol index.
+# Run with: python -m unittest test_symbol_index
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from symbol_index import SymbolIndex
+
+
+class TestSymbolIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.programPath = os.path.join(self.folder, 'src')
+        self.indexPath = os.path.join(self.folder, 'symbols.json')
+        self.writeFile('main/java/Catena.java', 'package main.java; class Catena { class Inner {} } class Helper {}')
+        self.writeFile('main/java/util/Tool.java', 'package main.java.util; class Tool {}')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def writeFile(self, relPath, content):
+        path = os.path.join(self.programPath, relPath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def updateIndex(self, programPath=None):
+        ''' Loads, updates and saves the index like conversion.loadSymbolIndex. Returns the index and scanned files. '''
+
+        index = SymbolIndex.load(self.indexPath, programPath or self.programPath, '.java')
+        scanned = index.update()
+        index.save(self.indexPath)
+        return index, scanned
+
+    def test_lookup(self):
+        index, scanned = self.updateIndex()
+        self.assertEqual(scanned, 2)
+        self.assertEqual(index.lookup('main.java.Catena$Inner'), ('main/java/Catena.java', 'Catena$Inner'))
+        self.assertEqual(index.lookup('main.java.Helper'), ('main/java/Catena.java', 'Helper'))
+        self.assertEqual(index.lookup('main.java.util.Tool'), ('main/java/util/Tool.java', 'Tool'))
+        self.assertIsNone(index.lookup('main.java.Missing'))
+
+    def test_unchangedFoldersNotChecked(self):
+        self.updateIndex()
+        with mock.patch('os.stat', wraps=os.stat) as stat:
+            index, scanned = self.updateIndex()
+        statPaths = [os.path.normpath(call.args[0]) for call in stat.call_args_list]
+        self.assertEqual(scanned, 0)
+        self.assertFalse(any(path.endswith('.java') for path in statPaths))
+        self.assertEqual(index.lookup('main.java.Helper'), ('main/java/Catena.java', 'Helper'))
+
+    def test_changedFolderScanned(self):
+        self.updateIndex()
+        self.writeFile('main/java/util/Other.java', 'package main.java.util; class Other { enum Mode {} }')
+        index, scanned = self.updateIndex()
+        self.assertEqual(scanned, 1)
+        self.assertEqual(index.lookup('main.java.util.Other$Mode'), ('main/java/util/Other.java', 'Other$Mode'))
+
+    def test_otherProgramFolder(self):
+        self.updateIndex()
+        otherPath = os.path.join(self.folder, 'other')
+        os.mkdir(otherPath)
+        index = SymbolIndex.load(self.indexPath, otherPath, '.java')
+        self.assertIsNotNone(index.discarded)
+        self.assertEqual(index.update(), 0)
+        self.assertIsNone(index.lookup('main.java.Catena'))
+
+    def test_sameProgramFolder(self):
+        self.updateIndex()
+        index = SymbolIndex.load(self.indexPath, self.programPath + os.sep, '.java')
+        self.assertIsNone(index.discarded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Prepares a software system folder (e.g. "SoftwareSystems/example_system")
+# for the VR application in a single run, driven by its "app_config.json":
+# - rich text files of the source code (code_to_rt)
+# - region files of the measurements (nfp_conversion)
+# - the performance model (model_conversion)
+#
+# Each source file is read only once. The same text is highlighted
+# and searched for the measured methods by a pool of processes.
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# the other tools are scripts in their own folders
+TOOLS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for toolFolder in ('nfp_conversion', 'code_to_rt', 'model_conversion'):
+    sys.path.insert(0, os.path.join(TOOLS_PATH, toolFolder))
+
+import conversion
+import parser_and_logger
+import json2csv
+import main as codeToRT
+from colorSchema import loadSchema
+
+LOGGER = None
+
+# settings of the worker processes (see initWorker)
+DEBUG = False
+OVERWRITE = False
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='Prepare a software system folder (rich text files, regions and model) in one run.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    prepareParser(parser)
+    args = parser.parse_args()
+
+    global LOGGER
+    LOGGER = parser_and_logger.prepareLogger(name='pipelineLogger', logPath=args.logfile, verboseLogging=args.verbose)
+
+    # the tools log to the same logger
+    conversion.LOGGER = LOGGER
+    codeToRT.LOGGER = LOGGER
+    conversion.EXPORT_INDENTED = not args.no_indentation
+
+    # load the app config of the system
+    configPath = os.path.join(args.system, 'app_config.json')
+    try:
+        with open(configPath, 'r') as file:
+            appConfig = json.load(file)
+    except (OSError, ValueError) as ex:
+        LOGGER.error('Failed to load the app config: {} - {}'.format(configPath, str(ex)))
+        return
+
+    rootFolder = appConfig['software_system']['root_folder']
+    features = appConfig.get('features', [])
+
+    try:
+        jsonSchema = loadSchema(args.colorschema)
+    except Exception as ex:
+        LOGGER.error('Failed to load the color schema: {} - {}'.format(args.colorschema, str(ex)))
+        return
+
+    sourcePath = os.path.normpath(args.source_path)
+    if not os.path.isdir(sourcePath):
+        LOGGER.error('The source path is no folder: {}'.format(sourcePath))
+        return
+
+    # load the measurements and collect the files with measured methods
+    conversions = [parseMeasurementsArgument(argument) for argument in args.measurements]
+    groupedDatas = [conversion.loadMeasurements(measurementsPath, args.verbose) for _, measurementsPath in conversions]
+    tasks = conversion.collectSourceFiles(sourcePath, args.source_code_extension, conversion.combineMeasurements(groupedDatas), args.verbose)
+
+    # region locations are relative to the root folder of the system
+    srcDirName = os.path.normcase(os.path.basename(sourcePath)) + '/'
+    for task in tasks:
+        task['location'] = rootFolder + '/' + task['location'][len(srcDirName):]
+
+    # highlight all source files and search for the methods
+    fileJobs = collectFileJobs(sourcePath, os.path.join(args.system, rootFolder), tasks)
+    if fileJobs is None: return
+    positions = prepareFiles(fileJobs, jsonSchema, args)
+    results = [positions.get(task['filePath']) for task in tasks]
+
+    # export the regions of each property
+    modelRegions = None
+    for (propertyName, measurementsPath), groupedData in zip(conversions, groupedDatas):
+
+        LOGGER.info('Exporting regions of: {}'.format(measurementsPath))
+        dataTasks, dataResults = conversion.selectMethodPositions(tasks, results, groupedData)
+        conversion.logUnusedFiles(groupedData, dataTasks)
+
+        outputFilePath = conversion.prepareOutputFile(args.system, 'regions_{}.json'.format(propertyName), args.overwrite)
+        if outputFilePath is None: continue
+
+        fileMethodPositions, groupedDataLink = conversion.mergeMethodPositions(dataTasks, dataResults)
+        regions = list(conversion.createRegions(fileMethodPositions, groupedDataLink, groupedData, propertyName))
+        conversion.exportRegions(outputFilePath, regions)
+        LOGGER.info('Exported regions: {}'.format(len(regions)))
+
+        if modelRegions is None: modelRegions = (propertyName, regions)
+
+    # export the model of the first property
+    if not modelRegions is None:
+        propertyName, regions = modelRegions
+        modelPath = conversion.prepareOutputFile(args.system, 'model.csv', args.overwrite)
+        if not modelPath is None:
+            valueColumn = json2csv.VALUE_COLUMN if propertyName == 'performance' else propertyName
+            try:
+                json2csv.writeModel(regions, modelPath, features=features, extraColumns=args.extra_columns,
+                    valueColumn=valueColumn, truncate=args.truncate)
+                LOGGER.info('Exported model: {}'.format(modelPath))
+            except ValueError as ex:
+                # do not leave an incomplete model file behind
+                LOGGER.error('Failed to export the model: {}'.format(str(ex)))
+                if os.path.isfile(modelPath): os.remove(modelPath)
+
+    LOGGER.info('Finished preparing the system: {}'.format(os.path.abspath(args.system)))
+
+
+def parseMeasurementsArgument(argument):
+    ''' Returns a tuple (property name, path) of a measurements argument ("[property=]path"). '''
+
+    if '=' in argument and not os.path.exists(argument):
+        propertyName, measurementsPath = argument.split('=', 1)
+        return propertyName, measurementsPath
+    return 'performance', argument
+
+
+def collectFileJobs(sourcePath, outputFolder, tasks):
+    '''
+    Returns a job (file path, rich text file path, task or None) for each source file
+    and creates the output folders of the rich text files.
+    Returns None on errors.
+    '''
+
+    taskByPath = {task['filePath']: task for task in tasks}
+    fileJobs = []
+
+    for curDir, subDirs, files in os.walk(sourcePath, topdown=True):
+        subDirs.sort()
+
+        curOutFolder = os.path.normpath(os.path.join(outputFolder, os.path.relpath(curDir, sourcePath)))
+        try: os.makedirs(curOutFolder, exist_ok=True)
+        except OSError:
+            LOGGER.exception('Failed to create an output folder: {}'.format(curOutFolder))
+            return None
+
+        for file in sorted(files):
+            filePath = os.path.normpath(curDir + '/' + file)
+            fileJobs.append((filePath, os.path.join(curOutFolder, file + '.rt'), taskByPath.get(filePath)))
+
+    return fileJobs
+
+
+def prepareFiles(fileJobs, jsonSchema, args):
+    '''
+    Highlights the files and searches for the methods of their tasks.
+    Returns the method positions per file path of each task (see conversion.resolveMethodPositions).
+    '''
+
+    jobs = args.jobs
+    if jobs == 0: jobs = os.cpu_count() or 1
+
+    codeToRTArgs = (jsonSchema, args.verbose, args.direct, codeToRT.STREAM_LIMIT, args.line_index)
+    initArgs = (codeToRTArgs, args.verbose, args.overwrite)
+
+    if jobs <= 1:
+        initWorker(*initArgs)
+        positions, exported = collectResults(fileJobs, map(prepareFile, fileJobs))
+    else:
+        LOGGER.info('Preparing {} files using {} processes...'.format(len(fileJobs), jobs))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker, initargs=initArgs) as executor:
+            results = executor.map(prepareFile, fileJobs, chunksize=max(1, len(fileJobs) // (jobs * 4)))
+            positions, exported = collectResults(fileJobs, results)
+
+    LOGGER.info('Exported rich text files: {} of {}'.format(exported, len(fileJobs)))
+    return positions
+
+
+def collectResults(fileJobs, results):
+    '''
+    Returns the method positions per file path of each task
+    and the number of exported rich text files (see prepareFile).
+    '''
+
+    positions = {}
+    exported = 0
+
+    for (filePath, _, task), (rtPath, typeMethodPositions) in zip(fileJobs, results):
+        if not rtPath is None: exported += 1
+        if not task is None: positions[filePath] = typeMethodPositions
+
+    return positions, exported
+
+
+def initWorker(codeToRTArgs, debug=False, overwrite=False):
+    ''' Prepares a (worker) process to prepare files with prepareFile. '''
+
+    global DEBUG, OVERWRITE
+    DEBUG = debug
+    OVERWRITE = overwrite
+
+    conversion.initWorker(debug)
+    codeToRT.initWorker(*codeToRTArgs)
+
+
+def prepareFile(fileJob):
+    '''
+    Reads a source file once, exports it as rich text file
+    and searches for the methods of its task (if any).
+    Returns a tuple of the rich text file path (None if not exported) and the method positions.
+    '''
+
+    filePath, rtPath, task = fileJob
+
+    try:
+        with open(filePath, 'r') as file:
+            code = file.read()
+    except (OSError, UnicodeDecodeError) as ex:
+        codeToRT.LOGGER.error('Failed to read file: {} - {}'.format(filePath, str(ex)))
+        return None, None
+
+    # highlighting
+    richText = codeToRT.convertCode(filePath, code)
+    if richText is None:
+        codeToRT.LOGGER.debug('No lexer for file: {}'.format(filePath))
+        rtPath = None
+    elif codeToRT.writeToFile(rtPath, richText, OVERWRITE):
+        if codeToRT.LINE_INDEX: codeToRT.writeLineIndex(rtPath)
+    else:
+        rtPath = None
+
+    # method positions
+    typeMethodPositions = None
+    if not task is None:
+        typeMethodPositions = conversion.findMethodPositionsJava(
+            typeMethods=task['typeMethods'],
+            filePath=filePath,
+            filenameNoExt=task['filenameNoExt'],
+            debug=DEBUG,
+            code=code
+        )
+
+    return rtPath, typeMethodPositions
+
+
+def prepareParser(parser):
+    ''' Prepares the argument parser by adding required arguments to it. '''
+
+    parser.add_argument('-s', '-system', '--system', required=True, type=str,
+        help='Path to the software system folder (contains the "app_config.json")')
+
+    parser.add_argument('-sp', '-spath', '--source_path', required=True, type=str,
+        help='Path to the folder with the source code (e.g. "src" of "src/main/java...")')
+
+    parser.add_argument('-m', '-measurements', '--measurements', required=False, type=str, nargs='*', default=[],
+        help='Measurement files to convert to regions, optionally with property name (e.g. "energy=energy.txt", default: performance). '
+            'The model is exported for the first one.')
+
+    parser.add_argument('-c', '-cs', '-colorschema', '--colorschema', required=False, type=str,
+        default=os.path.join(TOOLS_PATH, 'code_to_rt', 'schema', 'monokai.json'),
+        help='Path to a JSON color schema or Pygments style for the rich text files')
+
+    parser.add_argument('-sce', '-sc_extension', '--source_code_extension', required=False, type=str, default=".java",
+        help='Extension of source code files to search for methods in')
+
+    parser.add_argument('-ec', '-extra_columns', '--extra_columns', required=False, type=str, nargs='*', default=[],
+        help='Additional option columns of the model after the features (e.g. "hash graph")')
+
+    parser.add_argument('-t', '-truncate', '--truncate', required=False, action='store_true',
+        help='Add this flag to drop values without option column of the model (with a warning) instead of failing')
+
+    parser.add_argument('-d', '-direct', '--direct', required=False, action='store_true',
+        help='Add this flag to format the tokens directly to rich text (see code_to_rt)')
+
+    parser.add_argument('-li', '-line_index', '--line_index', required=False, action='store_true',
+        help='Add this flag to export a line index for each rich text file (see code_to_rt)')
+
+    parser.add_argument('-ni', '-nindentation', '--no_indentation', required=False, action='store_true',
+        help='Add this flag to disable indentation of the region files')
+
+    parser.add_argument('-ow', '-overwrite', '--overwrite', required=False, action='store_true',
+        help='Add this flag to overwrite output files that already exist')
+
+    parser.add_argument('-j', '-jobs', '--jobs', required=False, type=int, default=1,
+        help='Number of processes to prepare the files with (0 = number of CPUs)')
+
+    parser.add_argument('-lf', '-logfile', '--logfile', required=False, type=str, default="logging",
+        help='Path and name of the log file. Set empty to disable logging to a file.')
+
+    parser.add_argument('-v', '-verbose', '--verbose', required=False, action='store_true',
+        help='Add this flag for verbose output (debug logging enabled)')
+
+
+if __name__ == '__main__':
+    main()
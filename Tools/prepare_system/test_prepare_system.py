@@ -0,0 +1,158 @@
+# Code by Leon H.
+# github.com/S1r0hub
+#
+# Tests of the pipeline: the prepared files are compared
+# to the files exported by the single tools.
+# Run with: python -m unittest test_prepare_system
+
+import os
+import sys
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+import prepare_system
+from prepare_system import conversion, codeToRT, json2csv, loadSchema
+
+LOGGER = logging.getLogger('prepareSystemTestLogger')
+
+SCHEMA_PATH = os.path.join(prepare_system.TOOLS_PATH, 'code_to_rt', 'schema', 'monokai.json')
+
+SOURCES = {
+    os.path.join('p', 'Main.java'): 'package p;\n\npublic class Main {\n    // entry point\n    public static void main(String[] args) {\n        run(args.length);\n    }\n\n    static int run(int count) {\n        return count * 2;\n    }\n}\n',
+    os.path.join('p', 'util', 'Tool.java'): 'package p.util;\n\nclass Tool {\n    Tool() {\n    }\n\n    void apply() {\n        System.out.println("Äpfel");\n    }\n}\n',
+    os.path.join('p', 'tool.py'): 'import os\n\ndef run(path):\n    return os.path.getsize(path)\n'
+}
+
+MEASUREMENTS = {
+    'values.txt': 'p.Main:run [1.5, 2.0, -0.5]\np.Main:main [10.0, 0.0, 0.25]\np.util.Tool:apply [3.0, 1.0, 2.0]\np.Missing:run [1.0, 1.0, 1.0]\n',
+    'energy.txt': 'p.util.Tool:<init> [0.5, 0.5, 0.5]\np.util.Tool:apply [7.0, 8.0, 9.0]\n'
+}
+
+FEATURES = ['a', 'b']
+
+
+def readFiles(folder, extension):
+    ''' Returns the content of each file with the extension in the folder (relative path -> content). '''
+
+    contents = {}
+    for curDir, _, files in os.walk(folder):
+        for file in files:
+            if not file.endswith(extension): continue
+            path = os.path.join(curDir, file)
+            with open(path, 'r') as f:
+                contents[os.path.relpath(path, folder)] = f.read()
+    return contents
+
+
+class TestPrepareSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.sourcePath = os.path.join(self.folder, 'src')
+        self.systemPath = os.path.join(self.folder, 'system')
+        os.mkdir(self.systemPath)
+
+        for name, code in SOURCES.items():
+            self.writeFile(os.path.join(self.sourcePath, name), code)
+        for name, values in MEASUREMENTS.items():
+            self.writeFile(os.path.join(self.folder, name), values)
+        self.writeFile(os.path.join(self.systemPath, 'app_config.json'), json.dumps({
+            'software_system': {'path': '.', 'root_folder': 'src'},
+            'features': FEATURES
+        }))
+
+        self.loggers = (conversion.LOGGER, codeToRT.LOGGER)
+        conversion.LOGGER = LOGGER
+        codeToRT.LOGGER = LOGGER
+
+    def tearDown(self):
+        conversion.LOGGER, codeToRT.LOGGER = self.loggers
+        conversion.EXPORT_INDENTED = True
+        codeToRT.HIGHLIGHTERS.clear()
+        shutil.rmtree(self.folder)
+
+    def writeFile(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def prepare(self, *arguments):
+        ''' Runs the pipeline like from the command line. '''
+
+        argv = ['prepare_system.py', '-s', self.systemPath, '-sp', self.sourcePath, '-lf', '',
+            '-m', os.path.join(self.folder, 'values.txt'), 'energy=' + os.path.join(self.folder, 'energy.txt')]
+        with mock.patch.object(sys, 'argv', argv + list(arguments)), \
+            mock.patch.object(prepare_system.parser_and_logger, 'prepareLogger', return_value=LOGGER):
+            prepare_system.main()
+
+    def convertRegions(self, measurementsName, propertyName):
+        ''' Exports the regions of a measurements file with the conversion tool and returns the file content. '''
+
+        outputPath = tempfile.mkdtemp(dir=self.folder)
+        conversion.convert(os.path.join(self.folder, measurementsName), self.sourcePath, '.java', outputPath, propertyName)
+        with open(os.path.join(outputPath, conversion.EXPORT_NAME), 'r') as file:
+            return file.read()
+
+    def readSystemFile(self, name):
+        with open(os.path.join(self.systemPath, name), 'r') as file:
+            return file.read()
+
+    def test_sameAsTools(self):
+        self.prepare()
+
+        # rich text files
+        outputPath = tempfile.mkdtemp(dir=self.folder)
+        codeToRT.HIGHLIGHTERS.clear()
+        codeToRT.convertFiles(self.sourcePath + os.sep, outputPath, loadSchema(SCHEMA_PATH), recursive=True)
+        richTexts = readFiles(outputPath, '.rt')
+        self.assertEqual(len(richTexts), 3)
+        self.assertEqual(readFiles(self.systemPath, '.rt'), richTexts)
+
+        # regions
+        self.assertEqual(self.readSystemFile('regions_performance.json'), self.convertRegions('values.txt', 'performance'))
+        self.assertEqual(self.readSystemFile('regions_energy.json'), self.convertRegions('energy.txt', 'energy'))
+        self.assertEqual(len(json.loads(self.readSystemFile('regions_performance.json'))['regions']), 3)
+
+        # model of the first measurements file
+        modelPath = os.path.join(self.folder, 'model.csv')
+        regions = json.loads(self.readSystemFile('regions_performance.json'))['regions']
+        json2csv.writeModel(regions, modelPath, features=FEATURES)
+        with open(modelPath, 'r') as file:
+            self.assertEqual(self.readSystemFile('model.csv'), file.read())
+
+    def test_sameWithJobs(self):
+        self.prepare()
+        serial = readFiles(self.systemPath, '')
+        shutil.rmtree(self.systemPath)
+        os.mkdir(self.systemPath)
+        self.writeFile(os.path.join(self.systemPath, 'app_config.json'), serial['app_config.json'])
+
+        self.prepare('-j', '2')
+        self.assertEqual(readFiles(self.systemPath, ''), serial)
+
+    def test_sourceReadOnce(self):
+        with mock.patch('builtins.open', wraps=open) as openFile:
+            self.prepare()
+        openedPaths = [os.path.normpath(call.args[0]) for call in openFile.call_args_list]
+        for name in SOURCES:
+            self.assertEqual(openedPaths.count(os.path.join(self.sourcePath, name)), 1, name)
+
+    def test_modelNotExported(self):
+        self.writeFile(os.path.join(self.systemPath, 'app_config.json'), json.dumps({
+            'software_system': {'path': '.', 'root_folder': 'src'},
+            'features': FEATURES[:1]
+        }))
+        self.prepare()
+        self.assertTrue(os.path.isfile(os.path.join(self.systemPath, 'regions_performance.json')))
+        self.assertFalse(os.path.exists(os.path.join(self.systemPath, 'model.csv')))
+
+        self.prepare('-t', '-ow')
+        self.assertEqual(len(self.readSystemFile('model.csv').splitlines()), 1 + 3 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()